@@ -0,0 +1,94 @@
+"""
+Benchmark package import time in fresh interpreters.
+
+Each scenario runs in its own subprocess (best of --repeat runs) and reports
+the import time and the number of modules loaded. It also checks that
+importing the package or its non-provider components leaves the provider
+SDKs unloaded, and that `import aifast` still works when they are not
+installed. Exits non-zero if a check fails or `import aifast` exceeds
+--max-ms:
+
+    python benchmarks/bench_import.py
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+SDKS = ("openai", "anthropic", "cohere")
+
+# Makes the provider SDKs unimportable, as if they were not installed
+BLOCK_SDKS = """
+import importlib.abc
+class _Block(importlib.abc.MetaPathFinder):
+    def find_spec(self, name, path, target=None):
+        if name.split('.')[0] in {sdks!r}:
+            raise ModuleNotFoundError(f"No module named {{name!r}}", name=name)
+sys.meta_path.insert(0, _Block())
+"""
+
+RUNNER = """
+import json, sys, time
+sys.path.insert(0, {src!r})
+{prelude}
+start = time.perf_counter()
+error = None
+try:
+    {statement}
+except ImportError as e:
+    error = str(e)
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "modules": len(sys.modules), "error": error,
+                  "sdks": [name for name in {sdks!r} if name in sys.modules]}}))
+"""
+
+SCENARIOS = [
+    # name, statement, SDKs may be loaded, block SDKs, import should fail
+    ("import aifast", "import aifast", False, False, False),
+    ("ContentProcessor", "from aifast import ContentProcessor", False, False, False),
+    ("PromptManager", "from aifast import PromptManager", False, False, False),
+    ("ResponseFormatter", "from aifast import ResponseFormatter", False, False, False),
+    ("AIInterface", "from aifast import AIInterface", False, False, False),
+    ("OpenAIProvider", "from aifast import OpenAIProvider", True, False, False),
+    ("everything", "from aifast import *; from aifast.core import *; from aifast.providers import *",
+     True, False, False),
+    ("import aifast, no SDKs", "import aifast; from aifast import ContentProcessor", False, True, False),
+    ("OpenAIProvider, no SDKs", "from aifast import OpenAIProvider", False, True, True),
+]
+
+
+def run(statement: str, block: bool) -> dict:
+    prelude = BLOCK_SDKS.format(sdks=SDKS) if block else ""
+    code = RUNNER.format(src=SRC, prelude=prelude, statement=statement, sdks=SDKS)
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=50.0, help="budget for a bare `import aifast`")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'scenario':<26} {'ms':>9} {'modules':>8}  sdks loaded")
+    for name, statement, sdks_allowed, block, should_fail in SCENARIOS:
+        results = [run(statement, block) for _ in range(args.repeat)]
+        best = min(results, key=lambda result: result["ms"])
+        print(f"{name:<26} {best['ms']:>9.1f} {best['modules']:>8}  {', '.join(best['sdks']) or '-'}")
+        if best["sdks"] and not sdks_allowed:
+            failures.append(f"{name}: loaded {', '.join(best['sdks'])}")
+        if (best["error"] is not None) != should_fail:
+            failures.append(f"{name}: " + (best["error"] or "expected an ImportError"))
+        if name == "import aifast" and best["ms"] > args.max_ms:
+            failures.append(f"{name}: {best['ms']:.1f} ms exceeds {args.max_ms} ms")
+
+    for failure in failures:
+        print("FAIL", failure)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
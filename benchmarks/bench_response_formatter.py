@@ -0,0 +1,122 @@
+"""
+Benchmark ResponseFormatter markdown/mermaid formatting across response sizes.
+
+Compares against the previous per-line implementation (kept below as the
+reference), checks that the output is identical, and reports time per KB so
+linear scaling is visible:
+
+    python benchmarks/bench_response_formatter.py
+"""
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from aifast.core.response_formatter import ResponseFormatter  # noqa: E402
+
+
+def reference_markdown(response: str) -> str:
+    if "```" not in response and re.search(r'^\s*def\s+\w+|^\s*class\s+\w+', response, re.MULTILINE):
+        response = f"```python\n{response}\n```"
+    lines = response.split('\n')
+    formatted_lines = []
+    for line in lines:
+        if re.match(r'^\s*[\d+]\.?\s+', line) and not line.strip().startswith("1."):
+            line = re.sub(r'^\s*(\d+)\.?\s+', r'\1. ', line)
+        elif re.match(r'^\s*[-*]\s+', line) and not line.strip().startswith("-"):
+            line = re.sub(r'^\s*[-*]\s+', '- ', line)
+        formatted_lines.append(line)
+    return '\n'.join(formatted_lines)
+
+
+def reference_mermaid(response: str) -> str:
+    if "```mermaid" in response:
+        match = re.search(r"```mermaid\n(.*?)\n```", response, re.DOTALL)
+        if match:
+            return f"```mermaid\n{match.group(1).strip()}\n```"
+    mermaid_indicators = ["graph ", "sequenceDiagram", "classDiagram", "erDiagram",
+                          "gantt", "pie", "flowchart", "stateDiagram"]
+    if any(indicator in response for indicator in mermaid_indicators):
+        return f"```mermaid\n{response.strip()}\n```"
+    lines = response.strip().split('\n')
+    mermaid = ["graph TD"]
+    for i, line in enumerate(lines):
+        clean_text = re.sub(r'[^\w\s-]', '', line).strip()
+        if clean_text:
+            mermaid.append(f"    A{i}[{clean_text}]")
+            if i > 0:
+                mermaid.append(f"    A{i-1} --> A{i}")
+    return "```mermaid\n" + "\n".join(mermaid) + "\n```"
+
+
+LINE_SHAPES = [
+    "Some prose about the {w} and the {w}.",
+    "  {d}. numbered item about {w}",
+    "{d} item without a dot {w}",
+    "1. already formatted {w}",
+    "* starred bullet {w}",
+    "   *\tindented star {w}",
+    "- dash bullet {w}",
+    "+ plus item {w}",
+    "12. two digit item {w}",
+    "\t3.\t\ttabbed {w}\r",
+    "",
+    "Quoted: 'a' {{b}} <c> & {w}!",
+]
+WORDS = ["parser", "pipeline", "token", "provider", "latency", "cache", "büro", "数据"]
+
+
+def make_response(size: int, rng: random.Random) -> str:
+    lines = []
+    total = 0
+    while total < size:
+        line = rng.choice(LINE_SHAPES).format(w=rng.choice(WORDS), d=rng.randint(0, 9))
+        lines.append(line)
+        total += len(line) + 1
+    return "\n".join(lines)
+
+
+def fuzz(iterations: int = 20000, seed: int = 0):
+    """Random short responses, including odd whitespace, must format identically."""
+    rng = random.Random(seed)
+    alphabet = "12 9.*-+#`\t\r\x0b\x1c\x85 \nabc日٣"
+    formatter = ResponseFormatter("markdown")
+    for _ in range(iterations):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        assert formatter._format_markdown(text) == reference_markdown(text), repr(text)
+        assert formatter._format_mermaid(text) == reference_mermaid(text), repr(text)
+
+
+def timed(func, text: str, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    fuzz()
+    rng = random.Random(42)
+    formatter = ResponseFormatter("markdown")
+    print(f"{'size':>10} {'ref md':>10} {'new md':>10} {'speedup':>8} {'us/KB':>8} "
+          f"{'ref mmd':>10} {'new mmd':>10}")
+    for size in (1_000, 10_000, 100_000, 1_000_000, 10_000_000):
+        text = make_response(size, rng)
+        assert formatter._format_markdown(text) == reference_markdown(text)
+        assert formatter._format_mermaid(text) == reference_mermaid(text)
+        ref_md = timed(reference_markdown, text)
+        new_md = timed(formatter._format_markdown, text)
+        ref_mmd = timed(reference_mermaid, text)
+        new_mmd = timed(formatter._format_mermaid, text)
+        per_kb = new_md / (len(text) / 1000) * 1e6
+        print(f"{len(text):>10} {ref_md:>10.4f} {new_md:>10.4f} {ref_md / new_md:>7.1f}x {per_kb:>8.2f} "
+              f"{ref_mmd:>10.4f} {new_mmd:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
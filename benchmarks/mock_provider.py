@@ -0,0 +1,140 @@
+"""
+Deterministic in-process provider for offline benchmarks.
+
+MockProvider implements BaseProvider without any network I/O: replies are
+derived from the prompt, token usage is reported like a real provider, and
+latency, jitter, failures and streaming speed come from a seeded generator
+so runs are repeatable. Failures raise OverloadedError, which RetryPolicy
+treats as retryable.
+
+    provider = MockProvider(latency=0.02, jitter=0.01, error_rate=0.05)
+    ai = AIInterface(provider)
+"""
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+from typing import AsyncIterator, Dict, Iterator, List, Tuple
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(_HERE, "..", "src"), _HERE]
+
+from aifast.providers.base import BaseProvider  # noqa: E402
+from aifast.providers.errors import OverloadedError  # noqa: E402
+from aifast.providers.types import CompletionResult, StreamEvent, Usage  # noqa: E402
+
+from workload import prompt_tokens, response_words  # noqa: E402
+
+
+def _messages_text(messages: List[Dict[str, str]]) -> str:
+    return "".join(str(message.get("content", "")) for message in messages)
+
+
+class MockProvider(BaseProvider):
+    name = "mock"
+
+    def __init__(self, api_key: str = "mock", model: str = "mock-1", latency: float = 0.0,
+                 jitter: float = 0.0, error_rate: float = 0.0, response_tokens: int = 32,
+                 token_delay: float = 0.0, seed: int = 0):
+        self.api_key = api_key
+        self.model = model
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.response_tokens = response_tokens
+        self.token_delay = token_delay
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    def _draw(self) -> Tuple[float, bool]:
+        """Delay for this call and whether it fails."""
+        with self._lock:
+            self.calls += 1
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            failed = bool(self.error_rate) and self._rng.random() < self.error_rate
+            if failed:
+                self.errors += 1
+            return delay, failed
+
+    def _words(self, prompt: str, kwargs: Dict) -> List[str]:
+        count = self.response_tokens
+        if kwargs.get("max_tokens"):
+            count = min(count, kwargs["max_tokens"])
+        return response_words(prompt, count)
+
+    def _reply(self, prompt: str, kwargs: Dict, start: float, failed: bool) -> CompletionResult:
+        if failed:
+            raise OverloadedError("Mock API error: simulated overload", self.name, 503)
+        words = self._words(prompt, kwargs)
+        return self._result(" ".join(words), start, Usage(prompt_tokens(prompt), len(words)))
+
+    def complete(self, prompt: str, **kwargs) -> str:
+        return self.complete_result(prompt, **kwargs).text
+
+    def chat(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        return self.chat_result(messages, **kwargs).text
+
+    async def acomplete(self, prompt: str, **kwargs) -> str:
+        return (await self.acomplete_result(prompt, **kwargs)).text
+
+    async def achat(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        return (await self.achat_result(messages, **kwargs)).text
+
+    def complete_result(self, prompt: str, **kwargs) -> CompletionResult:
+        start = time.perf_counter()
+        delay, failed = self._draw()
+        if delay:
+            time.sleep(delay)
+        return self._reply(prompt, kwargs, start, failed)
+
+    def chat_result(self, messages: List[Dict[str, str]], **kwargs) -> CompletionResult:
+        return self.complete_result(_messages_text(messages), **kwargs)
+
+    async def acomplete_result(self, prompt: str, **kwargs) -> CompletionResult:
+        start = time.perf_counter()
+        delay, failed = self._draw()
+        if delay:
+            await asyncio.sleep(delay)
+        return self._reply(prompt, kwargs, start, failed)
+
+    async def achat_result(self, messages: List[Dict[str, str]], **kwargs) -> CompletionResult:
+        return await self.acomplete_result(_messages_text(messages), **kwargs)
+
+    def stream_complete(self, prompt: str, **kwargs) -> Iterator[StreamEvent]:
+        delay, failed = self._draw()
+        if delay:
+            time.sleep(delay)
+        if failed:
+            raise OverloadedError("Mock API error: simulated overload", self.name, 503)
+        words = self._words(prompt, kwargs)
+        for i, word in enumerate(words):
+            if self.token_delay:
+                time.sleep(self.token_delay)
+            yield StreamEvent(word if i == 0 else " " + word)
+        yield StreamEvent(done=True, usage=Usage(prompt_tokens(prompt), len(words)), model=self.model)
+
+    def stream_chat(self, messages: List[Dict[str, str]], **kwargs) -> Iterator[StreamEvent]:
+        return self.stream_complete(_messages_text(messages), **kwargs)
+
+    async def astream_complete(self, prompt: str, **kwargs) -> AsyncIterator[StreamEvent]:
+        delay, failed = self._draw()
+        if delay:
+            await asyncio.sleep(delay)
+        if failed:
+            raise OverloadedError("Mock API error: simulated overload", self.name, 503)
+        words = self._words(prompt, kwargs)
+        for i, word in enumerate(words):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            yield StreamEvent(word if i == 0 else " " + word)
+        yield StreamEvent(done=True, usage=Usage(prompt_tokens(prompt), len(words)), model=self.model)
+
+    def astream_chat(self, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[StreamEvent]:
+        return self.astream_complete(_messages_text(messages), **kwargs)
+
+    def validate_api_key(self) -> bool:
+        return True
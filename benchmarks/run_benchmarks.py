@@ -0,0 +1,438 @@
+"""
+Offline benchmark suite.
+
+Times ContentProcessor, PromptManager and ResponseFormatter, batch fan-out
+and the sync vs async call paths through AIInterface, using MockProvider
+(in-process, deterministic) and the real provider classes against the local
+stub server (see stub_server.py). No API keys or network access are needed.
+
+Results are written as JSON. Each benchmark reports "seconds" (best time
+per operation over --repeat rounds, lower is better) plus its own
+throughput figures; a benchmark that fails records "error" instead of
+stopping the run. Compare against an earlier run to catch regressions:
+
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --baseline bench.json --tolerance 0.25
+
+Exits non-zero if any benchmark is slower than the baseline by more than
+the tolerance. --quick shrinks workloads for a smoke run; --filter runs
+only benchmarks whose name contains the given text.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from aifast.core import AIInterface, ContentProcessor, PromptManager, RetryPolicy  # noqa: E402
+from aifast.core.response_formatter import ResponseFormatter  # noqa: E402
+
+from mock_provider import MockProvider  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+from workload import WORDS  # noqa: E402
+
+BENCHMARKS: List[tuple] = []
+
+
+def benchmark(name: str):
+    """Register func(quick) -> result dict under name."""
+    def register(func: Callable[[bool], Dict[str, Any]]):
+        BENCHMARKS.append((name, func))
+        return func
+    return register
+
+
+class Settings:
+    repeat = 5
+
+
+def measure(func: Callable[[], Any], number: int = 1, repeat: Optional[int] = None) -> Dict[str, Any]:
+    """Call func number times per round; per-operation best and median over the rounds."""
+    rounds = []
+    for _ in range(repeat or Settings.repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        rounds.append((time.perf_counter() - start) / number)
+    best = min(rounds)
+    return {
+        "seconds": best,
+        "median": statistics.median(rounds),
+        "ops_per_sec": 1.0 / best if best > 0 else None,
+        "number": number,
+        "repeat": len(rounds)
+    }
+
+
+def measure_async(make_coro: Callable[[], Any], number: int = 1, repeat: Optional[int] = None) -> Dict[str, Any]:
+    """measure() for a coroutine factory, each round in one event loop."""
+    async def rounds():
+        times = []
+        for _ in range(repeat or Settings.repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                await make_coro()
+            times.append((time.perf_counter() - start) / number)
+        return times
+
+    times = asyncio.run(rounds())
+    best = min(times)
+    return {
+        "seconds": best,
+        "median": statistics.median(times),
+        "ops_per_sec": 1.0 / best if best > 0 else None,
+        "number": number,
+        "repeat": len(times)
+    }
+
+
+def make_text(size: int, seed: int = 0) -> str:
+    """Prose-like text of about size characters with punctuation and paragraphs."""
+    rng = random.Random(seed)
+    parts = []
+    total = 0
+    while total < size:
+        sentence = " ".join(rng.choice(WORDS).title() if i == 0 else rng.choice(WORDS)
+                            for i in range(rng.randint(4, 14)))
+        sentence += rng.choice((".", "!", "?", ", (see #%d)." % rng.randint(1, 99)))
+        sentence += "\n\n" if rng.random() < 0.1 else " "
+        parts.append(sentence)
+        total += len(sentence)
+    return "".join(parts)
+
+
+# ContentProcessor
+
+@benchmark("content_processor.process")
+def bench_process(quick: bool) -> Dict[str, Any]:
+    processor = ContentProcessor()
+    text = make_text(2_000)
+    pipeline = ["clean", "remove_special_chars", "lowercase"]
+    result = measure(lambda: processor.process(text, pipeline), number=200 if quick else 2000)
+    result["chars"] = len(text)
+    return result
+
+
+@benchmark("content_processor.process_batch")
+def bench_process_batch(quick: bool) -> Dict[str, Any]:
+    processor = ContentProcessor()
+    texts = [make_text(500, seed) for seed in range(500 if quick else 5000)]
+    result = measure(lambda: processor.process_batch(texts, ["clean", "lowercase", "tokenize"], workers=1))
+    result["items"] = len(texts)
+    result["items_per_sec"] = len(texts) / result["seconds"]
+    return result
+
+
+@benchmark("content_processor.process_stream")
+def bench_process_stream(quick: bool) -> Dict[str, Any]:
+    processor = ContentProcessor()
+    text = make_text(200_000 if quick else 2_000_000)
+    chunks = [text[i:i + 8192] for i in range(0, len(text), 8192)]
+
+    def run():
+        for _ in processor.process_stream(chunks, ["clean", "remove_special_chars", "lowercase"]):
+            pass
+
+    result = measure(run)
+    result["mb_per_sec"] = len(text) / result["seconds"] / 1e6
+    return result
+
+
+@benchmark("content_processor.chunk")
+def bench_chunk(quick: bool) -> Dict[str, Any]:
+    processor = ContentProcessor()
+    text = make_text(50_000 if quick else 500_000)
+    result = measure(lambda: processor.chunk(text, 512, overlap=64))
+    result["chunks"] = len(processor.chunk(text, 512, overlap=64))
+    result["mb_per_sec"] = len(text) / result["seconds"] / 1e6
+    return result
+
+
+# PromptManager
+
+def _prompt_manager() -> PromptManager:
+    prompts = PromptManager(store={})
+    prompts.add_prompt("review", "You are {role}. Review the {language} code below for {focus}.\n\n"
+                                 "{code}\n\nAnswer in {style} style, at most {limit} words.")
+    return prompts
+
+
+def _prompt_values(i: int) -> Dict[str, Any]:
+    return {"role": "a senior reviewer", "language": "Python", "focus": "performance",
+            "code": f"def f{i}(x):\n    return x * {i}", "style": "terse", "limit": 100 + i}
+
+
+@benchmark("prompt_manager.format_prompt")
+def bench_format_prompt(quick: bool) -> Dict[str, Any]:
+    prompts = _prompt_manager()
+    values = _prompt_values(1)
+    return measure(lambda: prompts.format_prompt("review", **values), number=2000 if quick else 20000)
+
+
+@benchmark("prompt_manager.render_many")
+def bench_render_many(quick: bool) -> Dict[str, Any]:
+    prompts = _prompt_manager()
+    rows = [_prompt_values(i) for i in range(1000 if quick else 10000)]
+    result = measure(lambda: prompts.render_many("review", rows))
+    result["rows_per_sec"] = len(rows) / result["seconds"]
+    return result
+
+
+# ResponseFormatter
+
+def _json_payload(items: int) -> str:
+    return json.dumps({"items": [{"id": i, "name": f"item {i}", "tags": ["a", "b"], "score": i / 7}
+                                 for i in range(items)], "total": items})
+
+
+@benchmark("response_formatter.json")
+def bench_format_json(quick: bool) -> Dict[str, Any]:
+    formatter = ResponseFormatter("json")
+    payload = _json_payload(100)
+    return measure(lambda: formatter.format(payload), number=200 if quick else 2000)
+
+
+@benchmark("response_formatter.json_extract")
+def bench_format_json_extract(quick: bool) -> Dict[str, Any]:
+    formatter = ResponseFormatter("json_extract")
+    payload = "Here is the result you asked for:\n\n```json\n" + _json_payload(100) + "\n```\n\nLet me know!"
+    return measure(lambda: formatter.format(payload), number=200 if quick else 2000)
+
+
+@benchmark("response_formatter.markdown")
+def bench_format_markdown(quick: bool) -> Dict[str, Any]:
+    formatter = ResponseFormatter("markdown")
+    lines = []
+    for i in range(500):
+        lines.append(("* item %d" if i % 3 == 0 else "%d item" if i % 3 == 1 else "Plain line %d.") % i)
+    text = "\n".join(lines)
+    result = measure(lambda: formatter.format(text), number=20 if quick else 200)
+    result["chars"] = len(text)
+    return result
+
+
+@benchmark("response_formatter.format_stream")
+def bench_format_stream(quick: bool) -> Dict[str, Any]:
+    formatter = ResponseFormatter("json")
+    lines = [_json_payload(3) for _ in range(200 if quick else 2000)]
+    text = "\n".join(lines)
+    chunks = [text[i:i + 64] for i in range(0, len(text), 64)]
+    result = measure(lambda: list(formatter.format_stream(chunks)))
+    result["objects_per_sec"] = len(lines) / result["seconds"]
+    return result
+
+
+# AIInterface over MockProvider: call overhead and batch fan-out
+
+@benchmark("ai_interface.complete_overhead")
+def bench_complete_overhead(quick: bool) -> Dict[str, Any]:
+    ai = AIInterface(MockProvider(response_tokens=8))
+    return measure(lambda: ai.complete("hello"), number=1000 if quick else 10000)
+
+
+@benchmark("ai_interface.acomplete_overhead")
+def bench_acomplete_overhead(quick: bool) -> Dict[str, Any]:
+    ai = AIInterface(MockProvider(response_tokens=8))
+    return measure_async(lambda: ai.acomplete("hello"), number=1000 if quick else 10000)
+
+
+@benchmark("ai_interface.stream_overhead")
+def bench_stream_overhead(quick: bool) -> Dict[str, Any]:
+    ai = AIInterface(MockProvider(response_tokens=64))
+    result = measure(lambda: list(ai.stream_complete("hello")), number=200 if quick else 2000)
+    result["events_per_sec"] = 65 / result["seconds"]
+    return result
+
+
+def _fan_out_prompts(quick: bool) -> List[str]:
+    return [f"prompt {i}" for i in range(100 if quick else 400)]
+
+
+@benchmark("batch.complete_many_threads")
+def bench_complete_many(quick: bool) -> Dict[str, Any]:
+    ai = AIInterface(MockProvider(latency=0.01, jitter=0.005))
+    prompts = _fan_out_prompts(quick)
+    result = measure(lambda: ai.complete_many(prompts, max_workers=32), repeat=3)
+    result["items_per_sec"] = len(prompts) / result["seconds"]
+    return result
+
+
+@benchmark("batch.acomplete_many_async")
+def bench_acomplete_many(quick: bool) -> Dict[str, Any]:
+    ai = AIInterface(MockProvider(latency=0.01, jitter=0.005))
+    prompts = _fan_out_prompts(quick)
+    result = measure_async(lambda: ai.acomplete_many(prompts, max_concurrency=32), repeat=3)
+    result["items_per_sec"] = len(prompts) / result["seconds"]
+    return result
+
+
+@benchmark("batch.complete_many_retry")
+def bench_complete_many_retry(quick: bool) -> Dict[str, Any]:
+    provider = MockProvider(latency=0.005, error_rate=0.2)
+    ai = AIInterface(provider, retry=RetryPolicy(max_attempts=5, base_delay=0.001, max_delay=0.01))
+    prompts = _fan_out_prompts(quick)
+    results = []
+    result = measure(lambda: results.append(ai.complete_many(prompts, max_workers=32)), repeat=3)
+    result["items_per_sec"] = len(prompts) / result["seconds"]
+    result["failed_items"] = sum(1 for item in results[-1] if not item.ok)
+    result["provider_calls"] = provider.calls
+    return result
+
+
+@benchmark("batch.acomplete_many_coalesced")
+def bench_acomplete_many_coalesced(quick: bool) -> Dict[str, Any]:
+    # A few popular prompts requested many times at once: one provider call per distinct prompt
+    provider = MockProvider(latency=0.01, jitter=0.005)
+    ai = AIInterface(provider, coalesce=True)
+    prompts = [f"prompt {i % 10}" for i in range(len(_fan_out_prompts(quick)))]
+    result = measure_async(lambda: ai.acomplete_many(prompts, max_concurrency=32), repeat=3)
+    result["items_per_sec"] = len(prompts) / result["seconds"]
+    result["provider_calls"] = provider.calls
+    return result
+
+
+# Real provider classes against the local stub server
+
+def _stub_provider(name: str, url: str):
+    if name == "openai":
+        from aifast.providers import OpenAIProvider
+        return OpenAIProvider("stub-key", base_url=f"{url}/v1")
+    if name == "anthropic":
+        from aifast.providers import AnthropicProvider
+        return AnthropicProvider("stub-key", base_url=url)
+    from aifast.providers import CohereProvider
+    return CohereProvider("stub-key", base_url=url)
+
+
+def _register_stub_benchmarks(name: str):
+    @benchmark(f"stub.{name}.complete_sync")
+    def bench_sync(quick: bool) -> Dict[str, Any]:
+        with StubServer(response_tokens=32) as server:
+            ai = AIInterface(_stub_provider(name, server.url))
+            return measure(lambda: ai.complete("hello"), number=20 if quick else 200)
+
+    @benchmark(f"stub.{name}.complete_async")
+    def bench_async(quick: bool) -> Dict[str, Any]:
+        with StubServer(response_tokens=32) as server:
+            ai = AIInterface(_stub_provider(name, server.url))
+            return measure_async(lambda: ai.acomplete("hello"), number=20 if quick else 200)
+
+    @benchmark(f"stub.{name}.fan_out_async")
+    def bench_fan_out(quick: bool) -> Dict[str, Any]:
+        with StubServer(latency=0.02, jitter=0.01, response_tokens=32) as server:
+            ai = AIInterface(_stub_provider(name, server.url))
+            prompts = _fan_out_prompts(quick)
+
+            async def run():
+                results = await ai.acomplete_many(prompts, max_concurrency=16)
+                errors = [item.error for item in results if not item.ok]
+                if errors:
+                    raise errors[0]
+
+            result = measure_async(run, repeat=3)
+            result["items_per_sec"] = len(prompts) / result["seconds"]
+            return result
+
+    @benchmark(f"stub.{name}.stream")
+    def bench_stream(quick: bool) -> Dict[str, Any]:
+        with StubServer(response_tokens=64) as server:
+            ai = AIInterface(_stub_provider(name, server.url))
+            first = []
+
+            def run():
+                start = time.perf_counter()
+                for i, _ in enumerate(ai.stream_complete("hello")):
+                    if i == 0:
+                        first.append(time.perf_counter() - start)
+
+            result = measure(run, number=10 if quick else 100)
+            result["first_event_seconds"] = min(first)
+            return result
+
+
+for _provider in ("openai", "anthropic", "cohere"):
+    _register_stub_benchmarks(_provider)
+
+
+def run(quick: bool = False, name_filter: Optional[str] = None) -> Dict[str, Any]:
+    results = {}
+    for name, func in BENCHMARKS:
+        if name_filter and name_filter not in name:
+            continue
+        try:
+            result = func(quick)
+        except Exception as e:
+            result = {"error": f"{type(e).__name__}: {e}"}
+        results[name] = result
+        if "error" in result:
+            print(f"{name:<40} ERROR {result['error'][:80]}")
+        else:
+            print(f"{name:<40} {result['seconds'] * 1e6:>14.1f} us/op")
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "quick": quick,
+            "repeat": Settings.repeat
+        },
+        "results": results
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Names of benchmarks slower than baseline by more than tolerance (a fraction)."""
+    if baseline.get("meta", {}).get("quick") != current["meta"]["quick"]:
+        print("warning: comparing a --quick run with a full run; workloads differ")
+    regressions = []
+    print(f"\n{'benchmark':<40} {'baseline us':>14} {'current us':>14} {'change':>8}")
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before or "seconds" not in before or "seconds" not in result:
+            continue
+        change = result["seconds"] / before["seconds"] - 1.0
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<40} {before['seconds'] * 1e6:>14.1f} {result['seconds'] * 1e6:>14.1f} "
+              f"{change:>+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", "-o", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="earlier JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed slowdown vs the baseline, as a fraction (default 0.2)")
+    parser.add_argument("--quick", action="store_true", help="smaller workloads for a smoke run")
+    parser.add_argument("--repeat", type=int, default=5, help="rounds per benchmark (best is kept)")
+    parser.add_argument("--filter", dest="name_filter", help="only run benchmarks whose name contains this")
+    args = parser.parse_args()
+
+    Settings.repeat = args.repeat
+    current = run(args.quick, args.name_filter)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
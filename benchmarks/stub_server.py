@@ -0,0 +1,325 @@
+"""
+Local HTTP stub of the OpenAI, Anthropic and Cohere APIs for offline benchmarks.
+
+Serves the endpoints the aifast providers call, in each vendor's wire format,
+with configurable latency, jitter, error rate and streaming speed:
+
+    POST /v1/chat/completions   OpenAI chat completions (JSON, or SSE with stream=true)
+    POST /v1/messages           Anthropic messages (JSON, or SSE with stream=true)
+    POST /v1/chat               Cohere chat (JSON, or JSON lines with stream=true)
+    POST /v1/generate           Cohere generate (JSON, or JSON lines with stream=true)
+
+Point a provider at it with base_url: f"{url}/v1" for OpenAI, url for
+Anthropic and Cohere. Responses are deterministic for a given prompt; the
+random latency and errors come from a seeded generator.
+
+    python benchmarks/stub_server.py --port 8080 --latency 0.05 --jitter 0.02 --error-rate 0.01
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from workload import prompt_tokens, response_words  # noqa: E402
+
+
+class StubConfig:
+    """Behaviour of the stub; shared by all request threads."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_statuses: Tuple[int, ...] = (429, 503), retry_after: float = 0.001,
+                 response_tokens: int = 64, token_delay: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        self.retry_after = retry_after
+        self.response_tokens = response_tokens
+        self.token_delay = token_delay
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def draw(self) -> Tuple[float, Optional[int]]:
+        """Delay before responding, and the error status to return (None for success)."""
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            status = None
+            if self.error_rate and self._rng.random() < self.error_rate:
+                status = self._rng.choice(self.error_statuses)
+                self.errors += 1
+            return delay, status
+
+
+def _error_kind(status: int, rate_limit: str, server: str) -> str:
+    if status == 429:
+        return rate_limit
+    return server if status >= 500 else "invalid_request_error"
+
+
+def _openai_error(status: int) -> Dict[str, Any]:
+    kind = _error_kind(status, "rate_limit_exceeded", "server_error")
+    return {"error": {"message": f"stub {kind}", "type": kind, "code": kind}}
+
+
+def _anthropic_error(status: int) -> Dict[str, Any]:
+    kind = _error_kind(status, "rate_limit_error", "overloaded_error")
+    return {"type": "error", "error": {"type": kind, "message": f"stub {kind}"}}
+
+
+def _cohere_error(status: int) -> Dict[str, Any]:
+    return {"message": f"stub {_error_kind(status, 'too many requests', 'service unavailable')}"}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "aifast-stub/1.0"
+    # Headers and body go out in separate writes; without this, Nagle plus delayed ACKs adds ~40ms
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def config(self) -> StubConfig:
+        return self.server.config
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        path = self.path.split("?")[0].rstrip("/")
+        routes = {
+            "/v1/chat/completions": (self._openai, _openai_error),
+            "/v1/messages": (self._anthropic, _anthropic_error),
+            "/v1/chat": (self._cohere_chat, _cohere_error),
+            "/v1/generate": (self._cohere_generate, _cohere_error)
+        }
+        route = routes.get(path)
+        if route is None:
+            return self._json(404, {"error": {"message": f"unknown path {path}"}})
+        handler, error_body = route
+        delay, status = self.config.draw()
+        if delay:
+            time.sleep(delay)
+        if status is not None:
+            return self._json(status, error_body(status), {
+                "retry-after-ms": str(int(self.config.retry_after * 1000)),
+                "retry-after": str(math.ceil(self.config.retry_after))
+            })
+        handler(body)
+
+    def _json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, content_type: str, pieces: Iterator[str]):
+        """Chunked transfer so the connection stays reusable after the stream."""
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for piece in pieces:
+            data = piece.encode("utf-8")
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _reply(self, prompt: str, max_tokens: Optional[int]) -> List[str]:
+        count = self.config.response_tokens
+        if max_tokens:
+            count = min(count, max_tokens)
+        return response_words(prompt, count)
+
+    def _deltas(self, words: List[str]) -> Iterator[str]:
+        for i, word in enumerate(words):
+            if self.config.token_delay:
+                time.sleep(self.config.token_delay)
+            yield word if i == 0 else " " + word
+
+    def _openai(self, body: Dict[str, Any]):
+        prompt = "".join(str(m.get("content", "")) for m in body.get("messages", []))
+        words = self._reply(prompt, body.get("max_tokens"))
+        model = body.get("model", "stub")
+        usage = {"prompt_tokens": prompt_tokens(prompt), "completion_tokens": len(words),
+                 "total_tokens": prompt_tokens(prompt) + len(words)}
+        base = {"id": "chatcmpl-stub", "created": int(time.time()), "model": model}
+        if not body.get("stream"):
+            return self._json(200, dict(base, object="chat.completion", usage=usage, choices=[{
+                "index": 0, "finish_reason": "stop",
+                "message": {"role": "assistant", "content": " ".join(words)}
+            }]))
+
+        def events():
+            chunk = dict(base, object="chat.completion.chunk")
+            yield "data: " + json.dumps(dict(chunk, choices=[
+                {"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])) + "\n\n"
+            for delta in self._deltas(words):
+                yield "data: " + json.dumps(dict(chunk, choices=[
+                    {"index": 0, "delta": {"content": delta}, "finish_reason": None}])) + "\n\n"
+            yield "data: " + json.dumps(dict(chunk, choices=[
+                {"index": 0, "delta": {}, "finish_reason": "stop"}])) + "\n\n"
+            if (body.get("stream_options") or {}).get("include_usage"):
+                yield "data: " + json.dumps(dict(chunk, choices=[], usage=usage)) + "\n\n"
+            yield "data: [DONE]\n\n"
+
+        self._stream("text/event-stream", events())
+
+    def _anthropic(self, body: Dict[str, Any]):
+        messages = body.get("messages", [])
+        prompt = (body.get("system") or "") + "".join(
+            m["content"] if isinstance(m.get("content"), str) else json.dumps(m.get("content"))
+            for m in messages)
+        words = self._reply(prompt, body.get("max_tokens"))
+        model = body.get("model", "stub")
+        usage = {"input_tokens": prompt_tokens(prompt), "output_tokens": len(words)}
+        message = {"id": "msg_stub", "type": "message", "role": "assistant", "model": model,
+                   "stop_reason": "end_turn", "stop_sequence": None}
+        if not body.get("stream"):
+            return self._json(200, dict(message, usage=usage,
+                                        content=[{"type": "text", "text": " ".join(words)}]))
+
+        def event(name: str, data: Dict[str, Any]) -> str:
+            return f"event: {name}\ndata: {json.dumps(dict(data, type=name))}\n\n"
+
+        def events():
+            yield event("message_start", {"message": dict(message, content=[], stop_reason=None,
+                                                          usage={"input_tokens": usage["input_tokens"],
+                                                                 "output_tokens": 0})})
+            yield event("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}})
+            for delta in self._deltas(words):
+                yield event("content_block_delta", {"index": 0, "delta": {"type": "text_delta", "text": delta}})
+            yield event("content_block_stop", {"index": 0})
+            yield event("message_delta", {"delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                          "usage": {"output_tokens": usage["output_tokens"]}})
+            yield event("message_stop", {})
+
+        self._stream("text/event-stream", events())
+
+    def _cohere_meta(self, prompt: str, words: List[str]) -> Dict[str, Any]:
+        return {"api_version": {"version": "1"},
+                "billed_units": {"input_tokens": prompt_tokens(prompt), "output_tokens": len(words)}}
+
+    def _cohere_chat(self, body: Dict[str, Any]):
+        prompt = "".join(m.get("message", "") for m in body.get("chat_history") or []) + body.get("message", "")
+        words = self._reply(prompt, body.get("max_tokens"))
+        response = {"text": " ".join(words), "generation_id": "gen-stub", "finish_reason": "COMPLETE",
+                    "meta": self._cohere_meta(prompt, words)}
+        if not body.get("stream"):
+            return self._json(200, response)
+
+        def events():
+            yield json.dumps({"event_type": "stream-start", "generation_id": "gen-stub", "is_finished": False}) + "\n"
+            for delta in self._deltas(words):
+                yield json.dumps({"event_type": "text-generation", "text": delta, "is_finished": False}) + "\n"
+            yield json.dumps({"event_type": "stream-end", "finish_reason": "COMPLETE", "is_finished": True,
+                              "response": response}) + "\n"
+
+        self._stream("application/stream+json", events())
+
+    def _cohere_generate(self, body: Dict[str, Any]):
+        prompt = body.get("prompt", "")
+        words = self._reply(prompt, body.get("max_tokens"))
+        generation = {"id": "gen-stub", "text": " ".join(words), "finish_reason": "COMPLETE"}
+        response = {"id": "generate-stub", "prompt": prompt, "generations": [generation],
+                    "meta": self._cohere_meta(prompt, words)}
+        if not body.get("stream"):
+            return self._json(200, response)
+
+        def events():
+            for delta in self._deltas(words):
+                yield json.dumps({"event_type": "text-generation", "text": delta, "index": 0,
+                                  "is_finished": False}) + "\n"
+            yield json.dumps({"event_type": "stream-end", "finish_reason": "COMPLETE", "is_finished": True,
+                              "response": response}) + "\n"
+
+        self._stream("application/stream+json", events())
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients closing pooled keep-alive connections are routine, not errors
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class StubServer:
+    """
+    The stub on a background thread. Use as a context manager, or call
+    start()/stop(); url is the server root (port 0 picks a free port).
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, **config):
+        self.config = StubConfig(**config)
+        self._server = _Server((host, port), _Handler)
+        self._server.config = self.config
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="aifast-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before each response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra uniform random delay, seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered 429/503")
+    parser.add_argument("--response-tokens", type=int, default=64)
+    parser.add_argument("--token-delay", type=float, default=0.0, help="seconds between streamed tokens")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    server = StubServer(args.host, args.port, latency=args.latency, jitter=args.jitter,
+                        error_rate=args.error_rate, response_tokens=args.response_tokens,
+                        token_delay=args.token_delay, seed=args.seed)
+    print(f"Serving OpenAI/Anthropic/Cohere stubs on {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""
+Deterministic workload shared by the benchmark stub server and mock provider.
+
+Replies are derived from a digest of the prompt, so the in-process
+MockProvider and the HTTP StubServer answer a prompt with the same words
+and report the same token usage.
+"""
+from typing import List
+import hashlib
+
+WORDS = ("alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel",
+         "india", "juliet", "kilo", "lima", "mike", "november", "oscar", "papa")
+
+
+def prompt_tokens(text: str) -> int:
+    """Token usage reported for a prompt (about 4 characters per token, at least 1)."""
+    return max(1, (len(text) + 3) // 4)
+
+
+def response_words(prompt: str, count: int) -> List[str]:
+    """Deterministic reply for a prompt: count words picked by the prompt's digest."""
+    digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+    return [WORDS[(digest[i % len(digest)] + i) % len(WORDS)] for i in range(count)]
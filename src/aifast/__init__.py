@@ -1,15 +1,32 @@
 """AIFAST package."""
-# First import all the providers
-from aifast.providers.openai_provider import OpenAIProvider
-from aifast.providers.anthropic_provider import AnthropicProvider
-from aifast.providers.cohere_provider import CohereProvider
+from typing import TYPE_CHECKING
 
-# Then import the core components
-from aifast.core.ai_interface import AIInterface
-from aifast.core.content_processor import ContentProcessor
-from aifast.core.prompt_manager import PromptManager
-from aifast.core.llm_connector import LLMConnector
-from aifast.core.response_formatter import ResponseFormatter
+from aifast.utils.lazy import lazy_exports
+
+# Names are imported from their modules on first use, so `import aifast`
+# does not load provider SDKs a process never calls.
+_EXPORTS = {
+    'AIInterface': 'aifast.core.ai_interface',
+    'OpenAIProvider': 'aifast.providers.openai_provider',
+    'AnthropicProvider': 'aifast.providers.anthropic_provider',
+    'CohereProvider': 'aifast.providers.cohere_provider',
+    'ContentProcessor': 'aifast.core.content_processor',
+    'PromptManager': 'aifast.core.prompt_manager',
+    'LLMConnector': 'aifast.core.llm_connector',
+    'ResponseFormatter': 'aifast.core.response_formatter'
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from aifast.providers.openai_provider import OpenAIProvider
+    from aifast.providers.anthropic_provider import AnthropicProvider
+    from aifast.providers.cohere_provider import CohereProvider
+    from aifast.core.ai_interface import AIInterface
+    from aifast.core.content_processor import ContentProcessor
+    from aifast.core.prompt_manager import PromptManager
+    from aifast.core.llm_connector import LLMConnector
+    from aifast.core.response_formatter import ResponseFormatter
 
 __all__ = [
     'AIInterface',
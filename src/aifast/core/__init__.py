@@ -1,12 +1,63 @@
 """AIFAST core modules."""
-from .ai_interface import AIInterface
-from .content_processor import ContentProcessor
-from .prompt_manager import PromptManager
-from .llm_connector import LLMConnector
+from typing import TYPE_CHECKING
+
+from ..utils.lazy import lazy_exports
+
+# Loaded on first use, so importing one core module does not pull in the rest
+_EXPORTS = {
+    'AIInterface': '.ai_interface',
+    'ContentProcessor': '.content_processor',
+    'PromptManager': '.prompt_manager',
+    'SQLitePromptStore': '.prompt_store',
+    'LLMConnector': '.llm_connector',
+    'BatchResult': '.batch',
+    'RateLimiter': '.rate_limiter',
+    'get_rate_limiter': '.rate_limiter',
+    'MemoryCache': '.cache',
+    'SQLiteCache': '.cache',
+    'RetryPolicy': '.retry',
+    'chunk_text': '.chunking',
+    'MapReduceSummarizer': '.summarizer',
+    'SchemaValidationError': '.json_utils',
+    'extract_json': '.json_utils',
+    'UsageTracker': '.usage',
+    'SingleFlight': '.single_flight'
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .ai_interface import AIInterface
+    from .content_processor import ContentProcessor
+    from .prompt_manager import PromptManager
+    from .prompt_store import SQLitePromptStore
+    from .llm_connector import LLMConnector
+    from .batch import BatchResult
+    from .rate_limiter import RateLimiter, get_rate_limiter
+    from .cache import MemoryCache, SQLiteCache
+    from .retry import RetryPolicy
+    from .chunking import chunk_text
+    from .summarizer import MapReduceSummarizer
+    from .json_utils import SchemaValidationError, extract_json
+    from .usage import UsageTracker
+    from .single_flight import SingleFlight
 
 __all__ = [
     'AIInterface',
     'ContentProcessor',
     'PromptManager',
-    'LLMConnector'
+    'SQLitePromptStore',
+    'LLMConnector',
+    'BatchResult',
+    'RateLimiter',
+    'get_rate_limiter',
+    'MemoryCache',
+    'SQLiteCache',
+    'RetryPolicy',
+    'chunk_text',
+    'MapReduceSummarizer',
+    'SchemaValidationError',
+    'extract_json',
+    'UsageTracker',
+    'SingleFlight'
 ]
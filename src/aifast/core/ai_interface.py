@@ -1,9 +1,375 @@
+from functools import partial
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Union
+import time
+
+from .batch import BatchResult, aiter_batch, arun_batch, iter_batch, run_batch
+from .cache import BaseCache, make_cache_key
+from .rate_limiter import RateLimiter
+from .retry import RetryPolicy
+from .single_flight import SingleFlight
+from .usage import UsageTracker
+from ..providers.hedged import HedgedProvider
+from ..providers.types import CompletionResult, StreamEvent
+from ..utils.instrumentation import Instrumentation
+from ..utils.tokens import count_tokens
+
+
 class AIInterface:
-    def __init__(self, provider):
+    def __init__(self, provider, rate_limiter: Optional[RateLimiter] = None,
+                 cache: Optional[BaseCache] = None, hedge: Optional[Dict[str, Any]] = None,
+                 retry: Optional[RetryPolicy] = None, usage_tracker: Optional[UsageTracker] = None,
+                 return_metadata: bool = False, instrumentation: Optional[Instrumentation] = None,
+                 coalesce: Union[bool, SingleFlight] = False):
+        """
+        Wrap a provider. An optional RateLimiter (see get_rate_limiter) is
+        acquired before every request, blocking until it fits the budget.
+        An optional cache (MemoryCache, SQLiteCache) short-circuits repeated
+        identical requests; it is keyed on provider, model, input and params,
+        so only enable it where repeating an answer is acceptable.
+        Passing hedge (HedgedProvider options, e.g. {"alternate": other,
+        "percentile": 95, "budget": 0.05}) enables hedged requests; hedges
+        reserve from the rate limiter and the unused answer's usage is
+        tracked too.
+        An optional RetryPolicy retries rate-limit, overload and timeout
+        errors with backoff; each attempt goes through the rate limiter.
+        Token usage reported by the provider replaces the estimate reserved
+        in the rate limiter, and is added to usage_tracker if given.
+        With return_metadata=True, complete()/chat() and their async and
+        batch variants return CompletionResults instead of text; the
+        *_result methods always do.
+        An optional Instrumentation times the cache lookup, rate-limit
+        wait, provider call ("network"), whole call ("total") and, for
+        streams, time to first event and the whole stream.
+        With coalesce=True (or a SingleFlight shared between interfaces),
+        identical requests already in flight, keyed like the cache, wait
+        for that one provider call and share its result or error; their
+        CompletionResults are marked coalesced and carry no usage. Streams
+        are not coalesced.
+        """
+        self.provider_name = getattr(provider, "name", None) or type(provider).__name__
+        if hedge is not None:
+            provider = HedgedProvider(provider, **{"rate_limiter": rate_limiter, "usage_tracker": usage_tracker,
+                                                   **hedge})
         self.provider = provider
-    
-    def complete(self, prompt: str) -> str:
-        return self.provider.complete(prompt)
-    
-    def chat(self, messages: list) -> str:
-        return self.provider.chat(messages)
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.retry = retry
+        self.usage_tracker = usage_tracker
+        self.return_metadata = return_metadata
+        self.instrumentation = instrumentation
+        self.coalesce = SingleFlight() if coalesce is True else coalesce or None
+
+    def _request_tokens(self, text: str, kwargs: Dict) -> int:
+        model = getattr(self.provider, "model", None)
+        return count_tokens(text, self.provider_name, model) + kwargs.get('max_tokens', 0)
+
+    def _input_text(self, payload: Union[str, List[Dict[str, str]]]) -> str:
+        if isinstance(payload, str):
+            return payload
+        return "".join(msg["content"] for msg in payload)
+
+    def _cache_key(self, method: str, payload: Union[str, List[Dict[str, str]]], kwargs: Dict) -> str:
+        return make_cache_key(
+            self.provider_name,
+            getattr(self.provider, "model", None),
+            payload,
+            dict(kwargs, _method=method)
+        )
+
+    def _settle(self, reserved: int, result: CompletionResult) -> CompletionResult:
+        # Replace the reserved estimate with the tokens the provider actually counted
+        if reserved and result.usage is not None:
+            self.rate_limiter.reconcile(reserved, result.usage.total_tokens)
+        return result
+
+    def _stage(self, stage: str, func, *args):
+        return self.instrumentation.call(stage, self.provider_name, getattr(self.provider, "model", None),
+                                         func, *args)
+
+    async def _astage(self, stage: str, func, *args):
+        return await self.instrumentation.acall(stage, self.provider_name, getattr(self.provider, "model", None),
+                                                func, *args)
+
+    def _record_stage(self, stage: str, start: float, error: Optional[BaseException] = None):
+        self.instrumentation.record(stage, time.perf_counter() - start, self.provider_name,
+                                    getattr(self.provider, "model", None), error)
+
+    def _invoke(self, method: str, payload: Union[str, List[Dict[str, str]]], kwargs: Dict) -> CompletionResult:
+        # Stages are only timed with instrumentation; otherwise this is a plain call
+        timed = self.instrumentation is not None
+        reserved = 0
+        if self.rate_limiter is not None:
+            reserved = self._request_tokens(self._input_text(payload), kwargs)
+            if timed:
+                self._stage("rate_limit", self.rate_limiter.acquire, reserved)
+            else:
+                self.rate_limiter.acquire(reserved)
+        provider_call = getattr(self.provider, method + "_result")
+        if timed:
+            result = self._stage("network", partial(provider_call, payload, **kwargs))
+        else:
+            result = provider_call(payload, **kwargs)
+        return self._settle(reserved, result)
+
+    async def _ainvoke(self, method: str, payload: Union[str, List[Dict[str, str]]],
+                       kwargs: Dict) -> CompletionResult:
+        timed = self.instrumentation is not None
+        reserved = 0
+        if self.rate_limiter is not None:
+            reserved = self._request_tokens(self._input_text(payload), kwargs)
+            if timed:
+                await self._astage("rate_limit", self.rate_limiter.aacquire, reserved)
+            else:
+                await self.rate_limiter.aacquire(reserved)
+        provider_call = getattr(self.provider, "a" + method + "_result")
+        if timed:
+            result = await self._astage("network", partial(provider_call, payload, **kwargs))
+        else:
+            result = await provider_call(payload, **kwargs)
+        return self._settle(reserved, result)
+
+    def _cached_result(self, text: str) -> CompletionResult:
+        return CompletionResult(text, None, getattr(self.provider, "model", None), self.provider_name, cached=True)
+
+    def _coalesced_result(self, result: CompletionResult, start: float) -> CompletionResult:
+        # The tokens were spent (and recorded) by the call that ran
+        return CompletionResult(result.text, None, result.model, result.provider,
+                                time.perf_counter() - start, coalesced=True)
+
+    def _record(self, result: CompletionResult) -> CompletionResult:
+        if self.usage_tracker is not None:
+            self.usage_tracker.record(result)
+        return result
+
+    def _call(self, method: str, payload: Union[str, List[Dict[str, str]]], kwargs: Dict) -> CompletionResult:
+        if self.instrumentation is None:
+            return self._run(method, payload, kwargs)
+        return self._stage("total", self._run, method, payload, kwargs)
+
+    async def _acall(self, method: str, payload: Union[str, List[Dict[str, str]]], kwargs: Dict) -> CompletionResult:
+        if self.instrumentation is None:
+            return await self._arun(method, payload, kwargs)
+        return await self._astage("total", self._arun, method, payload, kwargs)
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        if self.instrumentation is None:
+            return self.cache.get(key)
+        return self._stage("cache", self.cache.get, key)
+
+    def _run(self, method: str, payload: Union[str, List[Dict[str, str]]], kwargs: Dict) -> CompletionResult:
+        key = None
+        if self.cache is not None or self.coalesce is not None:
+            key = self._cache_key(method, payload, kwargs)
+        if self.cache is not None:
+            cached = self._cache_get(key)
+            if cached is not None:
+                return self._record(self._cached_result(cached))
+        if self.coalesce is None:
+            return self._record(self._fetch(method, payload, kwargs, key))
+        start = time.perf_counter()
+        result, shared = self.coalesce.do(key, self._fetch, method, payload, kwargs, key)
+        if shared:
+            return self._record(self._coalesced_result(result, start))
+        return self._record(result)
+
+    async def _arun(self, method: str, payload: Union[str, List[Dict[str, str]]], kwargs: Dict) -> CompletionResult:
+        key = None
+        if self.cache is not None or self.coalesce is not None:
+            key = self._cache_key(method, payload, kwargs)
+        if self.cache is not None:
+            cached = self._cache_get(key)
+            if cached is not None:
+                return self._record(self._cached_result(cached))
+        if self.coalesce is None:
+            return self._record(await self._afetch(method, payload, kwargs, key))
+        start = time.perf_counter()
+        result, shared = await self.coalesce.ado(key, self._afetch, method, payload, kwargs, key)
+        if shared:
+            return self._record(self._coalesced_result(result, start))
+        return self._record(result)
+
+    def _fetch(self, method: str, payload: Union[str, List[Dict[str, str]]], kwargs: Dict,
+               key: Optional[str]) -> CompletionResult:
+        if self.retry is not None:
+            result = self.retry.call(self._invoke, method, payload, kwargs)
+        else:
+            result = self._invoke(method, payload, kwargs)
+        if self.cache is not None:
+            self.cache.set(key, result.text)
+        return result
+
+    async def _afetch(self, method: str, payload: Union[str, List[Dict[str, str]]], kwargs: Dict,
+                      key: Optional[str]) -> CompletionResult:
+        if self.retry is not None:
+            result = await self.retry.acall(self._ainvoke, method, payload, kwargs)
+        else:
+            result = await self._ainvoke(method, payload, kwargs)
+        if self.cache is not None:
+            self.cache.set(key, result.text)
+        return result
+
+    def _output(self, result: CompletionResult) -> Union[str, CompletionResult]:
+        return result if self.return_metadata else result.text
+
+    def _finish_stream(self, event: StreamEvent, reserved: int, start: float):
+        if not event.done:
+            return
+        result = CompletionResult("", event.usage, event.model or getattr(self.provider, "model", None),
+                                  self.provider_name, time.perf_counter() - start)
+        self._record(self._settle(reserved, result))
+
+    def _stream(self, method: str, payload: Union[str, List[Dict[str, str]]], kwargs: Dict) -> Iterator[StreamEvent]:
+        # Streams are served from the cache on a hit but never populate it:
+        # concatenated deltas are not always identical to the non-streamed text
+        if self.cache is not None:
+            cached = self._cache_get(self._cache_key(method, payload, kwargs))
+            if cached is not None:
+                self._record(self._cached_result(cached))
+                yield StreamEvent(cached)
+                yield StreamEvent(done=True, model=getattr(self.provider, "model", None))
+                return
+        timed = self.instrumentation is not None
+        reserved = 0
+        if self.rate_limiter is not None:
+            reserved = self._request_tokens(self._input_text(payload), kwargs)
+            if timed:
+                self._stage("rate_limit", self.rate_limiter.acquire, reserved)
+            else:
+                self.rate_limiter.acquire(reserved)
+        start = time.perf_counter()
+        first = True
+        try:
+            for event in getattr(self.provider, "stream_" + method)(payload, **kwargs):
+                if first and timed:
+                    self._record_stage("first_event", start)
+                first = False
+                self._finish_stream(event, reserved, start)
+                yield event
+        except Exception as e:
+            if timed:
+                self._record_stage("stream", start, e)
+            raise
+        if timed:
+            self._record_stage("stream", start)
+
+    async def _astream(self, method: str, payload: Union[str, List[Dict[str, str]]],
+                       kwargs: Dict) -> AsyncIterator[StreamEvent]:
+        if self.cache is not None:
+            cached = self._cache_get(self._cache_key(method, payload, kwargs))
+            if cached is not None:
+                self._record(self._cached_result(cached))
+                yield StreamEvent(cached)
+                yield StreamEvent(done=True, model=getattr(self.provider, "model", None))
+                return
+        timed = self.instrumentation is not None
+        reserved = 0
+        if self.rate_limiter is not None:
+            reserved = self._request_tokens(self._input_text(payload), kwargs)
+            if timed:
+                await self._astage("rate_limit", self.rate_limiter.aacquire, reserved)
+            else:
+                await self.rate_limiter.aacquire(reserved)
+        start = time.perf_counter()
+        first = True
+        try:
+            async for event in getattr(self.provider, "astream_" + method)(payload, **kwargs):
+                if first and timed:
+                    self._record_stage("first_event", start)
+                first = False
+                self._finish_stream(event, reserved, start)
+                yield event
+        except Exception as e:
+            if timed:
+                self._record_stage("stream", start, e)
+            raise
+        if timed:
+            self._record_stage("stream", start)
+
+    def complete(self, prompt: str, **kwargs) -> Union[str, CompletionResult]:
+        return self._output(self._call("complete", prompt, kwargs))
+
+    def chat(self, messages: List[Dict[str, str]], **kwargs) -> Union[str, CompletionResult]:
+        return self._output(self._call("chat", messages, kwargs))
+
+    async def acomplete(self, prompt: str, **kwargs) -> Union[str, CompletionResult]:
+        """Async counterpart of complete(); safe to fan out on one event loop."""
+        return self._output(await self._acall("complete", prompt, kwargs))
+
+    async def achat(self, messages: List[Dict[str, str]], **kwargs) -> Union[str, CompletionResult]:
+        """Async counterpart of chat()."""
+        return self._output(await self._acall("chat", messages, kwargs))
+
+    def complete_result(self, prompt: str, **kwargs) -> CompletionResult:
+        """complete() with token usage, model, provider and latency."""
+        return self._call("complete", prompt, kwargs)
+
+    def chat_result(self, messages: List[Dict[str, str]], **kwargs) -> CompletionResult:
+        """chat() with token usage, model, provider and latency."""
+        return self._call("chat", messages, kwargs)
+
+    async def acomplete_result(self, prompt: str, **kwargs) -> CompletionResult:
+        """Async counterpart of complete_result()."""
+        return await self._acall("complete", prompt, kwargs)
+
+    async def achat_result(self, messages: List[Dict[str, str]], **kwargs) -> CompletionResult:
+        """Async counterpart of chat_result()."""
+        return await self._acall("chat", messages, kwargs)
+
+    def stream_complete(self, prompt: str, **kwargs) -> Iterator[StreamEvent]:
+        """
+        Yield StreamEvent text deltas as they arrive, ending with a done
+        event that carries usage metadata.
+        """
+        return self._stream("complete", prompt, kwargs)
+
+    def stream_chat(self, messages: List[Dict[str, str]], **kwargs) -> Iterator[StreamEvent]:
+        """Streaming counterpart of chat(); see stream_complete()."""
+        return self._stream("chat", messages, kwargs)
+
+    def astream_complete(self, prompt: str, **kwargs) -> AsyncIterator[StreamEvent]:
+        """Async-iterator counterpart of stream_complete()."""
+        return self._astream("complete", prompt, kwargs)
+
+    def astream_chat(self, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[StreamEvent]:
+        """Async-iterator counterpart of stream_chat()."""
+        return self._astream("chat", messages, kwargs)
+
+    def complete_many(self, prompts: Iterable[str], max_workers: int = 8, ordered: bool = True,
+                      **kwargs) -> Union[List[BatchResult], Iterator[BatchResult]]:
+        """
+        Run complete() over many prompts on a bounded thread pool.
+        Returns a list in input order, or with ordered=False an iterator
+        yielding results as they finish. Errors are captured per item.
+        """
+        func = partial(self.complete, **kwargs)
+        if ordered:
+            return run_batch(func, prompts, max_workers=max_workers)
+        return iter_batch(func, prompts, max_workers=max_workers)
+
+    def chat_many(self, conversations: Iterable[List[Dict[str, str]]], max_workers: int = 8,
+                  ordered: bool = True, **kwargs) -> Union[List[BatchResult], Iterator[BatchResult]]:
+        """Run chat() over many message lists; see complete_many()."""
+        func = partial(self.chat, **kwargs)
+        if ordered:
+            return run_batch(func, conversations, max_workers=max_workers)
+        return iter_batch(func, conversations, max_workers=max_workers)
+
+    async def acomplete_many(self, prompts: Iterable[str], max_concurrency: int = 32,
+                             **kwargs) -> List[BatchResult]:
+        """Run acomplete() over many prompts with a bounded number in flight."""
+        return await arun_batch(partial(self.acomplete, **kwargs), prompts, max_concurrency=max_concurrency)
+
+    async def achat_many(self, conversations: Iterable[List[Dict[str, str]]], max_concurrency: int = 32,
+                         **kwargs) -> List[BatchResult]:
+        """Run achat() over many message lists with a bounded number in flight."""
+        return await arun_batch(partial(self.achat, **kwargs), conversations, max_concurrency=max_concurrency)
+
+    def acomplete_iter(self, prompts: Iterable[str], max_concurrency: int = 32,
+                       **kwargs) -> AsyncIterator[BatchResult]:
+        """Async iterator over acomplete() results in completion order."""
+        return aiter_batch(partial(self.acomplete, **kwargs), prompts, max_concurrency=max_concurrency)
+
+    def achat_iter(self, conversations: Iterable[List[Dict[str, str]]], max_concurrency: int = 32,
+                   **kwargs) -> AsyncIterator[BatchResult]:
+        """Async iterator over achat() results in completion order."""
+        return aiter_batch(partial(self.achat, **kwargs), conversations, max_concurrency=max_concurrency)
@@ -0,0 +1,105 @@
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Iterator, List, Optional
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import asyncio
+
+
+class BatchResult:
+    """Outcome of one item in a batch call; failures are captured, not raised."""
+    __slots__ = ("index", "input", "value", "error")
+
+    def __init__(self, index: int, input: Any, value: Any = None, error: Optional[BaseException] = None):
+        self.index = index
+        self.input = input
+        self.value = value
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def unwrap(self) -> Any:
+        """Return the value, re-raising the captured error if the item failed."""
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+    def __repr__(self) -> str:
+        if self.error is not None:
+            return f"BatchResult(index={self.index}, error={self.error!r})"
+        return f"BatchResult(index={self.index}, value={self.value!r})"
+
+
+def _run_one(func: Callable[[Any], Any], index: int, item: Any) -> BatchResult:
+    try:
+        return BatchResult(index, item, value=func(item))
+    except Exception as e:
+        return BatchResult(index, item, error=e)
+
+
+def iter_batch(func: Callable[[Any], Any], items: Iterable[Any], max_workers: int = 8) -> Iterator[BatchResult]:
+    """
+    Run func over items on a thread pool, yielding results as they complete.
+    At most 2 * max_workers items are in flight, so items may be a lazy iterable
+    of any length.
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+
+    window = max_workers * 2
+    source = enumerate(items)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = set()
+        for index, item in source:
+            pending.add(executor.submit(_run_one, func, index, item))
+            if len(pending) >= window:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def run_batch(func: Callable[[Any], Any], items: Iterable[Any], max_workers: int = 8) -> List[BatchResult]:
+    """Run func over items on a thread pool and return results in input order."""
+    results = list(iter_batch(func, items, max_workers=max_workers))
+    results.sort(key=lambda result: result.index)
+    return results
+
+
+async def aiter_batch(func: Callable[[Any], Awaitable[Any]], items: Iterable[Any],
+                      max_concurrency: int = 32) -> AsyncIterator[BatchResult]:
+    """Await func over items with bounded concurrency, yielding results as they complete."""
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+    async def run_one(index: int, item: Any) -> BatchResult:
+        try:
+            return BatchResult(index, item, value=await func(item))
+        except Exception as e:
+            return BatchResult(index, item, error=e)
+
+    pending = set()
+    try:
+        for index, item in enumerate(items):
+            pending.add(asyncio.ensure_future(run_one(index, item)))
+            if len(pending) >= max_concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def arun_batch(func: Callable[[Any], Awaitable[Any]], items: Iterable[Any],
+                     max_concurrency: int = 32) -> List[BatchResult]:
+    """Await func over items with bounded concurrency and return results in input order."""
+    results = [result async for result in aiter_batch(func, items, max_concurrency=max_concurrency)]
+    results.sort(key=lambda result: result.index)
+    return results
@@ -0,0 +1,266 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+
+
+def make_cache_key(provider: str, model: Optional[str], messages: Any, params: Dict[str, Any]) -> str:
+    """
+    Canonical hash of a request. Keys and params are serialized with sorted
+    keys and fixed separators so equivalent requests always hash the same.
+    """
+    payload = json.dumps(
+        [provider, model, messages, params],
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CacheStats:
+    """Thread-safe hit/miss/eviction counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def record(self, hits: int = 0, misses: int = 0, evictions: int = 0, expirations: int = 0):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.evictions += evictions
+            self.expirations += expirations
+
+    def to_dict(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+class BaseCache(ABC):
+    """Completion cache interface. get() returns None on a miss."""
+
+    def __init__(self):
+        self.stats = CacheStats()
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any):
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+
+class MemoryCache(BaseCache):
+    """In-process LRU cache with optional TTL (seconds). Safe to share across threads."""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        super().__init__()
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.stats.record(misses=1)
+                return None
+            value, expires = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._data[key]
+                self.stats.record(misses=1, expirations=1)
+                return None
+            self._data.move_to_end(key)
+        self.stats.record(hits=1)
+        return value
+
+    def set(self, key: str, value: Any):
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        evicted = 0
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                evicted += 1
+        if evicted:
+            self.stats.record(evictions=evicted)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class _Connection(sqlite3.Connection):
+    """sqlite3.Connection that can be weakly referenced (the base class cannot)."""
+
+
+class SQLiteCache(BaseCache):
+    """
+    Persistent cache in a SQLite file with optional TTL and LRU size bound.
+    SQLite's file locking makes it safe to share between processes; each
+    thread gets its own connection. Values must be JSON-serializable.
+
+    Once maxsize is exceeded, the least recently used rows are evicted in
+    batches of evict_fraction of maxsize, so the table holds between about
+    (1 - evict_fraction) * maxsize and maxsize rows. The row count is kept
+    in the file itself by triggers, so the bound holds across every handle
+    and process writing to it. A hit refreshes its access time at most once
+    per touch_interval seconds, so repeated hits do not each write.
+    """
+
+    def __init__(self, path: str, ttl: Optional[float] = None, maxsize: Optional[int] = None,
+                 evict_fraction: float = 0.1, touch_interval: float = 60.0):
+        super().__init__()
+        if maxsize is not None and maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.path = os.fspath(path)
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.touch_interval = touch_interval
+        self._evict_batch = int(maxsize * evict_fraction) if maxsize is not None else 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Weak, so connections of finished threads are still closed when collected
+        self._connections: "weakref.WeakSet[_Connection]" = weakref.WeakSet()
+        conn = self._connect()
+        # One write transaction, so a file created by an older version is counted exactly once
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires REAL, accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS completions_accessed ON completions (accessed)")
+            conn.execute("CREATE TABLE IF NOT EXISTS completions_count ("
+                         "id INTEGER PRIMARY KEY CHECK (id = 0), rows INTEGER NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO completions_count VALUES (0, (SELECT COUNT(*) FROM completions))")
+            conn.execute("CREATE TRIGGER IF NOT EXISTS completions_insert AFTER INSERT ON completions "
+                         "BEGIN UPDATE completions_count SET rows = rows + 1; END")
+            conn.execute("CREATE TRIGGER IF NOT EXISTS completions_delete AFTER DELETE ON completions "
+                         "BEGIN UPDATE completions_count SET rows = rows - 1; END")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # check_same_thread=False only so close() can close every thread's connection
+            conn = sqlite3.connect(self.path, timeout=30, factory=_Connection, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.add(conn)
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute("SELECT value, expires, accessed FROM completions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.stats.record(misses=1)
+            return None
+        value, expires, accessed = row
+        if expires is not None and expires <= now:
+            with conn:
+                conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+            self.stats.record(misses=1, expirations=1)
+            return None
+        # Access times only order LRU eviction, so without maxsize they are never refreshed
+        if self.maxsize is not None and now - accessed >= self.touch_interval:
+            with conn:
+                conn.execute("UPDATE completions SET accessed = ? WHERE key = ?", (now, key))
+        self.stats.record(hits=1)
+        return json.loads(value)
+
+    def set(self, key: str, value: Any):
+        conn = self._connect()
+        now = time.time()
+        expires = now + self.ttl if self.ttl is not None else None
+        evicted = 0
+        with conn:
+            # An upsert rather than INSERT OR REPLACE: replacing would skip the delete trigger
+            conn.execute(
+                "INSERT INTO completions (key, value, expires, accessed) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, "
+                "expires = excluded.expires, accessed = excluded.accessed",
+                (key, json.dumps(value), expires, now)
+            )
+            if self.maxsize is not None:
+                rows = conn.execute("SELECT rows FROM completions_count").fetchone()[0]
+                if rows > self.maxsize:
+                    evicted = self._evict(conn, rows)
+        if evicted > 0:
+            self.stats.record(evictions=evicted)
+
+    def _evict(self, conn: sqlite3.Connection, rows: int) -> int:
+        """Drop the least recently used rows down to maxsize minus one eviction batch."""
+        return conn.execute(
+            "DELETE FROM completions WHERE key IN ("
+            "SELECT key FROM completions ORDER BY accessed LIMIT ?)",
+            (rows - self.maxsize + self._evict_batch,)
+        ).rowcount
+
+    def purge_expired(self) -> int:
+        """Delete expired rows; returns how many were removed."""
+        conn = self._connect()
+        with conn:
+            removed = conn.execute(
+                "DELETE FROM completions WHERE expires IS NOT NULL AND expires <= ?", (time.time(),)
+            ).rowcount
+        if removed > 0:
+            self.stats.record(expirations=removed)
+        return removed
+
+    def clear(self):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM completions")
+
+    def close(self):
+        """
+        Close every thread's connection. The cache stays usable: the next
+        call from any thread opens a fresh connection.
+        """
+        with self._lock:
+            connections = list(self._connections)
+            self._connections = weakref.WeakSet()
+            self._local = threading.local()
+        for conn in connections:
+            conn.close()
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT rows FROM completions_count").fetchone()[0]
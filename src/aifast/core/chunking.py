@@ -0,0 +1,108 @@
+from typing import Iterator, List, NamedTuple, Optional, Pattern, Tuple
+import re
+
+from ..utils.tokens import Tokenizer, get_tokenizer
+
+_PARAGRAPH_BREAK = re.compile(r'\n[^\S\n]*\n\s*')
+_SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+')
+
+
+class _Unit(NamedTuple):
+    start: int
+    end: int
+    tokens: int
+    gap: int  # tokens of the whitespace separating it from the previous unit
+
+
+def _segments(text: str, start: int, end: int, pattern: Pattern) -> Iterator[Tuple[int, int]]:
+    """Non-blank spans of text[start:end] between separator matches, trimmed of whitespace."""
+    pos = start
+    bounds = [(m.start(), m.end()) for m in pattern.finditer(text, start, end)] + [(end, end)]
+    for sep_start, sep_end in bounds:
+        seg_start, seg_end = pos, sep_start
+        while seg_start < seg_end and text[seg_start].isspace():
+            seg_start += 1
+        while seg_end > seg_start and text[seg_end - 1].isspace():
+            seg_end -= 1
+        if seg_start < seg_end:
+            yield seg_start, seg_end
+        pos = sep_end
+
+
+def _hard_split(text: str, start: int, end: int, max_tokens: int,
+                tokenizer: Tokenizer) -> Iterator[Tuple[int, int, int]]:
+    """Split a span with no usable sentence boundary into pieces of at most max_tokens."""
+    pos = start
+    while pos < end:
+        piece = tokenizer.truncate(text[pos:end], max_tokens) or text[pos]
+        piece_end = pos + len(piece)
+        yield pos, piece_end, tokenizer.count(piece)
+        pos = piece_end
+        while pos < end and text[pos].isspace():
+            pos += 1
+
+
+def _units(text: str, max_tokens: int, tokenizer: Tokenizer) -> List[_Unit]:
+    """Paragraphs that fit in max_tokens, else their sentences, else token-bounded pieces."""
+    spans = []
+    for para_start, para_end in _segments(text, 0, len(text), _PARAGRAPH_BREAK):
+        tokens = tokenizer.count(text[para_start:para_end])
+        if tokens <= max_tokens:
+            spans.append((para_start, para_end, tokens))
+            continue
+        for sent_start, sent_end in _segments(text, para_start, para_end, _SENTENCE_BREAK):
+            tokens = tokenizer.count(text[sent_start:sent_end])
+            if tokens <= max_tokens:
+                spans.append((sent_start, sent_end, tokens))
+            else:
+                spans.extend(_hard_split(text, sent_start, sent_end, max_tokens, tokenizer))
+    units = []
+    previous_end = None
+    for start, end, tokens in spans:
+        gap = tokenizer.count(text[previous_end:start]) if previous_end is not None else 0
+        units.append(_Unit(start, end, tokens, gap))
+        previous_end = end
+    return units
+
+
+def chunk_text(text: str, max_tokens: int, overlap: int = 0, provider: Optional[str] = None,
+               model: Optional[str] = None, tokenizer: Optional[Tokenizer] = None) -> List[str]:
+    """
+    Split text into chunks of at most max_tokens tokens (for the given
+    provider/model tokenizer), breaking at paragraph boundaries where
+    possible, then at sentence boundaries, and only splitting inside a
+    sentence that is longer than a chunk. Each chunk after the first
+    repeats up to overlap tokens of whole paragraphs/sentences from the end
+    of the previous one. Chunks are slices of the original text.
+    """
+    if max_tokens < 1:
+        raise ValueError("max_tokens must be at least 1")
+    if not 0 <= overlap < max_tokens:
+        raise ValueError("overlap must be between 0 and max_tokens - 1")
+    tokenizer = tokenizer or get_tokenizer(provider, model)
+
+    chunks = []
+    current: List[_Unit] = []
+    used = 0
+    for unit in _units(text, max_tokens, tokenizer):
+        if current and used + unit.gap + unit.tokens > max_tokens:
+            chunks.append(text[current[0].start:current[-1].end])
+            # Carry trailing units as overlap, never the whole chunk
+            carried = []
+            carried_tokens = 0
+            for previous in reversed(current[1:]):
+                cost = previous.tokens + (carried[0].gap if carried else 0)
+                if carried_tokens + cost > overlap:
+                    break
+                carried.insert(0, previous)
+                carried_tokens += cost
+            while carried and carried_tokens + unit.gap + unit.tokens > max_tokens:
+                dropped = carried.pop(0)
+                carried_tokens -= dropped.tokens + (carried[0].gap if carried else 0)
+            current = carried
+            used = carried_tokens
+        used += unit.tokens + (unit.gap if current else 0)
+        current.append(unit)
+    if current:
+        chunks.append(text[current[0].start:current[-1].end])
+    return chunks
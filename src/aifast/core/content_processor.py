@@ -1,37 +1,341 @@
-from typing import List, Any
+from typing import Callable, Dict, IO, Iterable, Iterator, List, Any, Optional, Sequence, Tuple, Union
+import os
 import re
+import time
+
+from .chunking import chunk_text
+from ..utils.tokens import count_tokens, truncate_to_tokens
+
+_WHITESPACE = re.compile(r'\s+')
+_SPECIAL_CHARS = re.compile(r'[^a-zA-Z0-9\s]')
+
+# Byte tables for the ASCII fast path: lowercase and special-char removal in one bytes.translate
+_ASCII_LOWER = bytes(range(128)).lower() + bytes(range(128, 256))
+_ASCII_SPECIAL = bytes(c for c in range(128) if _SPECIAL_CHARS.match(chr(c)))
+
+# Character-level steps that can be fused into one translate pass
+_CHAR_STEPS: Dict[str, Callable[[str], str]] = {
+    'lowercase': str.lower,
+    'remove_special_chars': lambda text: _SPECIAL_CHARS.sub('', text)
+}
+
+
+def _clean(text: str) -> str:
+    # str.split() splits on exactly the characters \s matches, and drops the ends
+    return ' '.join(text.split())
+
+
+def _char_stage(names: List[str]) -> Callable[[str], str]:
+    """
+    Consecutive lowercase/remove_special_chars steps as one pass over ASCII
+    text. Non-ASCII text goes through the steps in order (str.lower and the
+    precompiled pattern beat a per-character translate table there).
+    """
+    funcs = [_CHAR_STEPS[name] for name in names]
+    if len(funcs) == 1 and names[0] == 'lowercase':
+        return str.lower
+    ascii_table = _ASCII_LOWER if 'lowercase' in names else None
+    ascii_delete = _ASCII_SPECIAL if 'remove_special_chars' in names else b''
+
+    def run(text: str) -> str:
+        if text.isascii():
+            # Within ASCII the kept set is closed under lowercasing, so order does not matter
+            return text.encode('ascii').translate(ascii_table, ascii_delete).decode('ascii')
+        for func in funcs:
+            text = func(text)
+        return text
+
+    return run
+
+
+def _iter_chunks(source: Union[str, os.PathLike, IO[str], Iterable[str]], chunk_size: int) -> Iterator[str]:
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'r', encoding='utf-8') as f:
+            yield from iter(lambda: f.read(chunk_size), '')
+    elif hasattr(source, 'read'):
+        yield from iter(lambda: source.read(chunk_size), '')
+    else:
+        yield from source
+
+
+# Longest run of non-whitespace carried between chunks before it is cut anyway
+_MAX_CARRY = 1 << 20
+
+
+def _split_at_whitespace(chunks: Iterable[str], max_carry: int = _MAX_CARRY) -> Iterator[str]:
+    """
+    Re-cut a chunk stream so every piece after the first starts with
+    whitespace and no word is split: the last whitespace character of each
+    chunk and the word after it are carried into the next piece. A word
+    longer than max_carry is the exception; it is emitted in parts, and the
+    part that continues it starts without whitespace.
+    """
+    carry: List[str] = []
+    carried = 0
+    for chunk in chunks:
+        if not chunk:
+            continue
+        word = 0 if chunk[-1].isspace() else len(chunk.rsplit(None, 1)[-1])
+        if word == len(chunk):
+            # No whitespace: the word goes on; parts are joined once it ends
+            carry.append(chunk)
+            carried += word
+            if carried > max_carry:
+                yield ''.join(carry)
+                carry, carried = [], 0
+            continue
+        cut = len(chunk) - word - 1
+        piece = ''.join(carry) + chunk[:cut] if carry else chunk[:cut]
+        if piece:
+            yield piece
+        carry, carried = [chunk[cut:]], word + 1
+    if carry:
+        yield ''.join(carry)
+
+
+# Pipeline compiled once per worker process by _init_worker
+_worker_pipeline: Optional[Callable[[Any], Any]] = None
+
+
+def _init_worker(processor: 'ContentProcessor', pipeline: Sequence[Any]):
+    global _worker_pipeline
+    _worker_pipeline = processor.compile_pipeline(pipeline)
+
+
+def _run_worker_pipeline(text: Any) -> Any:
+    return _worker_pipeline(text)
+
+
+class CompiledPipeline:
+    """
+    A validated processing pipeline. Steps are resolved once, and adjacent
+    character-level steps are fused into a single pass; calling it applies
+    the pipeline with the same result as ContentProcessor.process.
+    """
+    __slots__ = ('steps', '_stages')
+
+    def __init__(self, steps: Tuple[str, ...], stages: List[Callable[[Any], Any]]):
+        self.steps = steps
+        self._stages = tuple(stages)
+
+    def __call__(self, content: Any) -> Any:
+        for stage in self._stages:
+            content = stage(content)
+        return content
+
+    def __repr__(self) -> str:
+        return f"CompiledPipeline({list(self.steps)!r})"
+
 
 class ContentProcessor:
     def __init__(self):
         self.pipeline = []
-    
+        self._compiled: Dict[Tuple[str, ...], CompiledPipeline] = {}
+        self.last_batch_stats: Optional[Dict[str, Any]] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Compiled pipelines hold closures; worker processes compile their own
+        state = self.__dict__.copy()
+        state['_compiled'] = {}
+        return state
+
     def add_processor(self, processor_func):
         self.pipeline.append(processor_func)
-    
+
     def process(self, content: str, pipeline: List[str] = None) -> Any:
         if pipeline:
-            for step in pipeline:
-                if hasattr(self, step):
-                    content = getattr(self, step)(content)
+            key = tuple(pipeline)
+            compiled = self._compiled.get(key)
+            if compiled is None:
+                compiled = self._compiled[key] = self.compile_pipeline(key, strict=False)
+            content = compiled(content)
         return content
-    
+
+    def _is_builtin(self, name: str) -> bool:
+        """True if a step still has its stock implementation (not overridden by a subclass or instance)."""
+        return name not in self.__dict__ and getattr(type(self), name) is getattr(ContentProcessor, name)
+
+    def compile_pipeline(self, pipeline: Sequence[Union[str, Callable[[Any], Any]]],
+                         strict: bool = True) -> CompiledPipeline:
+        """
+        Compile a pipeline of step names (or callables) into a reusable callable.
+        Unknown steps raise ValueError, as does a step after 'tokenize' (which
+        returns a list); with strict=False unknown steps are skipped, as process() does.
+        """
+        stages: List[Callable[[Any], Any]] = []
+        chars: List[str] = []
+        steps = []
+        for step in pipeline:
+            if steps and steps[-1] == 'tokenize':
+                raise ValueError("'tokenize' returns a list and must be the last pipeline step")
+            if callable(step):
+                func = step
+            elif isinstance(step, str) and not step.startswith('_') and callable(getattr(self, step, None)):
+                if step in _CHAR_STEPS and self._is_builtin(step):
+                    chars.append(step)
+                    steps.append(step)
+                    continue
+                func = _clean if step == 'clean' and self._is_builtin(step) else getattr(self, step)
+            elif strict:
+                raise ValueError(f"Unknown pipeline step: {step!r}")
+            else:
+                continue
+            if chars:
+                stages.append(_char_stage(chars))
+                chars = []
+            stages.append(func)
+            steps.append(step)
+        if chars:
+            stages.append(_char_stage(chars))
+        return CompiledPipeline(tuple(steps), stages)
+
+    def process_batch(self, texts: Iterable[Any], pipeline: List[str], workers: Optional[int] = None,
+                      chunksize: Optional[int] = None, min_parallel: int = 5000) -> List[Any]:
+        """
+        Run a pipeline over many texts across worker processes, returning
+        results in input order. Items are dispatched to workers in chunks to
+        amortize inter-process overhead; batches smaller than min_parallel
+        (or workers=1) run in-process, where a pool would cost more than it
+        saves. Custom steps must be picklable. Throughput of the last call is
+        kept in last_batch_stats.
+        """
+        texts = texts if isinstance(texts, list) else list(texts)
+        compiled = self.compile_pipeline(pipeline)
+        workers = workers or os.cpu_count() or 1
+        parallel = workers > 1 and len(texts) >= min_parallel
+        start = time.perf_counter()
+        if parallel:
+            if chunksize is None:
+                chunksize = max(1, min(10000, len(texts) // (workers * 4)))
+            # Imported here: multiprocessing is only needed for parallel batches
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(self, list(pipeline))) as executor:
+                results = list(executor.map(_run_worker_pipeline, texts, chunksize=chunksize))
+        else:
+            results = [compiled(text) for text in texts]
+        seconds = time.perf_counter() - start
+        self.last_batch_stats = {
+            'items': len(texts),
+            'seconds': seconds,
+            'items_per_sec': len(texts) / seconds if seconds > 0 else None,
+            'workers': workers if parallel else 1,
+            'parallel': parallel
+        }
+        return results
+
+    def process_stream(self, source: Union[str, os.PathLike, IO[str], Iterable[str]], pipeline: List[str],
+                       chunk_size: int = 1 << 16) -> Iterator[Any]:
+        """
+        Run a pipeline over a file path, text file object or iterable of
+        string chunks without loading it whole. Input is re-cut at whitespace
+        so words are not split, and memory stays bounded by chunk_size (plus
+        the longest word, up to _MAX_CARRY characters). Yields processed text
+        pieces whose concatenation equals process() on the whole text; a final
+        'tokenize' yields a token list per piece and a final 'summarize' yields
+        one string, reading only as far as it needs. Custom or overridden steps are applied per piece.
+        """
+        steps = list(pipeline)
+        terminal = None
+        if steps and steps[-1] in ('summarize', 'tokenize') and self._is_builtin(steps[-1]):
+            terminal = steps.pop()
+        if any(step in ('summarize', 'tokenize') for step in steps):
+            raise ValueError("'summarize' and 'tokenize' must be the last step of a streaming pipeline")
+        clean_at = None
+        if self._is_builtin('clean'):
+            clean_at = max((i for i, step in enumerate(steps) if step == 'clean'), default=None)
+        if clean_at is None:
+            head, tail = None, self.compile_pipeline(steps)
+        else:
+            head = self.compile_pipeline(steps[:clean_at])
+            tail = self.compile_pipeline(steps[clean_at + 1:])
+
+        chunks = _iter_chunks(source, chunk_size)
+        try:
+            pieces = self._stream_pieces(_split_at_whitespace(chunks, _MAX_CARRY), head, tail)
+            if terminal == 'summarize':
+                yield self._summarize_stream(pieces)
+            elif terminal == 'tokenize':
+                for piece in pieces:
+                    tokens = piece.split()
+                    if tokens:
+                        yield tokens
+            else:
+                yield from pieces
+        finally:
+            chunks.close()
+
+    def _stream_pieces(self, pieces: Iterator[str], head, tail) -> Iterator[str]:
+        if head is None:
+            # Without clean, whitespace-aligned pieces process independently and simply concatenate
+            for piece in pieces:
+                piece = tail(piece)
+                if piece:
+                    yield piece
+            return
+        # head runs the steps before the last clean, which strips each piece, so
+        # the single space between non-empty pieces is restored here
+        emitted = False
+        space = False
+        for raw in pieces:
+            text = head(raw)
+            # Only the rest of an over-long word starts without whitespace
+            space = space or raw[:1].isspace() or text[:1].isspace()
+            piece = _clean(text)
+            if not piece:
+                space = space or bool(text)
+                continue
+            piece = tail(piece)
+            yield ' ' + piece if emitted and space else piece
+            emitted = True
+            space = text[-1:].isspace()
+
+    def _summarize_stream(self, pieces: Iterator[str], max_length: int = 100) -> str:
+        parts = []
+        words = []
+        for piece in pieces:
+            parts.append(piece)
+            words.extend(piece.split())
+            if len(words) > max_length:
+                return ' '.join(words[:max_length]) + '...'
+        return ''.join(parts)
+
     def clean(self, text: str) -> str:
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
+        text = _WHITESPACE.sub(' ', text)
         return text.strip()
-    
+
     def tokenize(self, text: str) -> List[str]:
         # Basic word tokenization
         return text.split()
-    
+
     def remove_special_chars(self, text: str) -> str:
         # Remove special characters
-        return re.sub(r'[^a-zA-Z0-9\s]', '', text)
-    
+        return _SPECIAL_CHARS.sub('', text)
+
     def lowercase(self, text: str) -> str:
         return text.lower()
-    
-    def summarize(self, text: str, max_length: int = 100) -> str:
+
+    def count_tokens(self, text: str, provider: Optional[str] = None, model: Optional[str] = None) -> int:
+        """Model tokens in text (see aifast.utils.tokens.get_tokenizer)."""
+        return count_tokens(text, provider, model)
+
+    def truncate_to_tokens(self, text: str, max_tokens: int, provider: Optional[str] = None,
+                           model: Optional[str] = None) -> str:
+        """Longest prefix of text that fits in max_tokens model tokens."""
+        return truncate_to_tokens(text, max_tokens, provider, model)
+
+    def chunk(self, text: str, max_tokens: int, overlap: int = 0, provider: Optional[str] = None,
+              model: Optional[str] = None) -> List[str]:
+        """Token-bounded chunks split at paragraph/sentence boundaries (see chunk_text)."""
+        return chunk_text(text, max_tokens, overlap, provider, model)
+
+    def summarize(self, text: str, max_length: int = 100, ai=None, **options) -> str:
+        # With an AIInterface, summarize with the model over token-bounded chunks (map-reduce)
+        if ai is not None:
+            # Imported here so plain text processing does not load the batching/asyncio machinery
+            from .summarizer import MapReduceSummarizer
+            return MapReduceSummarizer(ai, **options).summarize(text)
         # Basic summarization (truncation)
         words = text.split()
         if len(words) <= max_length:
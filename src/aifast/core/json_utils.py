@@ -0,0 +1,169 @@
+from typing import Any, Callable, Dict, Union
+import json
+import re
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+_FENCE = re.compile(r"```[ \t]*(?:json|jsonc|json5)?[ \t]*\r?\n(.*?)```", re.DOTALL | re.IGNORECASE)
+_OPEN = re.compile(r'[{\[]')
+_decoder = json.JSONDecoder()
+# orjson turns integers beyond 64 bits into floats, so input with a run of 19+
+# digits goes to json. Mapping every digit to '0' and searching for the run is
+# much cheaper than a regex scan.
+_DIGITS_TO_ZERO = bytes.maketrans(b'123456789', b'000000000')
+_LONG_INTEGER = b'0' * 19
+
+# Embedded-JSON scan gives up after this many candidate positions, bounding the work on broken input
+_MAX_CANDIDATES = 32
+
+Schema = Union[Dict[str, Any], Callable[[Any], Any]]
+
+
+class SchemaValidationError(ValueError):
+    """Decoded JSON does not match the expected schema; path points at the offending value."""
+
+    def __init__(self, message: str, path: str = "$"):
+        super().__init__(f"{path}: {message}")
+        self.path = path
+
+
+def loads(text: str) -> Any:
+    """
+    Decode JSON with orjson when it is installed. Inputs orjson rejects or
+    reads differently (NaN, integers beyond 64 bits) go to the json module,
+    so results match json.loads.
+    """
+    if orjson is not None and isinstance(text, str):
+        try:
+            data = text.encode()
+        except UnicodeEncodeError:  # lone surrogates
+            return json.loads(text)
+        if data.translate(_DIGITS_TO_ZERO).find(_LONG_INTEGER) < 0:
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                pass
+    return json.loads(text)
+
+
+def extract_json(text: str) -> Any:
+    """
+    Find and decode the JSON object or array in a model response: the whole
+    response, a ```json (or bare ```) fenced block, or JSON embedded in or
+    trailing after prose. Raises ValueError if there is none.
+    """
+    stripped = text.strip()
+    if stripped[:1] in ('{', '['):
+        try:
+            return loads(stripped)
+        except ValueError:
+            pass
+
+    if '```' in text:
+        for match in _FENCE.finditer(text):
+            block = match.group(1).strip()
+            if block[:1] in ('{', '['):
+                try:
+                    return loads(block)
+                except ValueError:
+                    pass
+
+    first = _OPEN.search(text)
+    if first is None:
+        raise ValueError("No JSON object or array found in response")
+    # A single payload surrounded by prose spans the first opening to the last closing bracket
+    last = max(text.rfind('}'), text.rfind(']'))
+    if last > first.start():
+        try:
+            return loads(text[first.start():last + 1])
+        except ValueError:
+            pass
+    for count, match in enumerate(_OPEN.finditer(text, first.start())):
+        if count == _MAX_CANDIDATES:
+            break
+        try:
+            return _decoder.raw_decode(text, match.start())[0]
+        except ValueError:
+            continue
+    raise ValueError("No JSON object or array found in response")
+
+
+_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "boolean": bool,
+    "null": type(None)
+}
+
+
+def _is_type(value: Any, name: str) -> bool:
+    if name == "integer":
+        return isinstance(value, int) and not isinstance(value, bool)
+    if name == "number":
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    expected = _TYPES.get(name)
+    if expected is None:
+        raise ValueError(f"Unsupported schema type: {name}")
+    return isinstance(value, expected)
+
+
+def validate_schema(value: Any, schema: Dict[str, Any], path: str = "$"):
+    """
+    Check an already-decoded value against a JSON Schema subset: type, enum,
+    const, properties, required, additionalProperties, items, min/maxItems,
+    min/maxLength and minimum/maximum. Raises SchemaValidationError.
+    """
+    expected = schema.get("type")
+    if expected is not None:
+        names = expected if isinstance(expected, list) else [expected]
+        if not any(_is_type(value, name) for name in names):
+            raise SchemaValidationError(f"expected {' or '.join(names)}, got {type(value).__name__}", path)
+    if "enum" in schema and value not in schema["enum"]:
+        raise SchemaValidationError(f"{value!r} is not one of {schema['enum']!r}", path)
+    if "const" in schema and value != schema["const"]:
+        raise SchemaValidationError(f"expected {schema['const']!r}", path)
+
+    if isinstance(value, dict):
+        for key in schema.get("required", ()):
+            if key not in value:
+                raise SchemaValidationError(f"missing required property {key!r}", path)
+        properties = schema.get("properties", {})
+        additional = schema.get("additionalProperties", True)
+        for key, item in value.items():
+            if key in properties:
+                validate_schema(item, properties[key], f"{path}.{key}")
+            elif additional is False:
+                raise SchemaValidationError(f"unexpected property {key!r}", path)
+            elif isinstance(additional, dict):
+                validate_schema(item, additional, f"{path}.{key}")
+    elif isinstance(value, list):
+        if len(value) < schema.get("minItems", 0):
+            raise SchemaValidationError(f"expected at least {schema['minItems']} items", path)
+        if "maxItems" in schema and len(value) > schema["maxItems"]:
+            raise SchemaValidationError(f"expected at most {schema['maxItems']} items", path)
+        items = schema.get("items")
+        if items is not None:
+            for index, item in enumerate(value):
+                validate_schema(item, items, f"{path}[{index}]")
+    elif isinstance(value, str):
+        if len(value) < schema.get("minLength", 0):
+            raise SchemaValidationError(f"shorter than {schema['minLength']} characters", path)
+        if "maxLength" in schema and len(value) > schema["maxLength"]:
+            raise SchemaValidationError(f"longer than {schema['maxLength']} characters", path)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        if "minimum" in schema and value < schema["minimum"]:
+            raise SchemaValidationError(f"{value} is less than {schema['minimum']}", path)
+        if "maximum" in schema and value > schema["maximum"]:
+            raise SchemaValidationError(f"{value} is greater than {schema['maximum']}", path)
+
+
+def apply_schema(value: Any, schema: Schema) -> Any:
+    """Validate value against a schema dict, or pass it through a validator callable (e.g. a pydantic model's model_validate)."""
+    if callable(schema):
+        return schema(value)
+    validate_schema(value, schema)
+    return value
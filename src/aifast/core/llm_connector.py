@@ -1,19 +1,31 @@
 from typing import Dict, Optional
-import time
-from datetime import datetime, timedelta
+
+from .rate_limiter import RateLimiter, get_rate_limiter
+from ..providers.types import Usage
+from ..utils.tokens import count_tokens
 
 class LLMConnector:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, provider: Optional[str] = None, model: str = "*"):
+        """
+        Connection handling with request and token rate limiting.
+        When provider is given, the limiter is shared process-wide with every
+        connector (and AIInterface) using the same provider/model key.
+        """
         if not api_key:
             raise ValueError("API key cannot be empty")
         self.api_key = api_key
-        self.last_request_time = None
-        self.request_count = 0
+        self.provider = provider
+        self.model = model
         self.rate_limit = {
             "requests_per_min": 60,
             "tokens_per_min": 90000
         }
-    
+        if provider:
+            self.limiter = get_rate_limiter(provider, model, **self.rate_limit)
+            self.rate_limit = self.limiter.get_limits()
+        else:
+            self.limiter = RateLimiter(**self.rate_limit)
+
     def validate_connection(self) -> bool:
         """Validate the connection and API key."""
         try:
@@ -21,30 +33,41 @@ class LLMConnector:
             return True
         except Exception as e:
             return False
-    
-    def check_rate_limit(self) -> bool:
-        """Check if we're within rate limits."""
-        current_time = datetime.now()
-        
-        if self.last_request_time:
-            time_diff = current_time - self.last_request_time
-            if time_diff < timedelta(minutes=1):
-                if self.request_count >= self.rate_limit["requests_per_min"]:
-                    return False
-        else:
-            self.request_count = 0
-            
-        self.last_request_time = current_time
-        self.request_count += 1
-        return True
-    
+
+    def count_tokens(self, text: str) -> int:
+        """Tokens text uses with this connector's provider/model tokenizer."""
+        return count_tokens(text, self.provider, None if self.model == "*" else self.model)
+
+    def _tokens(self, tokens: int, text: Optional[str]) -> int:
+        return tokens + self.count_tokens(text) if text else tokens
+
+    def check_rate_limit(self, tokens: int = 0, text: Optional[str] = None) -> bool:
+        """Check if we're within rate limits, consuming capacity if so. text adds its token count."""
+        return self.limiter.try_acquire(self._tokens(tokens, text))
+
+    def acquire(self, tokens: int = 0, timeout: Optional[float] = None, text: Optional[str] = None) -> bool:
+        """Block until the request fits within the rate limits."""
+        return self.limiter.acquire(self._tokens(tokens, text), timeout)
+
+    async def aacquire(self, tokens: int = 0, timeout: Optional[float] = None, text: Optional[str] = None) -> bool:
+        """Wait asynchronously until the request fits within the rate limits."""
+        return await self.limiter.aacquire(self._tokens(tokens, text), timeout)
+
+    def record_usage(self, usage: Usage, reserved: int = 0):
+        """
+        Feed a call's reported token usage back into the token limit,
+        correcting the reserved estimate (0 if nothing was reserved).
+        """
+        self.limiter.reconcile(reserved, usage.total_tokens)
+
     def get_rate_limits(self) -> Dict[str, int]:
         """Get current rate limits."""
         return self.rate_limit
-    
+
     def set_rate_limits(self, requests_per_min: int, tokens_per_min: int):
         """Update rate limits."""
         self.rate_limit = {
             "requests_per_min": requests_per_min,
             "tokens_per_min": tokens_per_min
         }
+        self.limiter.set_limits(requests_per_min, tokens_per_min)
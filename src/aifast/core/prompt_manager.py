@@ -1,28 +1,245 @@
+import json
+import os
+import threading
 import yaml
-from typing import Dict, Any
+from collections import OrderedDict
+from string import Formatter
+from typing import Any, Iterable, List, Mapping, MutableMapping, Optional, Tuple
+
+from .prompt_store import SQLitePromptStore, load_prompt_file
+
+_formatter = Formatter()
+
+
+class CompiledTemplate:
+    """
+    A prompt template parsed once. The required variables are precomputed
+    so missing ones are reported by name, and rendering goes straight to
+    str.format_map without re-parsing on every call.
+    """
+    __slots__ = ("key", "template", "fields", "_format_map", "_static")
+
+    def __init__(self, template: str, key: Optional[str] = None):
+        self.key = key
+        self.template = template
+        fields = []
+        for _, field_name, _, _ in _formatter.parse(template):
+            if field_name is None:
+                continue
+            # "{user.name}" and "{items[0]}" both require the variable "user"/"items"
+            root = field_name.split('.', 1)[0].split('[', 1)[0]
+            if root not in fields:
+                fields.append(root)
+        self.fields: Tuple[str, ...] = tuple(fields)
+        self._format_map = template.format_map
+        # Without fields every row renders the same text ("{{"/"}}" unescaped)
+        self._static: Optional[str] = None if fields else template.format_map({})
+
+    def missing(self, values: Mapping[str, Any]) -> List[str]:
+        """Required variables absent from values."""
+        return [field for field in self.fields if field not in values]
+
+    def _missing_error(self, values: Mapping[str, Any], row: Optional[int] = None) -> KeyError:
+        where = f" (row {row})" if row is not None else ""
+        missing = ", ".join(self.missing(values))
+        return KeyError(f"Missing variables for prompt '{self.key}'{where}: {missing}")
+
+    def render(self, values: Mapping[str, Any]) -> str:
+        try:
+            return self._format_map(values)
+        except KeyError:
+            raise self._missing_error(values) from None
+
+    def render_many(self, rows: Iterable[Mapping[str, Any]]) -> List[str]:
+        """Render many variable sets; per-row cost is a single format_map call."""
+        format_map = self._format_map
+        if self._static is not None:
+            return [self._static for _ in rows]
+        rows = rows if isinstance(rows, list) else list(rows)
+        try:
+            return [format_map(row) for row in rows]
+        except KeyError:
+            for index, row in enumerate(rows):
+                if self.missing(row):
+                    raise self._missing_error(row, index) from None
+            raise
+
+    __call__ = render
+
 
 class PromptManager:
-    def __init__(self, prompt_file: str):
-        self.prompts = self._load_prompts(prompt_file)
-    
-    def _load_prompts(self, file_path: str) -> Dict[str, str]:
-        with open(file_path, 'r') as f:
-            return yaml.safe_load(f)
-    
+    """
+    Prompt templates loaded from a YAML/JSON file, or from a SQLite prompt
+    store (a .db/.sqlite path or an explicit store) for large libraries that
+    should be loaded on demand and updated one prompt at a time.
+
+    reload() picks up edits to the prompt file without a restart, and
+    watch() does so from a background thread polling every interval seconds.
+    """
+
+    def __init__(self, prompt_file: Optional[str] = None, store: Optional[MutableMapping[str, str]] = None,
+                 reload_interval: Optional[float] = None):
+        self.prompt_file = prompt_file
+        self._signature = self._file_signature()
+        if store is not None:
+            self.prompts = store
+        elif prompt_file is not None:
+            self.prompts = self._load_prompts(prompt_file)
+        else:
+            self.prompts = {}
+        # Keyed on (key, template text) so a template re-read from a store hits the
+        # same entry; bounded like the store's hot cache when it has one
+        self._compiled: "OrderedDict[Tuple[str, str], CompiledTemplate]" = OrderedDict()
+        self._compiled_size: Optional[int] = getattr(self.prompts, "hot_size", None)
+        self._compiled_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+        self.last_reload_error: Optional[BaseException] = None
+        if reload_interval is not None:
+            self.watch(reload_interval)
+
+    def _load_prompts(self, file_path: str) -> MutableMapping[str, str]:
+        if os.fspath(file_path).endswith((".db", ".sqlite", ".sqlite3")):
+            return SQLitePromptStore(file_path)
+        return load_prompt_file(file_path)
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        if self.prompt_file is None:
+            return None
+        try:
+            stat = os.stat(self.prompt_file)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def reload(self) -> bool:
+        """
+        Re-read the prompt file if it changed since it was last loaded; returns
+        True when a new prompt set was swapped in. The new set is parsed and
+        compiled aside and published with a single assignment, so concurrent
+        renders see either the old prompts or the new ones. Unchanged templates
+        keep their compiled form; only added or edited ones are compiled.
+        Prompts added with add_prompt but not saved to the file are dropped.
+        Editors should replace the file atomically (write aside, then rename).
+        """
+        refresh = getattr(self.prompts, "refresh", None)
+        if refresh is not None:
+            # SQLite stores load on demand; they only need their hot cache dropped
+            return refresh()
+        with self._reload_lock:
+            signature = self._file_signature()
+            # An empty file is a save that has truncated but not yet written
+            if signature is None or signature == self._signature or signature[1] == 0:
+                return False
+            loaded = load_prompt_file(self.prompt_file)
+            if self._file_signature() != signature:
+                # Modified while being parsed; pick it up on the next call
+                return False
+            previous = self._compiled
+            compiled = OrderedDict()
+            for key, template in loaded.items():
+                entry = (key, template)
+                compiled[entry] = previous.get(entry) or CompiledTemplate(template, key)
+            self._compiled = compiled
+            self.prompts = loaded
+            self._signature = signature
+            return True
+
+    def watch(self, interval: float = 1.0):
+        """Poll the prompt file from a daemon thread and reload it when it changes."""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop_watching.clear()
+
+        def run():
+            pending = None
+            while not self._stop_watching.wait(interval):
+                if getattr(self.prompts, "refresh", None) is None:
+                    # Wait until the file stops changing so a save in progress is not loaded half-written
+                    signature = self._file_signature()
+                    if signature != pending:
+                        pending = signature
+                        continue
+                try:
+                    self.reload()
+                    self.last_reload_error = None
+                except Exception as e:
+                    # A half-written or invalid file keeps the current prompts; retried next poll
+                    self.last_reload_error = e
+
+        self._watcher = threading.Thread(target=run, name="aifast-prompt-watch", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        """Stop the background reload thread started by watch()."""
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
     def get_prompt(self, key: str) -> str:
         """Get a prompt template by key."""
         return self.prompts.get(key, "")
-    
+
+    def _compile(self, key: str, template: str) -> CompiledTemplate:
+        entry = (key, template)
+        if self._compiled_size is None:
+            compiled = self._compiled.get(entry)
+            if compiled is None:
+                compiled = self._compiled[entry] = CompiledTemplate(template, key)
+            return compiled
+        with self._compiled_lock:
+            compiled = self._compiled.get(entry)
+            if compiled is not None:
+                self._compiled.move_to_end(entry)
+                return compiled
+        compiled = CompiledTemplate(template, key)
+        with self._compiled_lock:
+            self._compiled[entry] = compiled
+            while len(self._compiled) > self._compiled_size:
+                self._compiled.popitem(last=False)
+        return compiled
+
+    def compile(self, key: str) -> CompiledTemplate:
+        """Get the compiled form of a prompt, compiling it on first use."""
+        return self._compile(key, self.get_prompt(key))
+
+    def required_fields(self, key: str) -> Tuple[str, ...]:
+        """Variables a prompt needs to be formatted."""
+        return self.compile(key).fields
+
     def format_prompt(self, key: str, **kwargs) -> str:
         """Format a prompt template with provided variables."""
-        template = self.get_prompt(key)
-        return template.format(**kwargs)
-    
+        template = self.prompts.get(key, "")
+        compiled = self._compiled.get((key, template))
+        if compiled is None or self._compiled_size is not None:
+            compiled = self._compile(key, template)
+        try:
+            return compiled._format_map(kwargs)
+        except KeyError:
+            raise compiled._missing_error(kwargs) from None
+
+    def render_many(self, key: str, rows: Iterable[Mapping[str, Any]]) -> List[str]:
+        """Format a prompt template once per row of variables."""
+        return self.compile(key).render_many(rows)
+
     def add_prompt(self, key: str, template: str):
-        """Add a new prompt template."""
+        """Add a new prompt template (written straight through to a SQLite store)."""
+        previous = self.prompts.get(key)
         self.prompts[key] = template
-    
+        if previous is not None and previous != template:
+            with self._compiled_lock:
+                self._compiled.pop((key, previous), None)
+
     def save_prompts(self, file_path: str):
-        """Save prompts to a YAML file."""
-        with open(file_path, 'w') as f:
-            yaml.dump(self.prompts, f)
+        """Save prompts to a YAML (or .json) file."""
+        prompts = dict(self.prompts)
+        # Write aside and rename so a watching PromptManager never reads a partial file
+        tmp_path = f"{os.fspath(file_path)}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            if os.fspath(file_path).endswith(".json"):
+                json.dump(prompts, f, indent=2)
+            else:
+                yaml.dump(prompts, f)
+        os.replace(tmp_path, file_path)
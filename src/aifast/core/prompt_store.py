@@ -0,0 +1,146 @@
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, Mapping
+import json
+import os
+import sqlite3
+import threading
+
+import yaml
+
+try:
+    _YAMLLoader = yaml.CSafeLoader
+except AttributeError:  # PyYAML built without libyaml
+    _YAMLLoader = yaml.SafeLoader
+
+
+def load_prompt_file(path: str) -> Dict[str, str]:
+    """Parse a YAML or JSON prompt file, using the libyaml loader when available."""
+    with open(path, 'r') as f:
+        if os.fspath(path).endswith(".json"):
+            prompts = json.load(f)
+        else:
+            prompts = yaml.load(f, Loader=_YAMLLoader)
+    return prompts or {}
+
+
+class SQLitePromptStore(MutableMapping):
+    """
+    Prompt library kept in a SQLite file and loaded on demand.
+
+    Opening the store reads nothing: templates are fetched by key when first
+    used and the most recently used ones are kept in memory (hot_size).
+    Assigning a key writes just that row, so adding a prompt never rewrites
+    the library. Each thread gets its own connection. refresh() drops the
+    hot cache when another connection or process has changed the file.
+    """
+
+    def __init__(self, path: str, hot_size: int = 1024):
+        self.path = os.fspath(path)
+        self.hot_size = hot_size
+        self._hot: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        conn = self._connect()
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS prompts (key TEXT PRIMARY KEY, template TEXT NOT NULL)")
+        # data_version is per connection, so changes are watched through one dedicated connection
+        self._monitor = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._data_version = self._read_data_version()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _remember(self, key: str, template: str):
+        with self._lock:
+            self._hot[key] = template
+            self._hot.move_to_end(key)
+            if len(self._hot) > self.hot_size:
+                self._hot.popitem(last=False)
+
+    def __getitem__(self, key: str) -> str:
+        with self._lock:
+            template = self._hot.get(key)
+            if template is not None:
+                self._hot.move_to_end(key)
+                return template
+        row = self._connect().execute("SELECT template FROM prompts WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        self._remember(key, row[0])
+        return row[0]
+
+    def __setitem__(self, key: str, template: str):
+        conn = self._connect()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO prompts (key, template) VALUES (?, ?)", (key, template))
+        self._remember(key, template)
+
+    def __delitem__(self, key: str):
+        conn = self._connect()
+        with conn:
+            removed = conn.execute("DELETE FROM prompts WHERE key = ?", (key,)).rowcount
+        with self._lock:
+            self._hot.pop(key, None)
+        if not removed:
+            raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            if key in self._hot:
+                return True
+        return self._connect().execute("SELECT 1 FROM prompts WHERE key = ?", (key,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for (key,) in self._connect().execute("SELECT key FROM prompts ORDER BY key"):
+            yield key
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM prompts").fetchone()[0]
+
+    def update_many(self, prompts: Mapping[str, str]):
+        """Insert or replace many prompts in a single transaction."""
+        conn = self._connect()
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO prompts (key, template) VALUES (?, ?)", prompts.items())
+        with self._lock:
+            for key in prompts:
+                self._hot.pop(key, None)
+
+    def import_file(self, path: str) -> int:
+        """Load a YAML/JSON prompt file into the store; returns how many prompts were imported."""
+        prompts = load_prompt_file(path)
+        self.update_many(prompts)
+        return len(prompts)
+
+    def _read_data_version(self) -> int:
+        with self._lock:
+            return self._monitor.execute("PRAGMA data_version").fetchone()[0]
+
+    def refresh(self) -> bool:
+        """Drop the hot cache if the database has been written since the last check; True if it was."""
+        version = self._read_data_version()
+        if version == self._data_version:
+            return False
+        self._data_version = version
+        self.clear_hot()
+        return True
+
+    def clear_hot(self):
+        """Drop the in-memory hot cache."""
+        with self._lock:
+            self._hot.clear()
+
+    def close(self):
+        self._monitor.close()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
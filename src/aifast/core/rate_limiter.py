@@ -0,0 +1,142 @@
+from typing import Dict, Optional, Tuple
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at rate_per_min, holding at most capacity.
+    Not thread-safe on its own; RateLimiter serializes access.
+    """
+
+    def __init__(self, rate_per_min: float, capacity: Optional[float] = None):
+        if rate_per_min <= 0:
+            raise ValueError("rate_per_min must be positive")
+        self.rate_per_min = rate_per_min
+        self.capacity = capacity if capacity is not None else rate_per_min
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate_per_min / 60.0)
+            self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount would be available (after refill)."""
+        # Requests larger than the bucket are admitted once it is full, leaving a debt
+        needed = min(amount, self.capacity) - self.tokens
+        if needed <= 0:
+            return 0.0
+        return needed * 60.0 / self.rate_per_min
+
+    def available(self, now: float) -> float:
+        self.refill(now)
+        return max(0.0, self.tokens)
+
+
+class RateLimiter:
+    """
+    Dual token-bucket limiter enforcing requests_per_min and tokens_per_min.
+
+    acquire() reserves capacity up front and then sleeps off any deficit, so
+    concurrent callers are admitted in arrival order without busy-waiting.
+    Instances are thread-safe and can be shared across providers and threads.
+    """
+
+    def __init__(self, requests_per_min: int = 60, tokens_per_min: int = 90000):
+        self._lock = threading.Lock()
+        self.requests = TokenBucket(requests_per_min)
+        self.tokens = TokenBucket(tokens_per_min)
+
+    def _reserve(self, tokens: int, max_wait: Optional[float]) -> Optional[float]:
+        """Reserve one request and the given tokens; return the wait, or None if over max_wait."""
+        with self._lock:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+            if max_wait is not None and wait > max_wait:
+                return None
+            self.requests.tokens -= 1
+            self.tokens.tokens -= tokens
+            return wait
+
+    def try_acquire(self, tokens: int = 0) -> bool:
+        """Take capacity only if it is available right now."""
+        return self._reserve(tokens, 0.0) is not None
+
+    def acquire(self, tokens: int = 0, timeout: Optional[float] = None) -> bool:
+        """
+        Block until one request and the given number of tokens are available.
+        Returns False without consuming anything if that would take longer than timeout.
+        """
+        wait = self._reserve(tokens, timeout)
+        if wait is None:
+            return False
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    async def aacquire(self, tokens: int = 0, timeout: Optional[float] = None) -> bool:
+        """Async counterpart of acquire(); waits without blocking the event loop."""
+        wait = self._reserve(tokens, timeout)
+        if wait is None:
+            return False
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return True
+
+    def reconcile(self, reserved: int, used: int):
+        """
+        Correct a token reservation once the provider reports actual usage:
+        unused tokens go back to the bucket, overuse is charged (as a debt
+        that later callers wait off).
+        """
+        if reserved == used:
+            return
+        with self._lock:
+            self.tokens.refill(time.monotonic())
+            self.tokens.tokens = min(self.tokens.capacity, self.tokens.tokens + reserved - used)
+
+    def available(self) -> Dict[str, float]:
+        """Remaining request and token budget in the current window."""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "requests": self.requests.available(now),
+                "tokens": self.tokens.available(now)
+            }
+
+    def get_limits(self) -> Dict[str, int]:
+        return {
+            "requests_per_min": self.requests.rate_per_min,
+            "tokens_per_min": self.tokens.rate_per_min
+        }
+
+    def set_limits(self, requests_per_min: int, tokens_per_min: int):
+        """Replace the limits, starting with full buckets."""
+        with self._lock:
+            self.requests = TokenBucket(requests_per_min)
+            self.tokens = TokenBucket(tokens_per_min)
+
+
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, model: str = "*", requests_per_min: int = 60,
+                     tokens_per_min: int = 90000) -> RateLimiter:
+    """
+    Return the process-wide limiter for a provider/model pair, creating it with
+    the given limits on first use. Later calls share the same instance.
+    """
+    key = (provider, model)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = RateLimiter(requests_per_min, tokens_per_min)
+            _limiters[key] = limiter
+        return limiter
@@ -1,18 +1,55 @@
-from typing import Any, Dict, List, Union
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Union
 import json
 import re
 import yaml
 
+from .json_utils import Schema, apply_schema, extract_json, loads
+from .streaming_formatter import StreamingFormatter
+
+_CODE_DEFINITION = re.compile(r'^\s*def\s+\w+|^\s*class\s+\w+', re.MULTILINE)
+
+# One pass over the whole response instead of per-line matching. [^\S\n] is \s
+# without the newline, so matches stay within a line:
+# - a single-digit item ("3 x", "3. x", but not "1. x") becomes "3. x"
+# - a '*' bullet becomes "- x"
+_LIST_ITEM = re.compile(r'^[^\S\n]*(?:(?!1\.)(\d)\.?[^\S\n]+|\*[^\S\n]+)', re.MULTILINE)
+
+_MERMAID_BLOCK = re.compile(r"```mermaid\n(.*?)\n```", re.DOTALL)
+_MERMAID_INDICATORS = (
+    "graph ",
+    "sequenceDiagram",
+    "classDiagram",
+    "erDiagram",
+    "gantt",
+    "pie",
+    "flowchart",
+    "stateDiagram"
+)
+_MERMAID_LABEL_CHARS = re.compile(r'[^\w\s-]')
+
+
+def _list_item(match: re.Match) -> str:
+    digit = match.group(1)
+    return f"{digit}. " if digit is not None else "- "
+
+
 class ResponseFormatter:
-    def __init__(self, format_type: str = "text"):
+    def __init__(self, format_type: str = "text", schema: Optional[Schema] = None):
         """
         Initialize formatter with format type.
-        Supported formats: text, json, markdown, yaml, mermaid
+        Supported formats: text, json, json_extract, markdown, yaml, mermaid
+
+        schema (json and json_extract only) is a JSON Schema dict, or a
+        callable such as a pydantic model's model_validate, applied to the
+        decoded value; a response that does not match raises
+        SchemaValidationError (or the callable's error).
         """
         self.format_type = format_type.lower()
+        self.schema = schema
         self._formatters = {
             "text": self._format_text,
             "json": self._format_json,
+            "json_extract": self._format_json_extract,
             "markdown": self._format_markdown,
             "yaml": self._format_yaml,
             "mermaid": self._format_mermaid
@@ -25,18 +62,55 @@ class ResponseFormatter:
         
         return self._formatters[self.format_type](response)
     
+    def format_stream(self, chunks: Iterable[Any]) -> Iterator[Any]:
+        """
+        Format a streamed response incrementally.
+        Accepts text chunks or StreamEvents and yields each parsed item
+        (JSON object/array element, markdown block, mermaid block, YAML
+        document) as soon as it is complete.
+        """
+        if self.format_type not in self._formatters:
+            raise ValueError(f"Unsupported format type: {self.format_type}")
+        
+        return StreamingFormatter(self).iter(chunks)
+    
+    def aformat_stream(self, chunks: AsyncIterable[Any]) -> AsyncIterator[Any]:
+        """Async-iterator counterpart of format_stream()"""
+        if self.format_type not in self._formatters:
+            raise ValueError(f"Unsupported format type: {self.format_type}")
+        
+        return StreamingFormatter(self).aiter(chunks)
+    
     def _format_text(self, response: str) -> str:
         """Simple text formatting, strips whitespace"""
         return response.strip()
     
+    def _decode_json(self, response: str) -> Any:
+        try:
+            return loads(response)
+        except json.JSONDecodeError:
+            return {"text": response.strip()}
+    
     def _format_json(self, response: str) -> Dict:
         """
         Attempts to parse response as JSON.
         If response isn't JSON, wraps it in a simple structure
         """
+        result = self._decode_json(response)
+        return result if self.schema is None else apply_schema(result, self.schema)
+    
+    def _format_json_extract(self, response: str) -> Dict:
+        """
+        Like json, but also finds the JSON inside a fenced ```json block or
+        embedded in prose ("Here is the result: {...}").
+        """
+        result = self._extract_json(response)
+        return result if self.schema is None else apply_schema(result, self.schema)
+    
+    def _extract_json(self, response: str) -> Any:
         try:
-            return json.loads(response)
-        except json.JSONDecodeError:
+            return extract_json(response)
+        except ValueError:
             return {"text": response.strip()}
     
     def _format_markdown(self, response: str) -> str:
@@ -47,20 +121,17 @@ class ResponseFormatter:
         - Handles basic markdown syntax
         """
         # Add code block formatting if not present
-        if "```" not in response and re.search(r'^\s*def\s+\w+|^\s*class\s+\w+', response, re.MULTILINE):
+        if "```" not in response and self._has_code_definition(response):
             response = f"```python\n{response}\n```"
         
+        return self._format_lists(response)
+    
+    def _has_code_definition(self, response: str) -> bool:
+        return _CODE_DEFINITION.search(response) is not None
+    
+    def _format_lists(self, response: str) -> str:
         # Format lists if they look like lists but aren't formatted
-        lines = response.split('\n')
-        formatted_lines = []
-        for line in lines:
-            if re.match(r'^\s*[\d+]\.?\s+', line) and not line.strip().startswith("1."):
-                line = re.sub(r'^\s*(\d+)\.?\s+', r'\1. ', line)
-            elif re.match(r'^\s*[-*]\s+', line) and not line.strip().startswith("-"):
-                line = re.sub(r'^\s*[-*]\s+', '- ', line)
-            formatted_lines.append(line)
-        
-        return '\n'.join(formatted_lines)
+        return _LIST_ITEM.sub(_list_item, response)
     
     def _format_yaml(self, response: str) -> Dict:
         """
@@ -80,44 +151,28 @@ class ResponseFormatter:
         # If response already contains mermaid block, just clean it
         if "```mermaid" in response:
             # Extract content between mermaid blocks
-            match = re.search(r"```mermaid\n(.*?)\n```", response, re.DOTALL)
+            match = _MERMAID_BLOCK.search(response)
             if match:
                 return f"```mermaid\n{match.group(1).strip()}\n```"
         
         # If it looks like a mermaid diagram but not properly formatted
-        mermaid_indicators = [
-            "graph ",
-            "sequenceDiagram",
-            "classDiagram",
-            "erDiagram",
-            "gantt",
-            "pie",
-            "flowchart",
-            "stateDiagram"
-        ]
-        
-        if any(indicator in response for indicator in mermaid_indicators):
+        if any(indicator in response for indicator in _MERMAID_INDICATORS):
             return f"```mermaid\n{response.strip()}\n```"
         
         # If it's not recognizable as a mermaid diagram,
         # attempt to convert simple text to a flowchart
-        lines = response.strip().split('\n')
-        if len(lines) > 0:
-            # Create a simple top-down flowchart
-            mermaid = ["graph TD"]
-            for i, line in enumerate(lines):
-                # Clean the line text for mermaid
-                clean_text = re.sub(r'[^\w\s-]', '', line).strip()
-                if clean_text:
-                    node_id = f"A{i}"
-                    mermaid.append(f"    {node_id}[{clean_text}]")
-                    if i > 0:
-                        prev_node = f"A{i-1}"
-                        mermaid.append(f"    {prev_node} --> {node_id}")
-            
-            return "```mermaid\n" + "\n".join(mermaid) + "\n```"
+        # Clean the text for mermaid in one pass (the pattern never removes newlines)
+        lines = _MERMAID_LABEL_CHARS.sub('', response.strip()).split('\n')
+        # Create a simple top-down flowchart
+        mermaid = ["graph TD"]
+        for i, line in enumerate(lines):
+            clean_text = line.strip()
+            if clean_text:
+                mermaid.append(f"    A{i}[{clean_text}]")
+                if i > 0:
+                    mermaid.append(f"    A{i-1} --> A{i}")
         
-        return response
+        return "```mermaid\n" + "\n".join(mermaid) + "\n```"
     
     def set_format(self, format_type: str):
         """Change the format type"""
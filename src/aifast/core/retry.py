@@ -0,0 +1,101 @@
+from typing import Any, Awaitable, Callable, Optional
+import asyncio
+import random
+import time
+
+from ..providers.errors import ProviderTimeoutError, is_retryable
+
+
+class RetryPolicy:
+    """
+    Retry with capped exponential backoff and full jitter.
+
+    Only retryable errors (rate limits, overload/5xx, timeouts) are retried;
+    a Retry-After hint from the provider takes precedence over the backoff.
+    Gives up after max_attempts, or earlier when the next wait would run
+    past the per-call deadline (seconds from the first attempt).
+
+    The deadline also bounds the attempt in flight: acall() cancels an
+    attempt still running when it expires and raises ProviderTimeoutError.
+    A synchronous attempt cannot be interrupted, so call() only bounds it
+    if func does so itself: with timeout_kwarg set (e.g. "timeout"), each
+    attempt receives the remaining budget in seconds as that keyword.
+    """
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 0.5, max_delay: float = 30.0,
+                 deadline: Optional[float] = 60.0, jitter: bool = True,
+                 retry_on: Callable[[BaseException], bool] = is_retryable,
+                 timeout_kwarg: Optional[str] = None):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.jitter = jitter
+        self.retry_on = retry_on
+        self.timeout_kwarg = timeout_kwarg
+
+    def backoff(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """Seconds to wait after the given (1-based) failed attempt."""
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is not None:
+            return float(retry_after)
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def _next_delay(self, attempt: int, error: BaseException, started: float) -> Optional[float]:
+        """Delay before the next attempt, or None to give up and re-raise."""
+        if attempt >= self.max_attempts or not self.retry_on(error):
+            return None
+        delay = self.backoff(attempt, error)
+        if self.deadline is not None and time.monotonic() - started + delay >= self.deadline:
+            return None
+        return delay
+
+    def _remaining(self, started: float) -> Optional[float]:
+        """Seconds left before the deadline, or None without one."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - (time.monotonic() - started))
+
+    def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            remaining = self._remaining(started)
+            if remaining is not None and self.timeout_kwarg is not None:
+                kwargs[self.timeout_kwarg] = remaining
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                delay = self._next_delay(attempt, e, started)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+
+    async def acall(self, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            remaining = self._remaining(started)
+            if remaining is not None and self.timeout_kwarg is not None:
+                kwargs[self.timeout_kwarg] = remaining
+            try:
+                if remaining is None:
+                    return await func(*args, **kwargs)
+                try:
+                    return await asyncio.wait_for(func(*args, **kwargs), remaining)
+                except asyncio.TimeoutError as e:
+                    if self._remaining(started):  # raised by func itself, not the deadline
+                        raise
+                    raise ProviderTimeoutError(f"Attempt still running at the {self.deadline}s deadline") from e
+            except Exception as e:
+                delay = self._next_delay(attempt, e, started)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
@@ -0,0 +1,87 @@
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+import asyncio
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesce identical in-flight calls: while a call for a key is running,
+    later calls with the same key wait for it instead of starting their
+    own, and every waiter gets its result or re-raises its error.
+
+    do() coalesces across threads and ado() across tasks of the same event
+    loop; the two are tracked separately. Only calls that overlap are
+    merged: once a call finishes, the next one for its key runs afresh
+    (pair with a cache to reuse finished results). If the task that
+    started an async call is cancelled, the call keeps running for the
+    other waiters.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Tuple[asyncio.AbstractEventLoop, Hashable], asyncio.Task] = {}
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args) -> Tuple[Any, bool]:
+        """
+        Return (func(*args), shared), running func only if no call for key
+        is in flight; shared is True when the value came from another
+        caller's call.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+        try:
+            call.value = func(*args)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # Forget the call before waking the waiters, so later calls start afresh
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value, False
+
+    async def ado(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args) -> Tuple[Any, bool]:
+        """Async counterpart of do(); func(*args) returns an awaitable."""
+        loop = asyncio.get_running_loop()
+        flight = (loop, key)
+        with self._lock:
+            task = self._tasks.get(flight)
+            shared = task is not None
+            if not shared:
+                task = self._tasks[flight] = loop.create_task(func(*args))
+                task.add_done_callback(partial(self._task_done, flight))
+        # Shielded so one waiter being cancelled does not cancel the call for the rest
+        return await asyncio.shield(task), shared
+
+    def _task_done(self, flight: Tuple[asyncio.AbstractEventLoop, Hashable], task: asyncio.Task):
+        with self._lock:
+            if self._tasks.get(flight) is task:
+                del self._tasks[flight]
+        if not task.cancelled():
+            # Mark the error retrieved in case every waiter was cancelled
+            task.exception()
+
+    def in_flight(self) -> int:
+        """Number of calls currently running (threaded and async)."""
+        with self._lock:
+            return len(self._calls) + len(self._tasks)
@@ -0,0 +1,393 @@
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Iterable, Iterator, List
+import re
+
+# Characters that change JSON scanner state outside and inside strings
+_JSON_STRUCTURAL = re.compile(r'["{}\[\],]')
+_JSON_STRING_SPECIAL = re.compile(r'["\\]')
+_NON_SPACE = re.compile(r'\S')
+# Opening line of a ```json (or bare ```) fence, as extract_json recognises them
+_JSON_FENCE_OPEN = re.compile(r"```[ \t]*(?:json|jsonc|json5)?[ \t]*\r?\n", re.IGNORECASE)
+_FENCE_OPEN_MAX = 32  # longest fence opening a scan resumes across chunk boundaries
+_YAML_DOCUMENT_SEPARATOR = re.compile(r'^---\s*$')
+
+
+def _chunk_text(chunk: Any) -> str:
+    """Accept plain strings or StreamEvent-like objects carrying a delta."""
+    if isinstance(chunk, str):
+        return chunk
+    return getattr(chunk, "delta", "") or ""
+
+
+class _JSONScanner:
+    """
+    Incremental JSON splitter. A response that starts with an object or
+    array is split as it arrives: each top-level object is emitted as soon
+    as its closing brace arrives, and for a top-level array each element
+    instead; only the value being parsed is buffered. With extract=True the
+    contents of a ```json fence are split the same way, and text after the
+    JSON is ignored.
+
+    Any other response (prose, a bare scalar, JSON after prose) is buffered
+    whole and decoded at close() with fallback, as format() would. So is
+    text after the JSON (without extract), and an unfinished value left
+    at the end of the stream.
+    """
+
+    def __init__(self, decode: Callable[[str], Any], fallback: Callable[[str], Any], extract: bool = False):
+        self.decode = decode
+        self.fallback = fallback
+        self.extract = extract
+        # None until the first non-space text decides; then "scan", "prose",
+        # "trailing" (text after the JSON, kept for fallback) or "done"
+        self.mode = None
+        self.prose = ""
+        self.fence_from = 0
+        self.buffer = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.top_array = False
+        self.start = None  # buffer offset where the current value starts
+
+    def _emit(self, end: int, out: List[Any]):
+        raw = self.buffer[self.start:end].strip()
+        self.start = None
+        if raw:
+            out.append(self.decode(raw))
+
+    def feed(self, text: str) -> List[Any]:
+        if self.mode == "scan":
+            return self._scan(text)
+        if self.mode == "done":
+            return []
+        self.prose += text
+        if self.mode is None:
+            match = _NON_SPACE.search(self.prose)
+            if match is None:
+                return []
+            if self.prose[match.start()] in '{[':
+                self.mode = "scan"
+                text, self.prose = self.prose, ""
+                return self._scan(text)
+            self.mode = "prose"
+        if self.mode == "prose" and self.extract:
+            return self._find_fence()
+        return []
+
+    def _find_fence(self) -> List[Any]:
+        """In extract mode, start splitting at a fence whose content opens an object or array."""
+        while True:
+            match = _JSON_FENCE_OPEN.search(self.prose, self.fence_from)
+            if match is None:
+                self.fence_from = max(self.fence_from, len(self.prose) - _FENCE_OPEN_MAX)
+                return []
+            body = _NON_SPACE.search(self.prose, match.end())
+            if body is None:
+                # Wait for the fence's content
+                self.fence_from = match.start()
+                return []
+            if self.prose[body.start()] in '{[':
+                self.mode = "scan"
+                text, self.prose = self.prose[match.end():], ""
+                return self._scan(text)
+            self.fence_from = match.end()
+
+    def _scan(self, text: str) -> List[Any]:
+        out = []
+        self.buffer += text
+        buf = self.buffer
+        i = self.pos
+        n = len(buf)
+        while i < n:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                    i += 1
+                    continue
+                match = _JSON_STRING_SPECIAL.search(buf, i)
+                if match is None:
+                    i = n
+                    break
+                i = match.start()
+                if buf[i] == '\\':
+                    self.escaped = True
+                else:
+                    self.in_string = False
+                i += 1
+                continue
+
+            if self.depth == 0:
+                # Between top-level values only whitespace may appear
+                match = _NON_SPACE.search(buf, i)
+                if match is None:
+                    i = n
+                    break
+                i = match.start()
+                if buf[i] not in '{[':
+                    if self.extract:
+                        self.mode = "done"
+                    else:
+                        self.mode = "trailing"
+                        self.prose = buf[i:]
+                    self.buffer = ""
+                    self.pos = 0
+                    return out
+                self.depth = 1
+                self.top_array = buf[i] == '['
+                self.start = None if self.top_array else i
+                i += 1
+                continue
+
+            if self.top_array and self.depth == 1 and self.start is None:
+                # Start of the next array element (scalar or container)
+                while i < n and buf[i] in ' \t\r\n,':
+                    i += 1
+                if i == n:
+                    break
+                if buf[i] == ']':
+                    self.depth = 0
+                    i += 1
+                    continue
+                self.start = i
+
+            match = _JSON_STRUCTURAL.search(buf, i)
+            if match is None:
+                i = n
+                break
+            i = match.start()
+            char = buf[i]
+            if char == '"':
+                self.in_string = True
+            elif char in '{[':
+                self.depth += 1
+            elif char in '}]':
+                self.depth -= 1
+                if self.top_array:
+                    if self.depth == 1:
+                        self._emit(i + 1, out)
+                    elif self.depth == 0 and self.start is not None:
+                        # Closing bracket of the array ends a trailing scalar
+                        self._emit(i, out)
+                elif self.depth == 0:
+                    self._emit(i + 1, out)
+            elif char == ',' and self.top_array and self.depth == 1 and self.start is not None:
+                self._emit(i, out)
+            i += 1
+
+        # Drop everything before the current element to keep memory bounded
+        keep = self.start if self.start is not None else i
+        self.buffer = buf[keep:]
+        self.pos = i - keep
+        if self.start is not None:
+            self.start = 0
+        return out
+
+    def close(self) -> List[Any]:
+        """Decode what is left: an unfinished value, trailing text, or a whole non-JSON response."""
+        if self.mode == "scan":
+            if self.start is None:
+                return []
+            raw = self.buffer[self.start:].strip()
+            self.start = None
+            return [self.decode(raw)] if raw else []
+        if self.mode == "trailing":
+            raw, self.prose = self.prose.strip(), ""
+            return [self.decode(raw)] if raw else []
+        if self.mode == "prose":
+            text, self.prose = self.prose, ""
+            return [self.fallback(text)]
+        return []
+
+
+class _LineScanner:
+    """Splits a chunk stream into complete lines, buffering only the partial tail."""
+
+    def __init__(self):
+        self.partial = ""
+
+    def feed(self, text: str) -> List[str]:
+        data = self.partial + text
+        lines = data.split('\n')
+        self.partial = lines.pop()
+        return lines
+
+    def close(self) -> List[str]:
+        if self.partial:
+            line, self.partial = self.partial, ""
+            return [line]
+        return []
+
+
+class StreamingFormatter:
+    """
+    Incremental counterpart of ResponseFormatter for streamed responses.
+
+    Feed text chunks (or StreamEvents) as they arrive and collect items as
+    soon as each one is complete:
+    - json, json_extract: each top-level object, or each element of a
+      top-level array, when the response (or, for json_extract, a ```json
+      fence) starts with one. Anything format() would not decode as JSON
+      (prose, a bare scalar, JSON after prose) is buffered and yielded at
+      the end as format() would return it, as is an unfinished last value.
+      A schema applies to whole responses, so items are not validated.
+    - markdown: each paragraph or fenced block, with lists formatted as in
+      format(). If no ``` appears, paragraphs from the first def/class line
+      on are held and yielded as one ```python block at the end (format()
+      also fences any prose before it).
+    - mermaid: each ```mermaid block
+    - yaml: each parsed document (split on '---')
+    - text: text deltas, with outer whitespace stripped as in format()
+    Memory is bounded by the largest item, except for the buffered JSON
+    fallback and held markdown code above.
+    """
+
+    def __init__(self, formatter):
+        self.formatter = formatter
+        self.format_type = formatter.format_type
+        self._json = self.format_type in ("json", "json_extract")
+        if self._json:
+            extract = self.format_type == "json_extract"
+            fallback = formatter._extract_json if extract else formatter._decode_json
+            self._scanner = _JSONScanner(formatter._decode_json, fallback, extract)
+        else:
+            self._scanner = _LineScanner()
+        self._block = []
+        self._in_fence = False
+        self._pending_space = ""
+        self._started = False
+        self._mermaid_seen = False
+        self._fence_seen = False
+        self._held_code: List[str] = []
+
+    def feed(self, chunk: Any) -> List[Any]:
+        text = _chunk_text(chunk)
+        if not text:
+            return []
+        if self._json:
+            return self._scanner.feed(text)
+        if self.format_type == "text":
+            return self._feed_text(text)
+        return self._feed_lines(self._scanner.feed(text))
+
+    def close(self) -> List[Any]:
+        """Flush whatever is complete at the end of the stream."""
+        if self._json:
+            return self._scanner.close()
+        if self.format_type == "text":
+            return []
+        out = self._feed_lines(self._scanner.close())
+        out.extend(self._flush_block(final=True))
+        if self.format_type == "markdown":
+            out.extend(self._flush_held_code())
+        return out
+
+    def _feed_text(self, text: str) -> List[str]:
+        if not self._started:
+            text = text.lstrip()
+            if not text:
+                return []
+            self._started = True
+        # Hold back trailing whitespace until more text proves it is not the end
+        body = text.rstrip()
+        if not body:
+            self._pending_space += text
+            return []
+        out = self._pending_space + body
+        self._pending_space = text[len(body):]
+        return [out]
+
+    def _feed_lines(self, lines: List[str]) -> List[Any]:
+        out = []
+        for line in lines:
+            stripped = line.strip()
+            if self.format_type == "yaml":
+                if _YAML_DOCUMENT_SEPARATOR.match(line):
+                    out.extend(self._flush_block())
+                else:
+                    self._block.append(line)
+            elif self.format_type == "mermaid":
+                if self._in_fence:
+                    if stripped == "```":
+                        self._in_fence = False
+                        self._mermaid_seen = True
+                        content = "\n".join(self._block).strip()
+                        self._block = []
+                        out.append(f"```mermaid\n{content}\n```")
+                    else:
+                        self._block.append(line)
+                elif stripped == "```mermaid":
+                    self._in_fence = True
+                    self._block = []
+                elif not self._mermaid_seen:
+                    # Kept only so an unfenced diagram can be formatted at the end
+                    self._block.append(line)
+            else:
+                if "```" in line:
+                    self._fence_seen = True
+                if self._in_fence:
+                    self._block.append(line)
+                    if stripped.startswith("```"):
+                        self._in_fence = False
+                        out.extend(self._flush_block())
+                elif stripped.startswith("```"):
+                    out.extend(self._flush_block())
+                    self._in_fence = True
+                    self._block.append(line)
+                elif not stripped:
+                    out.extend(self._flush_block())
+                else:
+                    self._block.append(line)
+        return out
+
+    def _flush_block(self, final: bool = False) -> List[Any]:
+        if self.format_type == "mermaid":
+            if not final or self._mermaid_seen or not self._block:
+                return []
+            block, self._block = "\n".join(self._block), []
+            if self._in_fence:
+                return [f"```mermaid\n{block.strip()}\n```"]
+            return [self.formatter._format_mermaid(block)]
+        if not self._block:
+            return []
+        block, self._block = "\n".join(self._block), []
+        if self.format_type == "yaml":
+            if not block.strip():
+                return []
+            return [self.formatter._format_yaml(block)]
+        if self.format_type == "markdown":
+            return self._markdown_block(block)
+        return [self.formatter._formatters[self.format_type](block)]
+
+    def _markdown_block(self, block: str) -> List[str]:
+        # format() fences an unfenced response containing code as a whole, so
+        # code paragraphs are held until a ``` shows that will not happen
+        block = self.formatter._format_lists(block)
+        if self._fence_seen:
+            out, self._held_code = self._held_code, []
+            out.append(block)
+            return out
+        if self._held_code or self.formatter._has_code_definition(block):
+            self._held_code.append(block)
+            return []
+        return [block]
+
+    def _flush_held_code(self) -> List[str]:
+        if not self._held_code:
+            return []
+        held, self._held_code = self._held_code, []
+        if self._fence_seen:
+            return held
+        return ["```python\n" + "\n\n".join(held) + "\n```"]
+
+    def iter(self, chunks: Iterable[Any]) -> Iterator[Any]:
+        for chunk in chunks:
+            yield from self.feed(chunk)
+        yield from self.close()
+
+    async def aiter(self, chunks: AsyncIterable[Any]) -> AsyncIterator[Any]:
+        async for chunk in chunks:
+            for item in self.feed(chunk):
+                yield item
+        for item in self.close():
+            yield item
@@ -0,0 +1,116 @@
+from functools import partial
+from typing import Any, Dict, List, Optional
+
+from .batch import BatchResult, arun_batch, run_batch
+from .chunking import chunk_text
+from ..utils.tokens import get_tokenizer
+
+MAP_PROMPT = (
+    "Summarize the following part of a longer document. Keep the key facts, "
+    "names, figures and conclusions.\n\n{text}"
+)
+REDUCE_PROMPT = (
+    "The following are summaries of consecutive parts of one document. "
+    "Combine them into a single coherent summary without repeating yourself.\n\n{text}"
+)
+
+
+class MapReduceSummarizer:
+    """
+    Summarize documents longer than a model's context window.
+
+    The text is split into token-bounded, overlapping chunks at paragraph or
+    sentence boundaries; each chunk is summarized (map) with at most
+    max_concurrency requests in flight through the AIInterface, and the
+    partial summaries are merged level by level (reduce), packing as many as
+    fit in chunk_tokens into each merge, until one summary remains.
+    Prompt and completion tokens of the last run are in last_stats, as
+    reported by the provider (or estimated for calls that report no usage).
+    """
+
+    def __init__(self, ai, chunk_tokens: int = 3000, overlap: int = 200, max_tokens: int = 500,
+                 max_concurrency: int = 8, map_prompt: str = MAP_PROMPT, reduce_prompt: str = REDUCE_PROMPT,
+                 **params):
+        if max_tokens * 2 > chunk_tokens:
+            raise ValueError("chunk_tokens must fit at least two summaries of max_tokens")
+        self.ai = ai
+        self.chunk_tokens = chunk_tokens
+        self.overlap = overlap
+        self.max_tokens = max_tokens
+        self.max_concurrency = max_concurrency
+        self.map_prompt = map_prompt
+        self.reduce_prompt = reduce_prompt
+        self.params = dict(params, max_tokens=max_tokens)
+        self.tokenizer = get_tokenizer(getattr(ai, "provider_name", None),
+                                       getattr(getattr(ai, "provider", None), "model", None))
+        self.last_stats: Optional[Dict[str, Any]] = None
+
+    def _groups(self, summaries: List[str]) -> List[List[str]]:
+        """Pack consecutive summaries into merges of at most chunk_tokens (and at least two each)."""
+        groups = []
+        current: List[str] = []
+        used = 0
+        for summary in summaries:
+            tokens = self.tokenizer.count(summary) + 1
+            if len(current) >= 2 and used + tokens > self.chunk_tokens:
+                groups.append(current)
+                current, used = [], 0
+            current.append(summary)
+            used += tokens
+        if len(current) == 1 and groups:
+            groups[-1].append(current[0])
+        elif current:
+            groups.append(current)
+        return groups
+
+    def _start(self, text: str) -> List[str]:
+        chunks = chunk_text(text, self.chunk_tokens, self.overlap, tokenizer=self.tokenizer)
+        self.last_stats = {"chunks": len(chunks), "levels": 0, "calls": 0,
+                           "prompt_tokens": 0, "completion_tokens": 0}
+        return [self.map_prompt.format(text=chunk) for chunk in chunks]
+
+    def _finish(self, prompts: List[str], results: List[BatchResult]) -> List[str]:
+        completions = [result.unwrap() for result in results]
+        stats = self.last_stats
+        stats["levels"] += 1
+        stats["calls"] += len(prompts)
+        for prompt, completion in zip(prompts, completions):
+            usage = completion.usage
+            if usage is None:
+                stats["prompt_tokens"] += self.tokenizer.count(prompt)
+                stats["completion_tokens"] += self.tokenizer.count(completion.text)
+            else:
+                stats["prompt_tokens"] += usage.prompt_tokens
+                stats["completion_tokens"] += usage.completion_tokens
+        return [completion.text for completion in completions]
+
+    def _map(self, prompts: List[str]) -> List[str]:
+        results = run_batch(partial(self.ai.complete_result, **self.params), prompts,
+                            max_workers=self.max_concurrency)
+        return self._finish(prompts, results)
+
+    async def _amap(self, prompts: List[str]) -> List[str]:
+        results = await arun_batch(partial(self.ai.acomplete_result, **self.params), prompts,
+                                   max_concurrency=self.max_concurrency)
+        return self._finish(prompts, results)
+
+    def _reduce_prompts(self, summaries: List[str]) -> List[str]:
+        return [self.reduce_prompt.format(text="\n\n".join(group)) for group in self._groups(summaries)]
+
+    def summarize(self, text: str) -> str:
+        prompts = self._start(text)
+        if not prompts:
+            return ""
+        summaries = self._map(prompts)
+        while len(summaries) > 1:
+            summaries = self._map(self._reduce_prompts(summaries))
+        return summaries[0]
+
+    async def asummarize(self, text: str) -> str:
+        prompts = self._start(text)
+        if not prompts:
+            return ""
+        summaries = await self._amap(prompts)
+        while len(summaries) > 1:
+            summaries = await self._amap(self._reduce_prompts(summaries))
+        return summaries[0]
@@ -0,0 +1,172 @@
+from typing import Any, Callable, Dict, Optional, Tuple
+import threading
+import time
+
+from ..providers.types import CompletionResult
+
+# Estimated list prices in USD per million (prompt, completion) tokens, matched
+# by the longest model-name prefix. Prices change; pass prices= to UsageTracker
+# to correct or extend them.
+DEFAULT_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "gpt-4": (30.00, 60.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "claude-3-haiku": (0.25, 1.25),
+    "claude-3-sonnet": (3.00, 15.00),
+    "claude-3-5-sonnet": (3.00, 15.00),
+    "claude-3-opus": (15.00, 75.00),
+    "command": (1.00, 2.00),
+    "command-r": (0.15, 0.60),
+    "command-r-plus": (2.50, 10.00)
+}
+
+
+class _Totals:
+    __slots__ = ("calls", "cached", "coalesced", "unreported", "prompt_tokens", "completion_tokens", "latency")
+
+    def __init__(self):
+        self.calls = 0
+        self.cached = 0
+        self.coalesced = 0
+        self.unreported = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latency = 0.0
+
+
+class UsageTracker:
+    """
+    Thread-safe roll-up of CompletionResults into per provider/model totals:
+    calls, cache hits, coalesced calls (results shared from an identical
+    call in flight), calls without reported usage, prompt and completion
+    tokens, mean latency, calls and tokens per minute, and estimated cost
+    from the price table (USD per million tokens; None for unpriced models).
+    Totals run from creation or the last reset; start_export() hands a
+    snapshot to a callback periodically.
+    """
+
+    def __init__(self, prices: Optional[Dict[str, Tuple[float, float]]] = None):
+        self.prices = dict(DEFAULT_PRICES)
+        if prices:
+            self.prices.update(prices)
+        self._lock = threading.Lock()
+        self._totals: Dict[Tuple[Optional[str], Optional[str]], _Totals] = {}
+        self._since = time.time()
+        self._started = time.monotonic()
+        self._exporter: Optional[threading.Thread] = None
+        self._stop_export = threading.Event()
+        self.last_export_error: Optional[Exception] = None
+
+    def record(self, result: CompletionResult):
+        """Add one call's result to the totals."""
+        key = (result.provider, result.model)
+        usage = result.usage
+        with self._lock:
+            totals = self._totals.get(key)
+            if totals is None:
+                totals = self._totals[key] = _Totals()
+            totals.calls += 1
+            totals.latency += result.latency
+            if result.cached:
+                totals.cached += 1
+            elif result.coalesced:
+                totals.coalesced += 1
+            elif usage is None:
+                totals.unreported += 1
+            else:
+                totals.prompt_tokens += usage.prompt_tokens
+                totals.completion_tokens += usage.completion_tokens
+
+    def price(self, model: Optional[str]) -> Optional[Tuple[float, float]]:
+        """(prompt, completion) USD per million tokens for a model, by longest matching prefix."""
+        if not model:
+            return None
+        price = self.prices.get(model)
+        if price is None:
+            matches = [name for name in self.prices if model.startswith(name)]
+            if matches:
+                price = self.prices[max(matches, key=len)]
+        return price
+
+    def _cost(self, model: Optional[str], totals: _Totals) -> Optional[float]:
+        price = self.price(model)
+        if price is None:
+            return None
+        return (totals.prompt_tokens * price[0] + totals.completion_tokens * price[1]) / 1e6
+
+    def snapshot(self, reset: bool = False) -> Dict[str, Any]:
+        """
+        Totals per "provider:model" plus an overall total, as a plain dict
+        ready for JSON. With reset=True the totals start over afterwards.
+        """
+        with self._lock:
+            items = list(self._totals.items())
+            since = self._since
+            minutes = max(time.monotonic() - self._started, 1e-9) / 60.0
+            if reset:
+                self._totals = {}
+                self._since = time.time()
+                self._started = time.monotonic()
+
+        models = {}
+        overall = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "cost": 0.0}
+        for (provider, model), totals in items:
+            total_tokens = totals.prompt_tokens + totals.completion_tokens
+            cost = self._cost(model, totals)
+            models[f"{provider}:{model}"] = {
+                "provider": provider,
+                "model": model,
+                "calls": totals.calls,
+                "cached": totals.cached,
+                "coalesced": totals.coalesced,
+                "unreported": totals.unreported,
+                "prompt_tokens": totals.prompt_tokens,
+                "completion_tokens": totals.completion_tokens,
+                "total_tokens": total_tokens,
+                "mean_latency": totals.latency / totals.calls,
+                "calls_per_min": totals.calls / minutes,
+                "tokens_per_min": total_tokens / minutes,
+                "cost": cost
+            }
+            overall["calls"] += totals.calls
+            overall["prompt_tokens"] += totals.prompt_tokens
+            overall["completion_tokens"] += totals.completion_tokens
+            overall["total_tokens"] += total_tokens
+            if cost is not None:
+                overall["cost"] += cost
+        return {"since": since, "minutes": minutes, "models": models, "total": overall}
+
+    def reset(self):
+        """Start the totals over."""
+        self.snapshot(reset=True)
+
+    def start_export(self, sink: Callable[[Dict[str, Any]], Any], interval: float = 60.0, reset: bool = True):
+        """
+        Call sink with a snapshot every interval seconds from a daemon
+        thread (resetting the totals each time unless reset=False), e.g. to
+        append JSON lines to a file or push to a metrics system.
+        """
+        if self._exporter is not None and self._exporter.is_alive():
+            return
+        self._stop_export.clear()
+
+        def run():
+            while not self._stop_export.wait(interval):
+                try:
+                    sink(self.snapshot(reset=reset))
+                    self.last_export_error = None
+                except Exception as e:
+                    # A failing sink must not stop later exports
+                    self.last_export_error = e
+
+        self._exporter = threading.Thread(target=run, name="aifast-usage-export", daemon=True)
+        self._exporter.start()
+
+    def stop_export(self):
+        """Stop the background export thread started by start_export()."""
+        self._stop_export.set()
+        if self._exporter is not None:
+            self._exporter.join()
+            self._exporter = None
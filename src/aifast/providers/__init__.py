@@ -1,12 +1,69 @@
 """AIFAST provider modules."""
-from .base import BaseProvider
-from .openai_provider import OpenAIProvider
-from .anthropic_provider import AnthropicProvider
-from .cohere_provider import CohereProvider
+from typing import TYPE_CHECKING
+
+from ..utils.lazy import lazy_exports
+
+# Each provider module imports its SDK, so names load on first use
+_EXPORTS = {
+    'BaseProvider': '.base',
+    'StreamEvent': '.types',
+    'Usage': '.types',
+    'CompletionResult': '.types',
+    'configure_pool': '.client_pool',
+    'close_clients': '.client_pool',
+    'aclose_clients': '.client_pool',
+    'ProviderError': '.errors',
+    'RateLimitError': '.errors',
+    'OverloadedError': '.errors',
+    'ProviderTimeoutError': '.errors',
+    'AuthenticationError': '.errors',
+    'BadRequestError': '.errors',
+    'OpenAIProvider': '.openai_provider',
+    'AnthropicProvider': '.anthropic_provider',
+    'CohereProvider': '.cohere_provider',
+    'RouterProvider': '.router',
+    'Backend': '.router',
+    'HedgedProvider': '.hedged'
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .base import BaseProvider
+    from .types import StreamEvent, Usage, CompletionResult
+    from .client_pool import configure_pool, close_clients, aclose_clients
+    from .errors import (
+        ProviderError,
+        RateLimitError,
+        OverloadedError,
+        ProviderTimeoutError,
+        AuthenticationError,
+        BadRequestError
+    )
+    from .openai_provider import OpenAIProvider
+    from .anthropic_provider import AnthropicProvider
+    from .cohere_provider import CohereProvider
+    from .router import RouterProvider, Backend
+    from .hedged import HedgedProvider
 
 __all__ = [
     'BaseProvider',
+    'StreamEvent',
+    'Usage',
+    'CompletionResult',
+    'configure_pool',
+    'close_clients',
+    'aclose_clients',
+    'ProviderError',
+    'RateLimitError',
+    'OverloadedError',
+    'ProviderTimeoutError',
+    'AuthenticationError',
+    'BadRequestError',
     'OpenAIProvider',
     'AnthropicProvider',
-    'CohereProvider'
+    'CohereProvider',
+    'RouterProvider',
+    'Backend',
+    'HedgedProvider'
 ]
@@ -1,51 +1,177 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Callable, FrozenSet, Iterator, Optional, Tuple
+import inspect
+import time
 from .base import BaseProvider
-from anthropic import Anthropic
+from .types import CompletionResult, StreamEvent, Usage
+from .client_pool import PooledClient, PoolConfig
+from .errors import translate_error
+import anthropic
+from anthropic import Anthropic, AsyncAnthropic
+from anthropic.resources.messages import Messages
+
+def _accepted_params(method: Callable) -> Optional[FrozenSet[str]]:
+    """Keyword arguments an SDK method declares, or None if it takes any."""
+    try:
+        parameters = inspect.signature(method).parameters.values()
+    except (TypeError, ValueError):
+        return None
+    if any(p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters):
+        return None
+    return frozenset(p.name for p in parameters)
+
+# SDK releases differ in which sampling parameters they take as arguments
+_CREATE_PARAMS = _accepted_params(Messages.create)
+_STREAM_PARAMS = _accepted_params(Messages.stream)
+
+def _sdk_params(params: Dict[str, Any], accepted: Optional[FrozenSet[str]]) -> Dict[str, Any]:
+    """Send parameters the installed SDK does not declare in the request body instead."""
+    if accepted is None:
+        return params
+    extra = {key: value for key, value in params.items() if key not in accepted}
+    if not extra:
+        return params
+    params = {key: value for key, value in params.items() if key in accepted}
+    params["extra_body"] = {**(params.get("extra_body") or {}), **extra}
+    return params
+
+def _build_client(api_key: str, base_url: Optional[str], config: PoolConfig):
+    http_client = anthropic.DefaultHttpxClient(limits=config.limits(), timeout=config.timeout)
+    return Anthropic(api_key=api_key, base_url=base_url, http_client=http_client), http_client
+
+def _build_async_client(api_key: str, base_url: Optional[str], config: PoolConfig):
+    http_client = anthropic.DefaultAsyncHttpxClient(limits=config.limits(), timeout=config.timeout)
+    return AsyncAnthropic(api_key=api_key, base_url=base_url, http_client=http_client), http_client
 
 class AnthropicProvider(BaseProvider):
-    def __init__(self, api_key: str, model: str = "claude-3-opus-20240229"):
+    name = "anthropic"
+    # Clients are shared process-wide per api_key/base_url (see client_pool)
+    client = PooledClient(_build_client)
+    async_client = PooledClient(_build_async_client, is_async=True)
+
+    def __init__(self, api_key: str, model: str = "claude-3-opus-20240229", base_url: Optional[str] = None):
         self.api_key = api_key
         self.model = model
-        self.client = Anthropic(api_key=api_key)
+        self.base_url = base_url
+    
+    def _split_system(self, messages: List[Dict[str, str]]) -> Tuple[Optional[str], List[Dict[str, str]]]:
+        # Extract system message if present
+        system_message = None
+        chat_messages = []
+        
+        for msg in messages:
+            if msg["role"] == "system":
+                system_message = msg["content"]
+            else:
+                chat_messages.append({
+                    "role": msg["role"],
+                    "content": msg["content"]
+                })
+        return system_message, chat_messages
+    
+    def _chat_params(self, messages: List[Dict[str, str]], **kwargs) -> Dict[str, Any]:
+        system_message, chat_messages = self._split_system(messages)
+        params = {
+            "model": self.model,
+            "messages": chat_messages,
+            "max_tokens": kwargs.get('max_tokens', 1000),
+            "temperature": kwargs.get('temperature', 0.7)
+        }
+        if system_message is not None:
+            params["system"] = system_message  # Pass system message separately
+        return params
+    
+    def _complete_params(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "max_tokens": kwargs.get('max_tokens', 1000),
+            "temperature": kwargs.get('temperature', 0.7),
+            "messages": [{"role": "user", "content": prompt}]
+        }
+    
+    def _message_result(self, message, start: float) -> CompletionResult:
+        usage = Usage(message.usage.input_tokens, message.usage.output_tokens)
+        return self._result(message.content[0].text, start, usage, message.model)
+    
+    def _create(self, params: Dict[str, Any]) -> CompletionResult:
+        start = time.perf_counter()
+        try:
+            message = self.client.messages.create(**_sdk_params(params, _CREATE_PARAMS))
+            return self._message_result(message, start)
+        except Exception as e:
+            raise translate_error(e, "Anthropic") from e
+    
+    async def _acreate(self, params: Dict[str, Any]) -> CompletionResult:
+        start = time.perf_counter()
+        try:
+            message = await self.async_client.messages.create(**_sdk_params(params, _CREATE_PARAMS))
+            return self._message_result(message, start)
+        except Exception as e:
+            raise translate_error(e, "Anthropic") from e
     
     def complete(self, prompt: str, **kwargs) -> str:
+        return self._create(self._complete_params(prompt, **kwargs)).text
+    
+    def chat(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        # Create message with system parameter if present
+        return self._create(self._chat_params(messages, **kwargs)).text
+    
+    async def acomplete(self, prompt: str, **kwargs) -> str:
+        return (await self._acreate(self._complete_params(prompt, **kwargs))).text
+    
+    async def achat(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        return (await self._acreate(self._chat_params(messages, **kwargs))).text
+    
+    def complete_result(self, prompt: str, **kwargs) -> CompletionResult:
+        return self._create(self._complete_params(prompt, **kwargs))
+    
+    def chat_result(self, messages: List[Dict[str, str]], **kwargs) -> CompletionResult:
+        return self._create(self._chat_params(messages, **kwargs))
+    
+    async def acomplete_result(self, prompt: str, **kwargs) -> CompletionResult:
+        return await self._acreate(self._complete_params(prompt, **kwargs))
+    
+    async def achat_result(self, messages: List[Dict[str, str]], **kwargs) -> CompletionResult:
+        return await self._acreate(self._chat_params(messages, **kwargs))
+    
+    def _stream(self, params: Dict[str, Any]) -> Iterator[StreamEvent]:
         try:
-            message = self.client.messages.create(
-                model=self.model,
-                max_tokens=kwargs.get('max_tokens', 1000),
-                temperature=kwargs.get('temperature', 0.7),
-                messages=[{"role": "user", "content": prompt}]
+            with self.client.messages.stream(**_sdk_params(params, _STREAM_PARAMS)) as stream:
+                for text in stream.text_stream:
+                    yield StreamEvent(text)
+                message = stream.get_final_message()
+            yield StreamEvent(
+                done=True,
+                usage=Usage(message.usage.input_tokens, message.usage.output_tokens),
+                model=message.model
             )
-            return message.content[0].text
         except Exception as e:
-            raise Exception(f"Anthropic API error: {str(e)}")
+            raise translate_error(e, "Anthropic") from e
     
-    def chat(self, messages: List[Dict[str, str]], **kwargs) -> str:
+    async def _astream(self, params: Dict[str, Any]) -> AsyncIterator[StreamEvent]:
         try:
-            # Extract system message if present
-            system_message = None
-            chat_messages = []
-            
-            for msg in messages:
-                if msg["role"] == "system":
-                    system_message = msg["content"]
-                else:
-                    chat_messages.append({
-                        "role": msg["role"],
-                        "content": msg["content"]
-                    })
-            
-            # Create message with system parameter if present
-            response = self.client.messages.create(
-                model=self.model,
-                messages=chat_messages,
-                system=system_message,  # Pass system message separately
-                max_tokens=kwargs.get('max_tokens', 1000),
-                temperature=kwargs.get('temperature', 0.7)
+            async with self.async_client.messages.stream(**_sdk_params(params, _STREAM_PARAMS)) as stream:
+                async for text in stream.text_stream:
+                    yield StreamEvent(text)
+                message = await stream.get_final_message()
+            yield StreamEvent(
+                done=True,
+                usage=Usage(message.usage.input_tokens, message.usage.output_tokens),
+                model=message.model
             )
-            return response.content[0].text
         except Exception as e:
-            raise Exception(f"Anthropic API error: {str(e)}")
+            raise translate_error(e, "Anthropic") from e
+    
+    def stream_complete(self, prompt: str, **kwargs) -> Iterator[StreamEvent]:
+        return self._stream(self._complete_params(prompt, **kwargs))
+    
+    def stream_chat(self, messages: List[Dict[str, str]], **kwargs) -> Iterator[StreamEvent]:
+        return self._stream(self._chat_params(messages, **kwargs))
+    
+    def astream_complete(self, prompt: str, **kwargs) -> AsyncIterator[StreamEvent]:
+        return self._astream(self._complete_params(prompt, **kwargs))
+    
+    def astream_chat(self, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[StreamEvent]:
+        return self._astream(self._chat_params(messages, **kwargs))
             
     def validate_api_key(self) -> bool:
         try:
@@ -1,5 +1,10 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from functools import partial
+from typing import List, Dict, Any, AsyncIterator, Iterator
+import time
+
+from .types import CompletionResult, StreamEvent
 
 class BaseProvider(ABC):
     @abstractmethod
@@ -21,3 +26,68 @@ class BaseProvider(ABC):
     def validate_api_key(self) -> bool:
         """Validate the API key."""
         pass
+
+    async def acomplete(self, prompt: str, **kwargs) -> str:
+        """
+        Asynchronously generate completion for the given prompt.
+        Providers with a native async client override this; the default
+        runs the blocking call in the event loop's executor.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(self.complete, prompt, **kwargs))
+
+    async def achat(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        """Asynchronously generate chat response for the given messages."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(self.chat, messages, **kwargs))
+
+    def _result(self, text: str, start: float, usage=None, model=None) -> CompletionResult:
+        return CompletionResult(text, usage, model or getattr(self, "model", None),
+                                getattr(self, "name", None) or type(self).__name__, time.perf_counter() - start)
+
+    def complete_result(self, prompt: str, **kwargs) -> CompletionResult:
+        """
+        Like complete(), returning a CompletionResult with token usage,
+        model and latency. Providers whose SDK reports usage override this;
+        the default wraps complete() and leaves usage as None.
+        """
+        start = time.perf_counter()
+        return self._result(self.complete(prompt, **kwargs), start)
+
+    def chat_result(self, messages: List[Dict[str, str]], **kwargs) -> CompletionResult:
+        """Like chat(), returning a CompletionResult; see complete_result()."""
+        start = time.perf_counter()
+        return self._result(self.chat(messages, **kwargs), start)
+
+    async def acomplete_result(self, prompt: str, **kwargs) -> CompletionResult:
+        """Async counterpart of complete_result()."""
+        start = time.perf_counter()
+        return self._result(await self.acomplete(prompt, **kwargs), start)
+
+    async def achat_result(self, messages: List[Dict[str, str]], **kwargs) -> CompletionResult:
+        """Async counterpart of chat_result()."""
+        start = time.perf_counter()
+        return self._result(await self.achat(messages, **kwargs), start)
+
+    def stream_complete(self, prompt: str, **kwargs) -> Iterator[StreamEvent]:
+        """
+        Stream a completion as StreamEvent deltas followed by a final done event.
+        The default falls back to a single delta from complete().
+        """
+        yield StreamEvent(self.complete(prompt, **kwargs))
+        yield StreamEvent(done=True, model=getattr(self, "model", None))
+
+    def stream_chat(self, messages: List[Dict[str, str]], **kwargs) -> Iterator[StreamEvent]:
+        """Stream a chat response; see stream_complete()."""
+        yield StreamEvent(self.chat(messages, **kwargs))
+        yield StreamEvent(done=True, model=getattr(self, "model", None))
+
+    async def astream_complete(self, prompt: str, **kwargs) -> AsyncIterator[StreamEvent]:
+        """Async counterpart of stream_complete()."""
+        yield StreamEvent(await self.acomplete(prompt, **kwargs))
+        yield StreamEvent(done=True, model=getattr(self, "model", None))
+
+    async def astream_chat(self, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[StreamEvent]:
+        """Async counterpart of stream_chat()."""
+        yield StreamEvent(await self.achat(messages, **kwargs))
+        yield StreamEvent(done=True, model=getattr(self, "model", None))
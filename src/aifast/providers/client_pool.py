@@ -0,0 +1,156 @@
+from typing import Any, Callable, Dict, Optional, Tuple
+import asyncio
+import atexit
+import threading
+
+import httpx
+
+
+class PoolConfig:
+    """Connection pool settings applied to HTTP clients created by the registry."""
+
+    def __init__(self, max_connections: int = 100, max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30.0, timeout: float = 60.0):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+
+# factory(api_key, base_url, config) -> (sdk_client, http_client)
+ClientFactory = Callable[[str, Optional[str], PoolConfig], Tuple[Any, Any]]
+
+
+class PooledClient:
+    """
+    Provider attribute for a shared client, looked up in the registry by the
+    instance's name, api_key and base_url on every access. Clients closed by
+    close_clients() are therefore rebuilt on next use instead of failing.
+    Assigning the attribute on an instance (e.g. a test double) overrides it.
+    """
+
+    def __init__(self, factory: ClientFactory, is_async: bool = False):
+        self.factory = factory
+        self.is_async = is_async
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return _registry.get(instance.name, instance.api_key, instance.base_url, self.factory, self.is_async)
+
+
+class ClientRegistry:
+    """
+    Process-wide cache of SDK clients keyed by provider, API key, base URL
+    and sync/async flavour, so providers created per request reuse pooled
+    connections instead of paying connection setup on every call.
+    """
+
+    def __init__(self, config: Optional[PoolConfig] = None):
+        self.config = config or PoolConfig()
+        self._clients: Dict[Tuple[str, str, Optional[str], bool], Tuple[Any, Any]] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, **settings) -> PoolConfig:
+        """Update pool settings; affects clients created after the call."""
+        with self._lock:
+            for name, value in settings.items():
+                if not hasattr(self.config, name):
+                    raise ValueError(f"Unknown pool setting: {name}")
+                setattr(self.config, name, value)
+            return self.config
+
+    def get(self, provider: str, api_key: str, base_url: Optional[str], factory: ClientFactory,
+            is_async: bool = False) -> Any:
+        key = (provider, api_key, base_url, is_async)
+        entry = self._clients.get(key)
+        if entry is None:
+            with self._lock:
+                entry = self._clients.get(key)
+                if entry is None:
+                    entry = factory(api_key, base_url, self.config)
+                    self._clients[key] = entry
+        return entry[0]
+
+    def _drain(self):
+        with self._lock:
+            entries = list(self._clients.items())
+            self._clients.clear()
+        return entries
+
+    def close(self):
+        """
+        Close every pooled client. Safe to call more than once; providers
+        get fresh clients on their next call.
+        """
+        async_clients = []
+        for key, (_, http_client) in self._drain():
+            if key[3]:
+                async_clients.append(http_client)
+            else:
+                http_client.close()
+        if async_clients:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                asyncio.run(_aclose_all(async_clients))
+            else:
+                raise RuntimeError("close_clients() called inside a running event loop; use aclose_clients()")
+
+    async def aclose(self):
+        """Close every pooled client from inside an event loop."""
+        async_clients = []
+        for key, (_, http_client) in self._drain():
+            if key[3]:
+                async_clients.append(http_client)
+            else:
+                http_client.close()
+        await _aclose_all(async_clients)
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+
+async def _aclose_all(http_clients):
+    for http_client in http_clients:
+        try:
+            await http_client.aclose()
+        except RuntimeError:
+            # Connections bound to an event loop that has already closed
+            pass
+
+
+_registry = ClientRegistry()
+
+
+def get_registry() -> ClientRegistry:
+    return _registry
+
+
+def configure_pool(**settings) -> PoolConfig:
+    """Set max_connections, max_keepalive_connections, keepalive_expiry or timeout."""
+    return _registry.configure(**settings)
+
+
+def get_client(provider: str, api_key: str, base_url: Optional[str], factory: ClientFactory,
+               is_async: bool = False) -> Any:
+    return _registry.get(provider, api_key, base_url, factory, is_async)
+
+
+def close_clients():
+    """Shutdown hook: close all pooled HTTP connections (also run at exit)."""
+    _registry.close()
+
+
+async def aclose_clients():
+    await _registry.aclose()
+
+
+atexit.register(close_clients)
@@ -1,49 +1,166 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Iterator, Optional
+import time
 from .base import BaseProvider
+from .types import CompletionResult, StreamEvent, Usage
+from .client_pool import PooledClient, PoolConfig
+from .errors import translate_error
 import cohere
+import httpx
+
+def _build_client(api_key: str, base_url: Optional[str], config: PoolConfig):
+    http_client = httpx.Client(limits=config.limits(), timeout=config.timeout)
+    client = cohere.Client(api_key, base_url=base_url, timeout=config.timeout, httpx_client=http_client)
+    return client, http_client
+
+def _build_async_client(api_key: str, base_url: Optional[str], config: PoolConfig):
+    http_client = httpx.AsyncClient(limits=config.limits(), timeout=config.timeout)
+    client = cohere.AsyncClient(api_key, base_url=base_url, timeout=config.timeout, httpx_client=http_client)
+    return client, http_client
 
 class CohereProvider(BaseProvider):
-    def __init__(self, api_key: str, model: str = "command"):
+    name = "cohere"
+    # Clients are shared process-wide per api_key/base_url (see client_pool)
+    client = PooledClient(_build_client)
+    async_client = PooledClient(_build_async_client, is_async=True)
+
+    def __init__(self, api_key: str, model: str = "command", base_url: Optional[str] = None):
         self.api_key = api_key
         self.model = model
-        self.client = cohere.Client(api_key)
+        self.base_url = base_url
+    
+    def _generate_params(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "prompt": prompt,
+            "max_tokens": kwargs.get('max_tokens', 150),
+            "temperature": kwargs.get('temperature', 0.7)
+        }
+    
+    def _chat_params(self, messages: List[Dict[str, str]], **kwargs) -> Dict[str, Any]:
+        # Convert standard messages to Cohere chat format
+        chat_history = []
+        for msg in messages:
+            role = msg["role"]
+            if role == "system":
+                # Add system message as a preamble
+                chat_history.append({"role": "CHATBOT", "message": msg["content"]})
+            else:
+                chat_history.append({
+                    "role": "USER" if role == "user" else "CHATBOT",
+                    "message": msg["content"]
+                })
+        
+        return {
+            "model": self.model,
+            "message": messages[-1]["content"],  # Current message
+            "chat_history": chat_history[:-1],   # Previous messages
+            "temperature": kwargs.get('temperature', 0.7)
+        }
+    
+    def _billed_usage(self, response) -> Optional[Usage]:
+        meta = getattr(response, "meta", None)
+        billed = getattr(meta, "billed_units", None)
+        if billed is None:
+            return None
+        return Usage(billed.input_tokens, billed.output_tokens)
     
     def complete(self, prompt: str, **kwargs) -> str:
+        return self.complete_result(prompt, **kwargs).text
+    
+    def chat(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        return self.chat_result(messages, **kwargs).text
+    
+    async def acomplete(self, prompt: str, **kwargs) -> str:
+        return (await self.acomplete_result(prompt, **kwargs)).text
+    
+    async def achat(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        return (await self.achat_result(messages, **kwargs)).text
+    
+    def complete_result(self, prompt: str, **kwargs) -> CompletionResult:
+        start = time.perf_counter()
         try:
-            response = self.client.generate(
-                model=self.model,
-                prompt=prompt,
-                max_tokens=kwargs.get('max_tokens', 150),
-                temperature=kwargs.get('temperature', 0.7)
-            )
-            return response.generations[0].text.strip()
+            response = self.client.generate(**self._generate_params(prompt, **kwargs))
+            return self._result(response.generations[0].text.strip(), start, self._billed_usage(response))
         except Exception as e:
-            raise Exception(f"Cohere API error: {str(e)}")
+            raise translate_error(e, "Cohere") from e
     
-    def chat(self, messages: List[Dict[str, str]], **kwargs) -> str:
+    def chat_result(self, messages: List[Dict[str, str]], **kwargs) -> CompletionResult:
+        start = time.perf_counter()
         try:
-            # Convert standard messages to Cohere chat format
-            chat_history = []
-            for msg in messages:
-                role = msg["role"]
-                if role == "system":
-                    # Add system message as a preamble
-                    chat_history.append({"role": "CHATBOT", "message": msg["content"]})
-                else:
-                    chat_history.append({
-                        "role": "USER" if role == "user" else "CHATBOT",
-                        "message": msg["content"]
-                    })
-            
-            response = self.client.chat(
-                model=self.model,
-                message=messages[-1]["content"],  # Current message
-                chat_history=chat_history[:-1],   # Previous messages
-                temperature=kwargs.get('temperature', 0.7)
-            )
-            return response.text
+            response = self.client.chat(**self._chat_params(messages, **kwargs))
+            return self._result(response.text, start, self._billed_usage(response))
+        except Exception as e:
+            raise translate_error(e, "Cohere") from e
+    
+    async def acomplete_result(self, prompt: str, **kwargs) -> CompletionResult:
+        start = time.perf_counter()
+        try:
+            response = await self.async_client.generate(**self._generate_params(prompt, **kwargs))
+            return self._result(response.generations[0].text.strip(), start, self._billed_usage(response))
+        except Exception as e:
+            raise translate_error(e, "Cohere") from e
+    
+    async def achat_result(self, messages: List[Dict[str, str]], **kwargs) -> CompletionResult:
+        start = time.perf_counter()
+        try:
+            response = await self.async_client.chat(**self._chat_params(messages, **kwargs))
+            return self._result(response.text, start, self._billed_usage(response))
+        except Exception as e:
+            raise translate_error(e, "Cohere") from e
+    
+    def _end_event(self, event) -> StreamEvent:
+        # Only chat stream-end responses carry billed token counts
+        return StreamEvent(done=True, usage=self._billed_usage(event.response), model=self.model)
+    
+    def _stream(self, method: str, params: Dict[str, Any]) -> Iterator[StreamEvent]:
+        events = None
+        try:
+            # Opened inside the try so errors starting the stream are translated too
+            events = getattr(self.client, method)(**params)
+            end = None
+            for event in events:
+                if event.event_type == "text-generation":
+                    yield StreamEvent(event.text)
+                elif event.event_type == "stream-end":
+                    end = self._end_event(event)
+            yield end or StreamEvent(done=True, model=self.model)
         except Exception as e:
-            raise Exception(f"Cohere API error: {str(e)}")
+            raise translate_error(e, "Cohere") from e
+        finally:
+            # Release the connection when the consumer stops early
+            close = getattr(events, "close", None)
+            if close is not None:
+                close()
+    
+    async def _astream(self, method: str, params: Dict[str, Any]) -> AsyncIterator[StreamEvent]:
+        events = None
+        try:
+            events = getattr(self.async_client, method)(**params)
+            end = None
+            async for event in events:
+                if event.event_type == "text-generation":
+                    yield StreamEvent(event.text)
+                elif event.event_type == "stream-end":
+                    end = self._end_event(event)
+            yield end or StreamEvent(done=True, model=self.model)
+        except Exception as e:
+            raise translate_error(e, "Cohere") from e
+        finally:
+            aclose = getattr(events, "aclose", None)
+            if aclose is not None:
+                await aclose()
+    
+    def stream_complete(self, prompt: str, **kwargs) -> Iterator[StreamEvent]:
+        return self._stream("generate_stream", self._generate_params(prompt, **kwargs))
+    
+    def stream_chat(self, messages: List[Dict[str, str]], **kwargs) -> Iterator[StreamEvent]:
+        return self._stream("chat_stream", self._chat_params(messages, **kwargs))
+    
+    def astream_complete(self, prompt: str, **kwargs) -> AsyncIterator[StreamEvent]:
+        return self._astream("generate_stream", self._generate_params(prompt, **kwargs))
+    
+    def astream_chat(self, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[StreamEvent]:
+        return self._astream("chat_stream", self._chat_params(messages, **kwargs))
             
     def validate_api_key(self) -> bool:
         try:
@@ -51,4 +168,4 @@ class CohereProvider(BaseProvider):
             self.client.generate(prompt="test", max_tokens=1)
             return True
         except:
-            return False 
\ No newline at end of file
+            return False
@@ -0,0 +1,128 @@
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+import time
+
+
+class ProviderError(Exception):
+    """
+    Base class for provider API errors. Keeps the HTTP status code and any
+    Retry-After hint so callers can tell a 429 from a 400.
+    """
+    retryable = False
+
+    def __init__(self, message: str, provider: Optional[str] = None, status_code: Optional[int] = None,
+                 retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.provider = provider
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class RateLimitError(ProviderError):
+    """429: too many requests or tokens."""
+    retryable = True
+
+
+class OverloadedError(ProviderError):
+    """5xx or 529: the provider is failing or overloaded."""
+    retryable = True
+
+
+class ProviderTimeoutError(ProviderError):
+    """The request timed out or the connection failed before a response."""
+    retryable = True
+
+
+class AuthenticationError(ProviderError):
+    """401/403: missing, invalid or unauthorized API key."""
+
+
+class BadRequestError(ProviderError):
+    """Other 4xx: the request itself is invalid and will not succeed on retry."""
+
+
+def _headers(error: BaseException) -> Optional[Mapping[str, str]]:
+    headers = getattr(error, "headers", None)
+    if headers is None:
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None)
+    return headers
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def _is_timeout(error: BaseException) -> bool:
+    name = type(error).__name__
+    return isinstance(error, (TimeoutError, ConnectionError)) or "Timeout" in name or "Connection" in name
+
+
+def parse_retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Seconds to wait from retry-after-ms / Retry-After (delta seconds or HTTP date)."""
+    if not headers:
+        return None
+    try:
+        value = headers.get("retry-after-ms")
+        if value is not None:
+            return max(0.0, float(value) / 1000.0)
+        value = headers.get("retry-after")
+    except AttributeError:
+        return None
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def translate_error(error: BaseException, provider: str) -> ProviderError:
+    """Map an SDK exception onto the ProviderError hierarchy."""
+    if isinstance(error, ProviderError):
+        return error
+    message = f"{provider} API error: {str(error)}"
+    status = _status_code(error)
+    retry_after = parse_retry_after(_headers(error))
+    if status is not None:
+        if status == 429:
+            cls = RateLimitError
+        elif status >= 500:
+            cls = OverloadedError
+        elif status in (401, 403):
+            cls = AuthenticationError
+        elif status == 408:
+            cls = ProviderTimeoutError
+        elif 400 <= status < 500:
+            cls = BadRequestError
+        else:
+            cls = ProviderError
+    elif _is_timeout(error):
+        cls = ProviderTimeoutError
+    else:
+        cls = ProviderError
+    return cls(message, provider=provider, status_code=status, retry_after=retry_after)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    True for errors worth retrying (here or on another backend): rate limits,
+    overload/5xx and timeouts. Untyped errors are classified by walking their
+    cause/context chain for a status code or timeout.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, ProviderError):
+            return error.retryable
+        seen.add(id(error))
+        if _status_code(error) is not None or _is_timeout(error):
+            return translate_error(error, "").retryable
+        error = error.__cause__ or error.__context__
+    return False
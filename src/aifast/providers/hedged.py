@@ -0,0 +1,258 @@
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from functools import partial
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+import asyncio
+import threading
+import time
+
+from .base import BaseProvider
+from .types import CompletionResult, StreamEvent
+from ..utils.stats import LatencyWindow
+from ..utils.tokens import count_tokens
+
+
+class HedgedProvider(BaseProvider):
+    """
+    Provider wrapper that cuts tail latency with hedged requests.
+
+    If a call has not returned within the given percentile of recent
+    latency, a duplicate is sent to the alternate provider (or the same one)
+    and whichever answers first wins; the loser is cancelled (async) or its
+    result discarded (sync, where running threads cannot be interrupted).
+
+    Hedging is bounded by a credit budget: every call earns budget credits
+    and every hedge spends one, so at most about budget * calls hedges are
+    sent. No hedging happens until min_samples latencies have been observed.
+    Streams are not hedged and go to the primary provider.
+
+    With a rate_limiter, each hedge reserves its own request and token
+    estimate first, and is skipped if the budget is not available right
+    now. The answer that is not used still counts: its reported usage
+    replaces the hedge's reservation and is added to usage_tracker (an
+    async attempt cancelled before answering is recorded without usage).
+    AIInterface passes its rate limiter and usage tracker in; pass the
+    alternate's own limiter in the hedge options when it has one.
+
+    Sync calls run the primary and the hedge on worker threads so the caller
+    can take whichever answer comes first. Each hedgeable call needs two
+    workers, so up to max_workers // 2 calls at a time can be hedged; calls
+    beyond that run on the caller's thread without hedging, and the pool
+    never queues work or grows past max_workers.
+    """
+    name = "hedged"
+
+    def __init__(self, primary: BaseProvider, alternate: Optional[BaseProvider] = None,
+                 percentile: float = 95.0, budget: float = 0.1, min_samples: int = 20,
+                 min_delay: float = 0.0, max_workers: int = 64, window: int = 500,
+                 rate_limiter=None, usage_tracker=None):
+        self.primary = primary
+        self.alternate = alternate or primary
+        self.model = getattr(primary, "model", None)
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.rate_limiter = rate_limiter
+        self.usage_tracker = usage_tracker
+        self.latency = LatencyWindow(window)
+        max_workers = max(2, max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="aifast-hedge")
+        # One slot per hedgeable sync call: a worker for the primary and one for its hedge
+        self._slots = threading.BoundedSemaphore(max_workers // 2)
+        self._lock = threading.Lock()
+        self._credits = 0.0
+        self._max_credits = max(1.0, budget * 100)
+        self.stats = {"calls": 0, "hedges": 0, "hedge_wins": 0}
+
+    def hedge_delay(self) -> Optional[float]:
+        """Current delay before hedging, or None while there are too few samples."""
+        if len(self.latency) < self.min_samples:
+            return None
+        return max(self.min_delay, self.latency.percentile(self.percentile))
+
+    def _earn(self):
+        with self._lock:
+            self.stats["calls"] += 1
+            self._credits = min(self._max_credits, self._credits + self.budget)
+
+    def _request_tokens(self, payload: Any, kwargs: Dict) -> int:
+        text = payload if isinstance(payload, str) else "".join(m["content"] for m in payload)
+        return (count_tokens(text, getattr(self.alternate, "name", None), getattr(self.alternate, "model", None))
+                + kwargs.get('max_tokens', 0))
+
+    def _spend(self, payload: Any, kwargs: Dict) -> Optional[int]:
+        """Take a credit and rate-limit budget for a hedge; the tokens reserved, or None to not hedge."""
+        if self._credits < 1.0:
+            return None
+        tokens = self._request_tokens(payload, kwargs) if self.rate_limiter is not None else 0
+        with self._lock:
+            if self._credits < 1.0:
+                return None
+            if self.rate_limiter is not None and not self.rate_limiter.try_acquire(tokens):
+                return None
+            self._credits -= 1.0
+            self.stats["hedges"] += 1
+            return tokens
+
+    def _record_loser(self, provider: BaseProvider, method: str, tokens: int, result: Any = None):
+        """Account for an attempt whose answer was not used (result None: cancelled before answering)."""
+        if not method.endswith("_result"):
+            return
+        if result is None:
+            result = CompletionResult("", None, getattr(provider, "model", None),
+                                      getattr(provider, "name", None) or type(provider).__name__)
+        if self.rate_limiter is not None and tokens and result.usage is not None:
+            self.rate_limiter.reconcile(tokens, result.usage.total_tokens)
+        if self.usage_tracker is not None:
+            self.usage_tracker.record(result)
+
+    def _loser_done(self, provider: BaseProvider, method: str, tokens: int, future: Future):
+        if not future.cancelled() and future.exception() is None:
+            self._record_loser(provider, method, tokens, future.result())
+
+    def _release_after(self, futures: List[Future]):
+        """Free the call's slot once all its attempts have finished; a losing sync attempt runs on."""
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def finished(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            self._slots.release()
+
+        for future in futures:
+            future.add_done_callback(finished)
+
+    def _timed(self, provider: BaseProvider, method: str, payload: Any, kwargs: Dict, record: bool):
+        start = time.perf_counter()
+        result = getattr(provider, method)(payload, **kwargs)
+        if record:
+            self.latency.add(time.perf_counter() - start)
+        return result
+
+    def _call(self, method: str, payload: Any, kwargs: Dict) -> str:
+        self._earn()
+        delay = self.hedge_delay()
+        if delay is None or not self._slots.acquire(blocking=False):
+            return self._timed(self.primary, method, payload, kwargs, record=True)
+
+        # Only the primary's latency feeds the window, so hedge wins do not bias it
+        primary = self._executor.submit(self._timed, self.primary, method, payload, kwargs, True)
+        attempts = {primary: self.primary}
+        try:
+            done, _ = wait([primary], timeout=delay)
+            tokens = None if done else self._spend(payload, kwargs)
+            if tokens is None:
+                return primary.result()
+
+            hedge = self._executor.submit(self._timed, self.alternate, method, payload, kwargs, False)
+            attempts[hedge] = self.alternate
+            pending = set(attempts)
+            error = None
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        if future is hedge:
+                            with self._lock:
+                                self.stats["hedge_wins"] += 1
+                        for loser in attempts:
+                            if loser is not future:
+                                loser.add_done_callback(partial(self._loser_done, attempts[loser], method, tokens))
+                        return future.result()
+                    error = error or future.exception()
+            raise error
+        finally:
+            self._release_after(list(attempts))
+
+    async def _atimed(self, provider: BaseProvider, method: str, payload: Any, kwargs: Dict, record: bool):
+        start = time.perf_counter()
+        result = await getattr(provider, "a" + method)(payload, **kwargs)
+        if record:
+            self.latency.add(time.perf_counter() - start)
+        return result
+
+    async def _acall(self, method: str, payload: Any, kwargs: Dict) -> str:
+        self._earn()
+        delay = self.hedge_delay()
+        if delay is None:
+            return await self._atimed(self.primary, method, payload, kwargs, record=True)
+
+        primary = asyncio.ensure_future(self._atimed(self.primary, method, payload, kwargs, True))
+        attempts = {primary: self.primary}
+        pending = {primary}
+        tokens = None
+        # Whatever happens, including the caller being cancelled, no attempt outlives the call
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            tokens = None if done else self._spend(payload, kwargs)
+            if tokens is None:
+                return await primary
+
+            hedge = asyncio.ensure_future(self._atimed(self.alternate, method, payload, kwargs, False))
+            attempts[hedge] = self.alternate
+            pending = {primary, hedge}
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            with self._lock:
+                                self.stats["hedge_wins"] += 1
+                        for other in done:
+                            if other is not task and other.exception() is None:
+                                self._record_loser(attempts[other], method, tokens, other.result())
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+                if tokens is not None:
+                    self._record_loser(attempts[task], method, tokens)
+
+    def complete(self, prompt: str, **kwargs) -> str:
+        return self._call("complete", prompt, kwargs)
+
+    def chat(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        return self._call("chat", messages, kwargs)
+
+    async def acomplete(self, prompt: str, **kwargs) -> str:
+        return await self._acall("complete", prompt, kwargs)
+
+    async def achat(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        return await self._acall("chat", messages, kwargs)
+
+    def complete_result(self, prompt: str, **kwargs) -> CompletionResult:
+        return self._call("complete_result", prompt, kwargs)
+
+    def chat_result(self, messages: List[Dict[str, str]], **kwargs) -> CompletionResult:
+        return self._call("chat_result", messages, kwargs)
+
+    async def acomplete_result(self, prompt: str, **kwargs) -> CompletionResult:
+        return await self._acall("complete_result", prompt, kwargs)
+
+    async def achat_result(self, messages: List[Dict[str, str]], **kwargs) -> CompletionResult:
+        return await self._acall("chat_result", messages, kwargs)
+
+    def stream_complete(self, prompt: str, **kwargs) -> Iterator[StreamEvent]:
+        return self.primary.stream_complete(prompt, **kwargs)
+
+    def stream_chat(self, messages: List[Dict[str, str]], **kwargs) -> Iterator[StreamEvent]:
+        return self.primary.stream_chat(messages, **kwargs)
+
+    def astream_complete(self, prompt: str, **kwargs) -> AsyncIterator[StreamEvent]:
+        return self.primary.astream_complete(prompt, **kwargs)
+
+    def astream_chat(self, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[StreamEvent]:
+        return self.primary.astream_chat(messages, **kwargs)
+
+    def validate_api_key(self) -> bool:
+        return self.primary.validate_api_key()
+
+    def close(self):
+        """Shut down the worker threads used for sync hedging."""
+        self._executor.shutdown(wait=False)
@@ -1,36 +1,132 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Iterator, Optional
+import time
 from .base import BaseProvider
-from openai import OpenAI
+from .types import CompletionResult, StreamEvent, Usage
+from .client_pool import PooledClient, PoolConfig
+from .errors import translate_error
+import openai
+from openai import OpenAI, AsyncOpenAI
+
+def _build_client(api_key: str, base_url: Optional[str], config: PoolConfig):
+    http_client = openai.DefaultHttpxClient(limits=config.limits(), timeout=config.timeout)
+    return OpenAI(api_key=api_key, base_url=base_url, http_client=http_client), http_client
+
+def _build_async_client(api_key: str, base_url: Optional[str], config: PoolConfig):
+    http_client = openai.DefaultAsyncHttpxClient(limits=config.limits(), timeout=config.timeout)
+    return AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client), http_client
 
 class OpenAIProvider(BaseProvider):
-    def __init__(self, api_key: str, model: str = "gpt-3.5-turbo"):
+    name = "openai"
+    # Clients are shared process-wide per api_key/base_url (see client_pool)
+    client = PooledClient(_build_client)
+    async_client = PooledClient(_build_async_client, is_async=True)
+
+    def __init__(self, api_key: str, model: str = "gpt-3.5-turbo", base_url: Optional[str] = None):
         self.api_key = api_key
         self.model = model
-        self.client = OpenAI(api_key=api_key)
+        self.base_url = base_url
+    
+    def _request_params(self, messages: List[Dict[str, str]], **kwargs) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": kwargs.get('max_tokens', 150),
+            "temperature": kwargs.get('temperature', 0.7)
+        }
+    
+    def _response_result(self, response, start: float) -> CompletionResult:
+        usage = self._usage(response.usage) if response.usage is not None else None
+        return self._result(response.choices[0].message.content.strip(), start, usage, response.model)
     
     def complete(self, prompt: str, **kwargs) -> str:
+        return self.chat_result([{"role": "user", "content": prompt}], **kwargs).text
+    
+    def chat(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        return self.chat_result(messages, **kwargs).text
+    
+    async def acomplete(self, prompt: str, **kwargs) -> str:
+        return (await self.achat_result([{"role": "user", "content": prompt}], **kwargs)).text
+    
+    async def achat(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        return (await self.achat_result(messages, **kwargs)).text
+    
+    def complete_result(self, prompt: str, **kwargs) -> CompletionResult:
+        return self.chat_result([{"role": "user", "content": prompt}], **kwargs)
+    
+    def chat_result(self, messages: List[Dict[str, str]], **kwargs) -> CompletionResult:
+        start = time.perf_counter()
         try:
             response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=kwargs.get('max_tokens', 150),
-                temperature=kwargs.get('temperature', 0.7)
+                **self._request_params(messages, **kwargs)
             )
-            return response.choices[0].message.content.strip()
+            return self._response_result(response, start)
         except Exception as e:
-            raise Exception(f"OpenAI API error: {str(e)}")
+            raise translate_error(e, "OpenAI") from e
     
-    def chat(self, messages: List[Dict[str, str]], **kwargs) -> str:
+    async def acomplete_result(self, prompt: str, **kwargs) -> CompletionResult:
+        return await self.achat_result([{"role": "user", "content": prompt}], **kwargs)
+    
+    async def achat_result(self, messages: List[Dict[str, str]], **kwargs) -> CompletionResult:
+        start = time.perf_counter()
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=kwargs.get('temperature', 0.7),
-                max_tokens=kwargs.get('max_tokens', 150)
+            response = await self.async_client.chat.completions.create(
+                **self._request_params(messages, **kwargs)
+            )
+            return self._response_result(response, start)
+        except Exception as e:
+            raise translate_error(e, "OpenAI") from e
+    
+    def _usage(self, usage) -> Usage:
+        return Usage(usage.prompt_tokens, usage.completion_tokens)
+    
+    def stream_complete(self, prompt: str, **kwargs) -> Iterator[StreamEvent]:
+        return self.stream_chat([{"role": "user", "content": prompt}], **kwargs)
+    
+    def stream_chat(self, messages: List[Dict[str, str]], **kwargs) -> Iterator[StreamEvent]:
+        stream = None
+        try:
+            stream = self.client.chat.completions.create(
+                **self._request_params(messages, **kwargs),
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            usage = None
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield StreamEvent(chunk.choices[0].delta.content)
+                if chunk.usage:
+                    usage = self._usage(chunk.usage)
+            yield StreamEvent(done=True, usage=usage, model=self.model)
+        except Exception as e:
+            raise translate_error(e, "OpenAI") from e
+        finally:
+            # Release the connection when the consumer stops early
+            if stream is not None:
+                stream.close()
+    
+    def astream_complete(self, prompt: str, **kwargs) -> AsyncIterator[StreamEvent]:
+        return self.astream_chat([{"role": "user", "content": prompt}], **kwargs)
+    
+    async def astream_chat(self, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[StreamEvent]:
+        stream = None
+        try:
+            stream = await self.async_client.chat.completions.create(
+                **self._request_params(messages, **kwargs),
+                stream=True,
+                stream_options={"include_usage": True}
             )
-            return response.choices[0].message.content.strip()
+            usage = None
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield StreamEvent(chunk.choices[0].delta.content)
+                if chunk.usage:
+                    usage = self._usage(chunk.usage)
+            yield StreamEvent(done=True, usage=usage, model=self.model)
         except Exception as e:
-            raise Exception(f"OpenAI API error: {str(e)}")
+            raise translate_error(e, "OpenAI") from e
+        finally:
+            if stream is not None:
+                await stream.close()
             
     def validate_api_key(self) -> bool:
         try:
@@ -0,0 +1,340 @@
+from collections import deque
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
+import threading
+import time
+
+from .base import BaseProvider
+from .errors import OverloadedError, is_retryable
+from .types import CompletionResult, StreamEvent, Usage
+from ..utils.stats import LatencyWindow
+from ..utils.tokens import count_tokens
+
+
+class Backend:
+    """One provider in a router pool, with its observed latency and error rate."""
+
+    def __init__(self, provider: BaseProvider, name: Optional[str] = None, rate_limiter=None,
+                 window: int = 200):
+        self.provider = provider
+        self.name = name or f"{getattr(provider, 'name', type(provider).__name__)}:{getattr(provider, 'model', '')}"
+        self.rate_limiter = rate_limiter
+        self.latency = LatencyWindow(window)
+        self._outcomes = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+        self.cooldown_until = 0.0
+
+    def record_success(self, seconds: Optional[float]):
+        if seconds is not None:
+            self.latency.add(seconds)
+        with self._lock:
+            self._outcomes.append(True)
+            self.requests += 1
+            self.consecutive_failures = 0
+
+    def record_failure(self, error: BaseException, cooldown: float):
+        with self._lock:
+            self._outcomes.append(False)
+            self.requests += 1
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_error = str(error)
+            # Back off exponentially from a backend that keeps failing
+            backoff = cooldown * (2 ** min(self.consecutive_failures - 1, 5))
+            self.cooldown_until = time.monotonic() + backoff
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            if not self._outcomes:
+                return 0.0
+            return self._outcomes.count(False) / len(self._outcomes)
+
+    def request_tokens(self, text: str, max_tokens: int) -> int:
+        """Rate-limit cost of a request, counted with this backend's tokenizer."""
+        provider = getattr(self.provider, 'name', None)
+        return count_tokens(text, provider, getattr(self.provider, 'model', None)) + max_tokens
+
+    def budget(self) -> Optional[Dict[str, float]]:
+        if self.rate_limiter is None:
+            return None
+        return self.rate_limiter.available()
+
+    def available(self, now: float) -> bool:
+        return now >= self.cooldown_until
+
+    def score(self) -> float:
+        """Lower is better: p95 latency inflated by the recent error rate."""
+        p95 = self.latency.percentile(95)
+        if p95 is None:
+            # Untried backends go first so every backend gets measured
+            return 0.0
+        return p95 * (1.0 + 10.0 * self.error_rate)
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "p50": self.latency.percentile(50),
+            "p95": self.latency.percentile(95),
+            "error_rate": self.error_rate,
+            "requests": self.requests,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "cooling_down": not self.available(time.monotonic()),
+            "last_error": self.last_error,
+            "budget": self.budget()
+        }
+
+
+class _Routing:
+    """
+    One routed call: picks candidate backends in rank order, taking each
+    one's rate-limit budget, classifies failures and logs the decision.
+    Usage reported by the chosen backend replaces its token reservation.
+    """
+
+    def __init__(self, router: 'RouterProvider', method: str, payload: Any, kwargs: Dict):
+        self.router = router
+        self.method = method
+        self.tokens = router._tokens(payload, kwargs)
+        self.ranked = router._ranked(self.tokens)
+        self.attempts: List[Dict[str, Any]] = []
+
+    def candidates(self) -> Iterator[Backend]:
+        """Backends that got rate-limit budget; the last candidate waits for it rather than being skipped."""
+        for i, backend in enumerate(self.ranked):
+            limiter = backend.rate_limiter
+            if limiter is not None:
+                if i == len(self.ranked) - 1:
+                    admitted = limiter.acquire(self.tokens[backend])
+                else:
+                    admitted = limiter.try_acquire(self.tokens[backend])
+                if not admitted:
+                    self.attempts.append({"backend": backend.name, "error": "rate limited"})
+                    continue
+            yield backend
+
+    async def acandidates(self) -> AsyncIterator[Backend]:
+        for i, backend in enumerate(self.ranked):
+            limiter = backend.rate_limiter
+            if limiter is not None:
+                if i == len(self.ranked) - 1:
+                    admitted = await limiter.aacquire(self.tokens[backend])
+                else:
+                    admitted = limiter.try_acquire(self.tokens[backend])
+                if not admitted:
+                    self.attempts.append({"backend": backend.name, "error": "rate limited"})
+                    continue
+            yield backend
+
+    def fail_over(self, backend: Backend, error: BaseException) -> bool:
+        """Record a failed attempt; False if the error should be raised instead of trying the next backend."""
+        self.attempts.append({"backend": backend.name, "error": str(error)})
+        if not is_retryable(error):
+            # Caller errors (bad request, auth) say nothing about backend health
+            self.router._decide(self.method, self.ranked, None, self.attempts)
+            return False
+        backend.record_failure(error, self.router.cooldown)
+        return True
+
+    def chose(self, backend: Backend):
+        self.router._decide(self.method, self.ranked, backend, self.attempts)
+
+    def _reconcile(self, backend: Backend, usage: Optional[Usage]):
+        reserved = self.tokens.get(backend)
+        if reserved and usage is not None:
+            backend.rate_limiter.reconcile(reserved, usage.total_tokens)
+
+    def succeeded(self, backend: Backend, result: Any, seconds: float) -> Any:
+        backend.record_success(seconds)
+        self.chose(backend)
+        if isinstance(result, CompletionResult):
+            self._reconcile(backend, result.usage)
+        return result
+
+    def settle(self, backend: Backend, event: StreamEvent) -> StreamEvent:
+        """Pass a stream event through, reconciling the reservation with the usage on the final one."""
+        if event.done:
+            self._reconcile(backend, event.usage)
+        return event
+
+    def exhausted(self) -> OverloadedError:
+        self.router._decide(self.method, self.ranked, None, self.attempts)
+        errors = "; ".join(f"{a['backend']}: {a['error']}" for a in self.attempts)
+        return OverloadedError(f"All providers failed: {errors}", provider=self.router.name)
+
+
+class RouterProvider(BaseProvider):
+    """
+    Provider that routes each call across a pool of providers/models.
+
+    Backends are ranked by observed p95 latency weighted by error rate;
+    backends cooling down after a failure or out of rate-limit budget are
+    tried last. A backend's rate limiter is charged the request's token
+    estimate, corrected to the usage the backend reports (from a
+    CompletionResult or a stream's final event). Timeouts, connection
+    errors, 429s and 5xx responses fail over to the next backend; other errors (bad request, auth) are raised
+    immediately. Per-backend health and recent routing decisions are
+    available from health() and decisions.
+    """
+    name = "router"
+
+    def __init__(self, providers: List[Union[BaseProvider, Backend]], max_attempts: Optional[int] = None,
+                 cooldown: float = 5.0, history: int = 100):
+        if not providers:
+            raise ValueError("RouterProvider needs at least one provider")
+        self.backends = [p if isinstance(p, Backend) else Backend(p) for p in providers]
+        names = set()
+        for i, backend in enumerate(self.backends):
+            if backend.name in names:
+                backend.name = f"{backend.name}#{i}"
+            names.add(backend.name)
+        self.max_attempts = max_attempts or len(self.backends)
+        self.cooldown = cooldown
+        self.decisions = deque(maxlen=history)
+        self.model = ",".join(b.name for b in self.backends)
+
+    def _ranked(self, tokens: Dict[Backend, int]) -> List[Backend]:
+        now = time.monotonic()
+
+        def key(backend: Backend):
+            budget = backend.budget()
+            exhausted = budget is not None and (budget["requests"] < 1 or budget["tokens"] < tokens[backend])
+            return (not backend.available(now), exhausted, backend.score())
+
+        return sorted(self.backends, key=key)[:self.max_attempts]
+
+    def _tokens(self, payload: Union[str, List[Dict[str, str]]], kwargs: Dict) -> Dict[Backend, int]:
+        """Request cost per rate-limited backend; backends may count tokens differently."""
+        limited = [b for b in self.backends if b.rate_limiter is not None]
+        if not limited:
+            return {}
+        text = payload if isinstance(payload, str) else "".join(m["content"] for m in payload)
+        max_tokens = kwargs.get('max_tokens', 0)
+        return {b: b.request_tokens(text, max_tokens) for b in limited}
+
+    def _decide(self, method: str, ranked: List[Backend], chosen: Optional[Backend],
+                attempts: List[Dict[str, Any]]):
+        self.decisions.append({
+            "time": time.time(),
+            "method": method,
+            "ranking": [b.name for b in ranked],
+            "chosen": chosen.name if chosen else None,
+            "attempts": attempts
+        })
+
+    def _route(self, method: str, payload: Any, kwargs: Dict) -> str:
+        call = _Routing(self, method, payload, kwargs)
+        for backend in call.candidates():
+            start = time.perf_counter()
+            try:
+                result = getattr(backend.provider, method)(payload, **kwargs)
+            except Exception as e:
+                if not call.fail_over(backend, e):
+                    raise
+                continue
+            return call.succeeded(backend, result, time.perf_counter() - start)
+        raise call.exhausted()
+
+    async def _aroute(self, method: str, payload: Any, kwargs: Dict) -> str:
+        call = _Routing(self, method, payload, kwargs)
+        async for backend in call.acandidates():
+            start = time.perf_counter()
+            try:
+                result = await getattr(backend.provider, "a" + method)(payload, **kwargs)
+            except Exception as e:
+                if not call.fail_over(backend, e):
+                    raise
+                continue
+            return call.succeeded(backend, result, time.perf_counter() - start)
+        raise call.exhausted()
+
+    def _route_stream(self, method: str, payload: Any, kwargs: Dict) -> Iterator[StreamEvent]:
+        # Fail over only until the first event arrives; after that the stream is committed
+        call = _Routing(self, method, payload, kwargs)
+        for backend in call.candidates():
+            try:
+                stream = getattr(backend.provider, "stream_" + method)(payload, **kwargs)
+                first = next(stream)
+            except Exception as e:
+                if not call.fail_over(backend, e):
+                    raise
+                continue
+            call.chose(backend)
+            yield call.settle(backend, first)
+            try:
+                for event in stream:
+                    yield call.settle(backend, event)
+            except Exception as e:
+                backend.record_failure(e, self.cooldown)
+                raise
+            backend.record_success(None)
+            return
+        raise call.exhausted()
+
+    async def _aroute_stream(self, method: str, payload: Any, kwargs: Dict) -> AsyncIterator[StreamEvent]:
+        call = _Routing(self, method, payload, kwargs)
+        async for backend in call.acandidates():
+            try:
+                stream = getattr(backend.provider, "astream_" + method)(payload, **kwargs)
+                first = await stream.__anext__()
+            except Exception as e:
+                if not call.fail_over(backend, e):
+                    raise
+                continue
+            call.chose(backend)
+            yield call.settle(backend, first)
+            try:
+                async for event in stream:
+                    yield call.settle(backend, event)
+            except Exception as e:
+                backend.record_failure(e, self.cooldown)
+                raise
+            backend.record_success(None)
+            return
+        raise call.exhausted()
+
+    def complete(self, prompt: str, **kwargs) -> str:
+        return self._route("complete", prompt, kwargs)
+
+    def chat(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        return self._route("chat", messages, kwargs)
+
+    async def acomplete(self, prompt: str, **kwargs) -> str:
+        return await self._aroute("complete", prompt, kwargs)
+
+    async def achat(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        return await self._aroute("chat", messages, kwargs)
+
+    def complete_result(self, prompt: str, **kwargs) -> CompletionResult:
+        return self._route("complete_result", prompt, kwargs)
+
+    def chat_result(self, messages: List[Dict[str, str]], **kwargs) -> CompletionResult:
+        return self._route("chat_result", messages, kwargs)
+
+    async def acomplete_result(self, prompt: str, **kwargs) -> CompletionResult:
+        return await self._aroute("complete_result", prompt, kwargs)
+
+    async def achat_result(self, messages: List[Dict[str, str]], **kwargs) -> CompletionResult:
+        return await self._aroute("chat_result", messages, kwargs)
+
+    def stream_complete(self, prompt: str, **kwargs) -> Iterator[StreamEvent]:
+        return self._route_stream("complete", prompt, kwargs)
+
+    def stream_chat(self, messages: List[Dict[str, str]], **kwargs) -> Iterator[StreamEvent]:
+        return self._route_stream("chat", messages, kwargs)
+
+    def astream_complete(self, prompt: str, **kwargs) -> AsyncIterator[StreamEvent]:
+        return self._aroute_stream("complete", prompt, kwargs)
+
+    def astream_chat(self, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[StreamEvent]:
+        return self._aroute_stream("chat", messages, kwargs)
+
+    def validate_api_key(self) -> bool:
+        return any(backend.provider.validate_api_key() for backend in self.backends)
+
+    def health(self) -> Dict[str, Dict[str, Any]]:
+        """Per-backend latency percentiles, error rate, cooldown and rate-limit budget."""
+        return {backend.name: backend.health() for backend in self.backends}
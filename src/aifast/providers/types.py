@@ -0,0 +1,85 @@
+from typing import Any, Dict, Optional
+
+
+class Usage:
+    """Token usage reported by a provider for one call."""
+    __slots__ = ("prompt_tokens", "completion_tokens")
+
+    def __init__(self, prompt_tokens: int = 0, completion_tokens: int = 0):
+        self.prompt_tokens = int(prompt_tokens or 0)
+        self.completion_tokens = int(completion_tokens or 0)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens
+        }
+
+    def __repr__(self) -> str:
+        return f"Usage(prompt_tokens={self.prompt_tokens}, completion_tokens={self.completion_tokens})"
+
+
+class StreamEvent:
+    """
+    One event from a streaming call. Text arrives as events with a delta;
+    the stream always ends with a single event where done is True, carrying
+    usage (None if the provider does not report it) and the model name.
+    """
+    __slots__ = ("delta", "done", "usage", "model")
+
+    def __init__(self, delta: str = "", done: bool = False, usage: Optional[Usage] = None,
+                 model: Optional[str] = None):
+        self.delta = delta
+        self.done = done
+        self.usage = usage
+        self.model = model
+
+    def __repr__(self) -> str:
+        if self.done:
+            return f"StreamEvent(done=True, usage={self.usage!r}, model={self.model!r})"
+        return f"StreamEvent(delta={self.delta!r})"
+
+
+class CompletionResult:
+    """
+    Text of one completion/chat call with its metadata: token usage (None
+    if the provider does not report it), model, provider name, latency in
+    seconds, whether it was served from the cache, and whether it was
+    shared from an identical call already in flight (coalesced).
+    """
+    __slots__ = ("text", "usage", "model", "provider", "latency", "cached", "coalesced")
+
+    def __init__(self, text: str, usage: Optional[Usage] = None, model: Optional[str] = None,
+                 provider: Optional[str] = None, latency: float = 0.0, cached: bool = False,
+                 coalesced: bool = False):
+        self.text = text
+        self.usage = usage
+        self.model = model
+        self.provider = provider
+        self.latency = latency
+        self.cached = cached
+        self.coalesced = coalesced
+
+    def __str__(self) -> str:
+        return self.text
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "text": self.text,
+            "usage": self.usage.to_dict() if self.usage is not None else None,
+            "model": self.model,
+            "provider": self.provider,
+            "latency": self.latency,
+            "cached": self.cached,
+            "coalesced": self.coalesced
+        }
+
+    def __repr__(self) -> str:
+        return (f"CompletionResult(text={self.text!r}, usage={self.usage!r}, model={self.model!r}, "
+                f"provider={self.provider!r}, latency={self.latency:.3f}, cached={self.cached}, "
+                f"coalesced={self.coalesced})")
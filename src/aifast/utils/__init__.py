@@ -1 +1,24 @@
 """AIFAST package."""
+from .tokens import (
+    Tokenizer,
+    HeuristicTokenizer,
+    TiktokenTokenizer,
+    count_tokens,
+    truncate_to_tokens,
+    get_tokenizer,
+    register_tokenizer
+)
+from .stats import LatencyHistogram
+from .instrumentation import Instrumentation
+
+__all__ = [
+    'Tokenizer',
+    'HeuristicTokenizer',
+    'TiktokenTokenizer',
+    'count_tokens',
+    'truncate_to_tokens',
+    'get_tokenizer',
+    'register_tokenizer',
+    'LatencyHistogram',
+    'Instrumentation'
+]
@@ -0,0 +1,193 @@
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import inspect
+import os
+import threading
+import time
+
+from .stats import LatencyHistogram
+
+Key = Tuple[Optional[str], Optional[str], str]
+
+
+def _label(value: Optional[str]) -> str:
+    text = "" if value is None else str(value)
+    return text.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Instrumentation:
+    """
+    Latency histograms and before/after/error hooks around named stages
+    (e.g. "rate_limit", "network"), labelled by provider and model.
+
+    Pass one to AIInterface(instrumentation=...) to time its stages, and
+    wrap() other steps such as prompt rendering, preprocessing or response
+    formatting. Histograms can be read with snapshot() or exported in the
+    Prometheus text format. Hooks receive (stage, provider, model) before a
+    stage, plus the elapsed seconds after it, plus the exception on error;
+    a failing hook never fails the call (see last_hook_error). Without an
+    Instrumentation, or with enabled=False, stages are not timed.
+    """
+
+    def __init__(self, enabled: bool = True, **histogram_options):
+        self.enabled = enabled
+        self._histogram_options = histogram_options
+        self._histograms: Dict[Key, LatencyHistogram] = {}
+        self._errors: Dict[Key, int] = {}
+        self._lock = threading.Lock()
+        # Hook tuples are replaced, never mutated, so calls read them without locking
+        self._before: Tuple[Callable, ...] = ()
+        self._after: Tuple[Callable, ...] = ()
+        self._error: Tuple[Callable, ...] = ()
+        self.last_hook_error: Optional[Exception] = None
+
+    def add_hook(self, before: Optional[Callable] = None, after: Optional[Callable] = None,
+                 error: Optional[Callable] = None) -> Tuple[Optional[Callable], ...]:
+        """Register callbacks; returns a handle for remove_hook()."""
+        with self._lock:
+            if before is not None:
+                self._before += (before,)
+            if after is not None:
+                self._after += (after,)
+            if error is not None:
+                self._error += (error,)
+        return (before, after, error)
+
+    def remove_hook(self, handle: Tuple[Optional[Callable], ...]):
+        before, after, error = handle
+        with self._lock:
+            self._before = tuple(hook for hook in self._before if hook is not before)
+            self._after = tuple(hook for hook in self._after if hook is not after)
+            self._error = tuple(hook for hook in self._error if hook is not error)
+
+    def _run_hooks(self, hooks: Tuple[Callable, ...], *args):
+        for hook in hooks:
+            try:
+                hook(*args)
+            except Exception as e:
+                self.last_hook_error = e
+
+    def histogram(self, stage: str, provider: Optional[str] = None, model: Optional[str] = None) -> LatencyHistogram:
+        key = (provider, model, stage)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, LatencyHistogram(**self._histogram_options))
+        return histogram
+
+    def record(self, stage: str, seconds: float, provider: Optional[str] = None, model: Optional[str] = None,
+               error: Optional[BaseException] = None):
+        """Add a latency measured elsewhere, running the after or error hooks."""
+        self.histogram(stage, provider, model).add(seconds)
+        if error is None:
+            if self._after:
+                self._run_hooks(self._after, stage, provider, model, seconds)
+            return
+        key = (provider, model, stage)
+        with self._lock:
+            self._errors[key] = self._errors.get(key, 0) + 1
+        if self._error:
+            self._run_hooks(self._error, stage, provider, model, seconds, error)
+
+    def call(self, stage: str, provider: Optional[str], model: Optional[str], func: Callable, *args) -> Any:
+        """Run func(*args) as a timed stage."""
+        if not self.enabled:
+            return func(*args)
+        if self._before:
+            self._run_hooks(self._before, stage, provider, model)
+        start = time.perf_counter()
+        try:
+            result = func(*args)
+        except BaseException as e:
+            self.record(stage, time.perf_counter() - start, provider, model, e)
+            raise
+        self.record(stage, time.perf_counter() - start, provider, model)
+        return result
+
+    async def acall(self, stage: str, provider: Optional[str], model: Optional[str],
+                    func: Callable[..., Awaitable], *args) -> Any:
+        """Await func(*args) as a timed stage."""
+        if not self.enabled:
+            return await func(*args)
+        if self._before:
+            self._run_hooks(self._before, stage, provider, model)
+        start = time.perf_counter()
+        try:
+            result = await func(*args)
+        except BaseException as e:
+            self.record(stage, time.perf_counter() - start, provider, model, e)
+            raise
+        self.record(stage, time.perf_counter() - start, provider, model)
+        return result
+
+    def wrap(self, func: Callable, stage: str, provider: Optional[str] = None,
+             model: Optional[str] = None) -> Callable:
+        """func (sync or async) timed as stage on every call, e.g. wrap(prompts.format_prompt, "render")."""
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_timed(*args, **kwargs):
+                return await self.acall(stage, provider, model, lambda: func(*args, **kwargs))
+            return async_timed
+
+        @wraps(func)
+        def timed(*args, **kwargs):
+            return self.call(stage, provider, model, lambda: func(*args, **kwargs))
+        return timed
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Count, sum, mean, max, p50/p90/p99 and errors per "provider:model:stage"."""
+        with self._lock:
+            items = list(self._histograms.items())
+            errors = dict(self._errors)
+        out = {}
+        for key, histogram in items:
+            provider, model, stage = key
+            stats = histogram.to_dict()
+            stats.update(provider=provider, model=model, stage=stage, errors=errors.get(key, 0))
+            out[f"{provider}:{model}:{stage}"] = stats
+        return out
+
+    def to_prometheus(self, prefix: str = "aifast") -> str:
+        """Histograms (seconds) and error counters in the Prometheus text exposition format."""
+        with self._lock:
+            items = sorted(self._histograms.items(), key=lambda item: tuple(map(str, item[0])))
+            errors = dict(self._errors)
+        name = f"{prefix}_stage_latency_seconds"
+        lines = [f"# HELP {name} Latency of instrumented stages.", f"# TYPE {name} histogram"]
+        error_lines = []
+        for key, histogram in items:
+            provider, model, stage = key
+            labels = f'provider="{_label(provider)}",model="{_label(model)}",stage="{_label(stage)}"'
+            # Every bound is written, empty or not, so each series keeps the same label set
+            buckets = histogram.buckets(empty=True)
+            # Take the total from the same read as the buckets so the series stays cumulative
+            total = buckets[-1][1]
+            for bound, count in buckets[:-1]:
+                lines.append(f'{name}_bucket{{{labels},le="{_number(bound)}"}} {count}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {total}')
+            lines.append(f"{name}_sum{{{labels}}} {_number(histogram.sum)}")
+            lines.append(f"{name}_count{{{labels}}} {total}")
+            error_lines.append(f"{prefix}_stage_errors_total{{{labels}}} {errors.get(key, 0)}")
+        lines.append(f"# HELP {prefix}_stage_errors_total Instrumented stages that raised.")
+        lines.append(f"# TYPE {prefix}_stage_errors_total counter")
+        lines.extend(error_lines)
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str, prefix: str = "aifast"):
+        """Write to_prometheus() atomically, e.g. for node_exporter's textfile collector."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus(prefix))
+        os.replace(tmp_path, path)
+
+    def reset(self):
+        """Drop all histograms and error counts."""
+        with self._lock:
+            self._histograms = {}
+            self._errors = {}
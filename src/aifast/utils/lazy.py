@@ -0,0 +1,31 @@
+from importlib import import_module
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    Module __getattr__ and __dir__ (PEP 562) that import each exported name
+    from its module on first access, so heavy dependencies such as provider
+    SDKs load only when used. exports maps a name to its module, relative to
+    package when it starts with '.'.
+    """
+    namespace = import_module(package).__dict__
+
+    def __getattr__(name: str) -> Any:
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        try:
+            value = getattr(import_module(module, package), name)
+        except ModuleNotFoundError as e:
+            if e.name is None or e.name.split('.')[0] == 'aifast':
+                raise
+            raise ImportError(f"{name} requires the optional '{e.name}' package "
+                              f"(pip install {e.name})", name=e.name) from e
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(exports))
+
+    return __getattr__, __dir__
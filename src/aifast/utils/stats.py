@@ -0,0 +1,111 @@
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+import math
+import threading
+
+
+class LatencyWindow:
+    """Thread-safe sliding window of the most recent latency samples, in seconds."""
+
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Nearest-rank percentile (0-100) of the window, or None when empty."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        rank = max(1, math.ceil(p / 100.0 * len(samples)))
+        return samples[rank - 1]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class LatencyHistogram:
+    """
+    Thread-safe log-bucketed histogram of latencies in seconds (HDR-style).
+    Bucket bounds grow by a factor of 2 ** (1 / buckets_per_doubling) from
+    min_value to max_value, so memory is fixed and percentiles are within
+    that relative error (about 19% for the default 4) over the whole range.
+    Values above max_value land in an overflow bucket.
+    """
+
+    def __init__(self, min_value: float = 1e-6, max_value: float = 3600.0, buckets_per_doubling: int = 4):
+        self.min_value = min_value
+        self._scale = buckets_per_doubling / math.log(2)
+        self._size = math.ceil(math.log(max_value / min_value) * self._scale) + 1
+        self._counts = [0] * (self._size + 1)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def _index(self, seconds: float) -> int:
+        if seconds <= self.min_value:
+            return 0
+        return min(self._size, math.ceil(math.log(seconds / self.min_value) * self._scale))
+
+    def upper_bound(self, index: int) -> float:
+        """Largest value counted in bucket index (inf for the overflow bucket)."""
+        if index >= self._size:
+            return math.inf
+        return self.min_value * math.exp(index / self._scale)
+
+    def add(self, seconds: float):
+        index = self._index(seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.sum += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Percentile (0-100) as the upper bound of its bucket, or None when empty."""
+        with self._lock:
+            if not self.count:
+                return None
+            rank = max(1, math.ceil(p / 100.0 * self.count))
+            seen = 0
+            for index, count in enumerate(self._counts):
+                seen += count
+                if seen >= rank:
+                    return min(self.upper_bound(index), self.max)
+        return self.max
+
+    def buckets(self, empty: bool = False) -> List[Tuple[float, int]]:
+        """
+        Cumulative (upper bound, count) pairs for the non-empty buckets, or
+        with empty=True for every bucket up to and including the overflow one.
+        """
+        out = []
+        seen = 0
+        with self._lock:
+            for index, count in enumerate(self._counts):
+                if count or empty:
+                    seen += count
+                    out.append((self.upper_bound(index), seen))
+        return out
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            count, total, largest = self.count, self.sum, self.max
+        return {
+            "count": count,
+            "sum": total,
+            "mean": total / count if count else None,
+            "max": largest if count else None,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99)
+        }
+
+    def __len__(self) -> int:
+        return self.count
@@ -0,0 +1,158 @@
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+import re
+import threading
+
+# Word-ish pieces in roughly the way BPE pre-tokenizers split text
+_PIECES = re.compile(r"'(?:s|t|re|ve|m|ll|d)\b|[^\W\d_]+|\d{1,3}|[^\s\w]+|\s+", re.IGNORECASE)
+
+# Texts longer than this are counted without caching, so the cache never pins large documents
+_MAX_CACHED_CHARS = 16384
+
+
+class Tokenizer(ABC):
+    """Counts and truncates text in a model's tokens."""
+    name = "tokenizer"
+
+    @abstractmethod
+    def count(self, text: str) -> int:
+        pass
+
+    @abstractmethod
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Longest prefix of text that fits in max_tokens."""
+        pass
+
+
+class HeuristicTokenizer(Tokenizer):
+    """
+    Offline approximation of BPE tokenizers. Text is split into words,
+    numbers (up to 3 digits), punctuation runs and whitespace; short ASCII
+    words count as one token, longer ones one per 6 characters, other
+    scripts more densely. Errs on the high side, which is the safe side for
+    budgets.
+    """
+    name = "heuristic"
+
+    def _piece_tokens(self, piece: str) -> int:
+        first = piece[0]
+        if first.isspace():
+            # A single space is merged into the following word
+            return 0 if piece == ' ' else 1
+        if first.isdigit() or first == "'":
+            return 1
+        if first.isalpha():
+            if piece.isascii():
+                return (len(piece) + 5) // 6
+            if first >= '\u2e80':
+                # CJK and other ideographic scripts: about one token per character
+                return len(piece)
+            return (len(piece) + 2) // 3
+        return (len(piece) + 1) // 2
+
+    def count(self, text: str) -> int:
+        piece_tokens = self._piece_tokens
+        return sum(piece_tokens(piece) for piece in _PIECES.findall(text))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        used = 0
+        for match in _PIECES.finditer(text):
+            piece = match.group()
+            tokens = self._piece_tokens(piece)
+            if used + tokens > max_tokens:
+                # Keep the share of a long piece that still fits
+                keep = len(piece) * (max_tokens - used) // tokens
+                return text[:match.start() + keep]
+            used += tokens
+        return text
+
+
+class TiktokenTokenizer(Tokenizer):
+    """Exact counts for OpenAI models via tiktoken (optional dependency)."""
+    name = "tiktoken"
+
+    def __init__(self, model: Optional[str] = None, encoding: Optional[str] = None):
+        import tiktoken
+        if encoding is not None:
+            self.encoding = tiktoken.get_encoding(encoding)
+        else:
+            try:
+                self.encoding = tiktoken.encoding_for_model(model or "")
+            except KeyError:
+                self.encoding = tiktoken.get_encoding("cl100k_base")
+
+    def count(self, text: str) -> int:
+        return len(self.encoding.encode_ordinary(text))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        tokens = self.encoding.encode_ordinary(text)
+        if len(tokens) <= max_tokens:
+            return text
+        # A cut inside a multi-byte character decodes to a replacement character
+        return self.encoding.decode(tokens[:max_tokens]).rstrip('\ufffd')
+
+
+_tokenizers: Dict[Tuple[str, str], Tokenizer] = {}
+_resolved: Dict[Tuple[Optional[str], Optional[str]], Tokenizer] = {}
+_tokenizers_lock = threading.Lock()
+_heuristic = HeuristicTokenizer()
+_tiktoken_unavailable = False
+
+
+def register_tokenizer(tokenizer: Tokenizer, provider: str = "*", model: str = "*"):
+    """Use tokenizer for a provider/model pair ("*" matches any)."""
+    with _tokenizers_lock:
+        _tokenizers[(provider, model)] = tokenizer
+        _resolved.clear()
+
+
+def _default_tokenizer(provider: Optional[str], model: Optional[str]) -> Tokenizer:
+    global _tiktoken_unavailable
+    if provider == "openai" and not _tiktoken_unavailable:
+        try:
+            return TiktokenTokenizer(model)
+        except Exception:
+            # tiktoken missing, or its encoding files unavailable offline; don't try again
+            _tiktoken_unavailable = True
+    return _heuristic
+
+
+def get_tokenizer(provider: Optional[str] = None, model: Optional[str] = None) -> Tokenizer:
+    """
+    Tokenizer for a provider/model: a registered one if any, tiktoken for
+    OpenAI models when it is installed and its encodings are available,
+    otherwise the offline heuristic. Resolved tokenizers are cached.
+    """
+    key = (provider, model)
+    tokenizer = _resolved.get(key)
+    if tokenizer is not None:
+        return tokenizer
+    with _tokenizers_lock:
+        tokenizer = (_tokenizers.get((provider, model)) or _tokenizers.get((provider, "*"))
+                     or _tokenizers.get(("*", "*")))
+    if tokenizer is None:
+        tokenizer = _default_tokenizer(provider, model)
+    with _tokenizers_lock:
+        return _resolved.setdefault(key, tokenizer)
+
+
+@lru_cache(maxsize=4096)
+def _cached_count(tokenizer: Tokenizer, text: str) -> int:
+    return tokenizer.count(text)
+
+
+def count_tokens(text: str, provider: Optional[str] = None, model: Optional[str] = None,
+                 tokenizer: Optional[Tokenizer] = None) -> int:
+    """Token count of text for a provider/model (or an explicit tokenizer), cached for repeated texts."""
+    tokenizer = tokenizer or get_tokenizer(provider, model)
+    if len(text) > _MAX_CACHED_CHARS:
+        return tokenizer.count(text)
+    return _cached_count(tokenizer, text)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, provider: Optional[str] = None,
+                       model: Optional[str] = None, tokenizer: Optional[Tokenizer] = None) -> str:
+    """Longest prefix of text that fits in max_tokens tokens."""
+    tokenizer = tokenizer or get_tokenizer(provider, model)
+    return tokenizer.truncate(text, max(0, max_tokens))
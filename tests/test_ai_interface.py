@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import time
+
+from aifast.core.ai_interface import AIInterface
+from aifast.core.cache import MemoryCache
+from aifast.core.retry import RetryPolicy
+from aifast.providers.base import BaseProvider
+from aifast.providers.errors import OverloadedError
+from aifast.providers.types import Usage
+
+
+class CountingProvider(BaseProvider):
+    name = "counting"
+    model = "m"
+
+    def __init__(self, api_key="", delay=0.0, failures=0):
+        self.delay = delay
+        self.failures = failures
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def complete(self, prompt, **kwargs):
+        return self.complete_result(prompt, **kwargs).text
+
+    def chat(self, messages, **kwargs):
+        return self.complete(messages[-1]["content"], **kwargs)
+
+    def complete_result(self, prompt, **kwargs):
+        start = time.perf_counter()
+        with self._lock:
+            self.calls += 1
+            fail = self.failures > 0
+            self.failures -= fail
+        time.sleep(self.delay)
+        if fail:
+            raise OverloadedError("down", self.name, 503)
+        return self._result(f"echo {prompt}", start, Usage(3, 2))
+
+    async def acomplete_result(self, prompt, **kwargs):
+        await asyncio.sleep(self.delay)
+        return self.complete_result(prompt, **kwargs)
+
+    def validate_api_key(self):
+        return True
+
+
+def test_coalesces_identical_concurrent_requests():
+    provider = CountingProvider(delay=0.05)
+    ai = AIInterface(provider, coalesce=True)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(ai.complete_result("same"))) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert provider.calls == 1
+    assert {result.text for result in results} == {"echo same"}
+    assert sum(result.coalesced for result in results) == 5
+    # Coalesced results carry no usage; the tokens were spent once
+    assert [result.usage is None for result in results].count(False) == 1
+
+
+def test_async_coalescing_and_distinct_params():
+    provider = CountingProvider(delay=0.02)
+    ai = AIInterface(provider, coalesce=True)
+
+    async def main():
+        return await asyncio.gather(ai.acomplete("a"), ai.acomplete("a"), ai.acomplete("a", max_tokens=5))
+
+    assert asyncio.run(main()) == ["echo a"] * 3
+    assert provider.calls == 2
+
+
+def test_cache_short_circuits_repeats():
+    provider = CountingProvider()
+    ai = AIInterface(provider, cache=MemoryCache())
+    assert ai.complete("x") == ai.complete("x") == "echo x"
+    assert provider.calls == 1
+    assert ai.complete_result("x").cached
+
+
+def test_retry_policy_wraps_provider_calls():
+    provider = CountingProvider(failures=2)
+    ai = AIInterface(provider, retry=RetryPolicy(base_delay=0.001))
+    assert ai.complete("y") == "echo y"
+    assert provider.calls == 3
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("anthropic")
+
+from aifast.providers import anthropic_provider  # noqa: E402
+from aifast.providers.anthropic_provider import AnthropicProvider, _sdk_params  # noqa: E402
+from aifast.providers.errors import (  # noqa: E402
+    AuthenticationError, OverloadedError, ProviderTimeoutError, RateLimitError,
+)
+
+
+class _Reply:
+    class usage:
+        input_tokens = 3
+        output_tokens = 2
+
+    model = "stub"
+
+    class _Text:
+        text = "hi"
+
+    content = [_Text()]
+
+
+class _Messages:
+    def __init__(self):
+        self.calls = []
+
+    def create(self, **params):
+        self.calls.append(params)
+        return _Reply()
+
+
+class _Client:
+    def __init__(self):
+        self.messages = _Messages()
+
+
+def test_undeclared_params_move_to_extra_body():
+    params = {"model": "m", "max_tokens": 5, "temperature": 0.2, "extra_body": {"top_k": 3}}
+    assert _sdk_params(params, frozenset({"model", "max_tokens", "extra_body"})) == {
+        "model": "m", "max_tokens": 5, "extra_body": {"top_k": 3, "temperature": 0.2}}
+    assert _sdk_params(params, None) is params
+
+
+def test_create_receives_only_declared_arguments(monkeypatch):
+    monkeypatch.setattr(anthropic_provider, "_CREATE_PARAMS", frozenset({"model", "messages", "max_tokens",
+                                                                         "system", "extra_body"}))
+    provider = AnthropicProvider("key")
+    provider.client = _Client()
+    result = provider.chat_result([{"role": "user", "content": "hello"}], temperature=0.1)
+    assert result.text == "hi" and result.usage.total_tokens == 5
+    params = provider.client.messages.calls[-1]
+    assert "system" not in params and "temperature" not in params
+    assert params["extra_body"] == {"temperature": 0.1}
+
+
+class SDKError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+class _AsyncMessages(_Messages):
+    def __init__(self, error=None):
+        super().__init__()
+        self.error = error
+
+    async def create(self, **params):
+        if self.error is not None:
+            raise self.error
+        return super().create(**params)
+
+
+class _AsyncClient:
+    def __init__(self, error=None):
+        self.messages = _AsyncMessages(error)
+
+
+def test_async_results_translate_usage(monkeypatch):
+    monkeypatch.setattr(anthropic_provider, "_CREATE_PARAMS", None)
+    provider = AnthropicProvider("key")
+    provider.async_client = _AsyncClient()
+    result = asyncio.run(provider.acomplete_result("hello", max_tokens=20))
+    assert result.text == "hi" and result.model == "stub" and result.provider == "anthropic"
+    assert (result.usage.prompt_tokens, result.usage.completion_tokens) == (3, 2)
+    assert provider.async_client.messages.calls[-1]["max_tokens"] == 20
+
+    messages = [{"role": "system", "content": "be brief"}, {"role": "user", "content": "hello"}]
+    assert asyncio.run(provider.achat_result(messages)).usage.total_tokens == 5
+    params = provider.async_client.messages.calls[-1]
+    assert params["system"] == "be brief"
+    assert params["messages"] == [{"role": "user", "content": "hello"}]
+    assert asyncio.run(provider.acomplete("hello")) == "hi"
+    assert asyncio.run(provider.achat(messages)) == "hi"
+
+
+@pytest.mark.parametrize("error, expected", [
+    (SDKError(429), RateLimitError),
+    (SDKError(529), OverloadedError),
+    (SDKError(403), AuthenticationError),
+    (ConnectionError("reset"), ProviderTimeoutError),
+])
+def test_async_errors_are_translated(error, expected):
+    provider = AnthropicProvider("key")
+    provider.async_client = _AsyncClient(error)
+    with pytest.raises(expected) as info:
+        asyncio.run(provider.acomplete_result("hello"))
+    assert info.value.provider == "Anthropic" and info.value.__cause__ is error
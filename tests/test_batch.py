@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+import pytest
+
+from aifast.core.batch import BatchResult, aiter_batch, arun_batch, iter_batch, run_batch
+
+
+def _square(x):
+    if x == 3:
+        raise ValueError("bad item")
+    time.sleep(0.001 * (x % 4))
+    return x * x
+
+
+async def _asquare(x):
+    await asyncio.sleep(0.001 * (x % 4))
+    return _square(x)
+
+
+class _Source:
+    """Lazy iterable that counts how many items have been pulled from it."""
+
+    def __init__(self, n):
+        self.n = n
+        self.pulled = 0
+
+    def __iter__(self):
+        for i in range(self.n):
+            self.pulled += 1
+            yield i
+
+
+def test_run_batch_keeps_input_order_and_captures_errors():
+    results = run_batch(_square, range(10), max_workers=4)
+    assert [r.index for r in results] == list(range(10))
+    assert [r.input for r in results] == list(range(10))
+    failed = results[3]
+    assert not failed.ok and isinstance(failed.error, ValueError)
+    with pytest.raises(ValueError, match="bad item"):
+        failed.unwrap()
+    assert [r.unwrap() for r in results if r.ok] == [x * x for x in range(10) if x != 3]
+
+
+def test_iter_batch_does_not_read_ahead_of_window():
+    source = _Source(100)
+    yielded = 0
+    for _ in iter_batch(_square, source, max_workers=2):
+        yielded += 1
+        # Only completed items plus the 2 * max_workers window may have been pulled
+        assert source.pulled - yielded <= 2 * 2
+    assert yielded == 100 and source.pulled == 100
+
+
+def test_iter_batch_rejects_zero_workers():
+    with pytest.raises(ValueError):
+        list(iter_batch(_square, [1], max_workers=0))
+
+
+def test_arun_batch_keeps_input_order_and_captures_errors():
+    results = asyncio.run(arun_batch(_asquare, range(10), max_concurrency=3))
+    assert [r.index for r in results] == list(range(10))
+    assert isinstance(results[3].error, ValueError)
+    assert all(r.value == r.input * r.input for r in results if r.ok)
+
+
+def test_aiter_batch_does_not_read_ahead_of_concurrency():
+    source = _Source(50)
+    running = 0
+    peak = 0
+
+    async def func(x):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001)
+        running -= 1
+        return x
+
+    async def consume():
+        yielded = 0
+        async for result in aiter_batch(func, source, max_concurrency=5):
+            assert isinstance(result, BatchResult)
+            yielded += 1
+            assert source.pulled - yielded <= 5
+        return yielded
+
+    assert asyncio.run(consume()) == 50
+    assert peak <= 5
@@ -0,0 +1,130 @@
+import threading
+import time
+
+import pytest
+
+from aifast.core.cache import MemoryCache, SQLiteCache, make_cache_key
+
+
+def test_cache_key_is_canonical():
+    a = make_cache_key("openai", "gpt-4", "hi", {"temperature": 0.5, "max_tokens": 10})
+    b = make_cache_key("openai", "gpt-4", "hi", {"max_tokens": 10, "temperature": 0.5})
+    assert a == b
+    assert a != make_cache_key("openai", "gpt-4", "hi", {"max_tokens": 11, "temperature": 0.5})
+
+
+def test_memory_cache_lru_eviction():
+    cache = MemoryCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats.evictions == 1
+
+
+def test_memory_cache_ttl():
+    cache = MemoryCache(ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.stats.expirations == 1
+
+
+def test_sqlite_cache_roundtrip_and_ttl(tmp_path):
+    cache = SQLiteCache(tmp_path / "c.db", ttl=0.05)
+    cache.set("a", {"text": "hello"})
+    assert cache.get("a") == {"text": "hello"}
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_sqlite_cache_evicts_lru_in_batches(tmp_path):
+    cache = SQLiteCache(tmp_path / "c.db", maxsize=100, evict_fraction=0.1, touch_interval=0)
+    for i in range(100):
+        cache.set(f"k{i}", i)
+    assert len(cache) == 100
+    cache.get("k0")  # refresh the oldest row so it survives eviction
+    cache.set("k100", 100)
+    assert len(cache) == 90
+    assert cache.get("k0") == 0
+    assert cache.get("k100") == 100
+    assert cache.get("k1") is None
+    assert cache.stats.evictions == 11
+    for i in range(101, 300):
+        cache.set(f"k{i}", i)
+        assert 90 <= len(cache) <= 100
+
+
+def test_sqlite_cache_small_maxsize_keeps_newest(tmp_path):
+    cache = SQLiteCache(tmp_path / "c.db", maxsize=1)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert len(cache) == 1
+    assert cache.get("b") == 2
+
+
+def test_sqlite_cache_hits_within_touch_interval_do_not_write(tmp_path):
+    cache = SQLiteCache(tmp_path / "c.db", maxsize=10, touch_interval=3600)
+    cache.set("a", 1)
+    conn = cache._connect()
+    before = conn.total_changes
+    for _ in range(10):
+        assert cache.get("a") == 1
+    assert conn.total_changes == before
+
+
+def test_sqlite_cache_close_and_reuse(tmp_path):
+    cache = SQLiteCache(tmp_path / "c.db")
+    cache.set("a", 1)
+    worker_conn = []
+
+    def worker():
+        cache.get("a")
+        worker_conn.append(cache._connect())
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    main_conn = cache._connect()
+    cache.close()
+    for conn in (main_conn, worker_conn[0]):
+        with pytest.raises(Exception):
+            conn.execute("SELECT 1")
+    # A fresh connection is opened on next use
+    assert cache.get("a") == 1
+
+
+def test_sqlite_maxsize_holds_across_handles(tmp_path):
+    path = tmp_path / "shared.db"
+    first = SQLiteCache(path, maxsize=100)
+    second = SQLiteCache(path, maxsize=100)
+    for i in range(100):
+        first.set(f"a{i}", i)
+        second.set(f"b{i}", i)
+    assert len(first) == len(second) <= 100
+    second.set("b0", "overwrite")  # updating a row does not change the count
+    rows = first._connect().execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+    assert rows == len(first)
+    first.close()
+    second.close()
+
+
+def test_sqlite_counts_rows_of_existing_file(tmp_path):
+    import sqlite3
+
+    path = tmp_path / "old.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE completions (key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                 "expires REAL, accessed REAL NOT NULL)")
+    conn.executemany("INSERT INTO completions VALUES (?, '1', NULL, ?)", [(f"k{i}", i) for i in range(30)])
+    conn.commit()
+    conn.close()
+    cache = SQLiteCache(path, maxsize=20, evict_fraction=0.0)
+    assert len(cache) == 30
+    cache.set("new", 1)
+    assert len(cache) == 20
+    assert cache.get("new") == 1 and cache.get("k0") is None
+    cache.close()
@@ -0,0 +1,104 @@
+import random
+import re
+
+import pytest
+
+from aifast.core.chunking import chunk_text
+from aifast.utils.tokens import HeuristicTokenizer, Tokenizer
+
+_WORD = re.compile(r'\S+')
+
+
+class WordTokenizer(Tokenizer):
+    """One token per whitespace-separated word, so expected chunks are easy to read."""
+
+    def count(self, text):
+        return len(_WORD.findall(text))
+
+    def truncate(self, text, max_tokens):
+        words = list(_WORD.finditer(text))
+        if len(words) <= max_tokens:
+            return text
+        return text[:words[max_tokens - 1].end()] if max_tokens else ''
+
+
+WORDS = WordTokenizer()
+
+
+def _sentence(rng, index):
+    return ' '.join(f"w{index}_{i}" for i in range(rng.randint(1, 8))) + rng.choice('.!?')
+
+
+def _document(rng):
+    paragraphs = []
+    index = 0
+    for _ in range(rng.randint(1, 6)):
+        sentences = []
+        for _ in range(rng.randint(1, 5)):
+            sentences.append(_sentence(rng, index))
+            index += 1
+        paragraphs.append(' '.join(sentences))
+    return '\n\n'.join(paragraphs)
+
+
+def _sentences(text):
+    return [s for s in re.split(r'(?<=[.!?])\s+', text) if s]
+
+
+def test_paragraphs_are_packed_whole():
+    text = "One two three.\n\nFour five.\n\nSix seven eight nine."
+    assert chunk_text(text, 5, tokenizer=WORDS) == ["One two three.\n\nFour five.", "Six seven eight nine."]
+
+
+def test_long_paragraph_splits_at_sentences():
+    text = "A b c. D e f. G h i."
+    assert chunk_text(text, 6, tokenizer=WORDS) == ["A b c. D e f.", "G h i."]
+
+
+def test_long_sentence_is_hard_split():
+    text = "one two three four five six seven"
+    assert chunk_text(text, 3, tokenizer=WORDS) == ["one two three", "four five six", "seven"]
+
+
+def test_overlap_repeats_trailing_sentences():
+    text = "A b. C d. E f. G h."
+    chunks = chunk_text(text, 4, overlap=2, tokenizer=WORDS)
+    assert chunks == ["A b. C d.", "C d. E f.", "E f. G h."]
+
+
+@pytest.mark.parametrize('max_tokens, overlap', [(4, 0), (8, 3), (12, 5), (30, 10)])
+def test_random_documents_respect_limits_and_boundaries(max_tokens, overlap):
+    rng = random.Random(max_tokens)
+    for _ in range(50):
+        text = _document(rng)
+        chunks = chunk_text(text, max_tokens, overlap=overlap, tokenizer=WORDS)
+        sentences = set(_sentences(text))
+        previous = None
+        for chunk in chunks:
+            assert chunk in text
+            assert WORDS.count(chunk) <= max_tokens
+            # Sentences are at most 8 words, so they fit whole whenever max_tokens >= 8
+            if max_tokens >= 8:
+                assert all(s in sentences for s in _sentences(chunk))
+            if previous is not None and overlap:
+                shared = [s for s in _sentences(chunk) if s in _sentences(previous)]
+                assert WORDS.count(' '.join(shared)) <= overlap
+            previous = chunk
+        # Every word appears in some chunk, in order
+        covered = [w for chunk in chunks for w in chunk.split()]
+        assert [w for w in dict.fromkeys(covered)] == text.split()
+
+
+def test_chunks_fit_the_real_tokenizer():
+    tokenizer = HeuristicTokenizer()
+    text = _document(random.Random(7)) * 3
+    for chunk in chunk_text(text, 20, overlap=5, tokenizer=tokenizer):
+        assert tokenizer.count(chunk) <= 20
+
+
+def test_rejects_bad_limits():
+    with pytest.raises(ValueError):
+        chunk_text("a", 0)
+    with pytest.raises(ValueError):
+        chunk_text("a", 5, overlap=5)
+    assert chunk_text("   \n\n ", 5, tokenizer=WORDS) == []
@@ -0,0 +1,78 @@
+import pytest
+
+from aifast.providers.client_pool import ClientRegistry, PoolConfig, PooledClient, get_registry
+
+
+class FakeHTTP:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    async def aclose(self):
+        self.closed = True
+
+
+def factory(api_key, base_url, config):
+    http_client = FakeHTTP()
+    return ("sdk", api_key, base_url, http_client), http_client
+
+
+class FakeProvider:
+    name = "fake"
+    client = PooledClient(factory)
+    async_client = PooledClient(factory, is_async=True)
+
+    def __init__(self, api_key, base_url=None):
+        self.api_key = api_key
+        self.base_url = base_url
+
+
+def test_registry_shares_clients_per_key():
+    registry = ClientRegistry(PoolConfig())
+    a = registry.get("fake", "k1", None, factory)
+    assert registry.get("fake", "k1", None, factory) is a
+    assert registry.get("fake", "k2", None, factory) is not a
+    assert registry.get("fake", "k1", None, factory, is_async=True) is not a
+    assert len(registry) == 3
+
+
+def test_registry_close_closes_sync_and_async_clients():
+    registry = ClientRegistry(PoolConfig())
+    sync_client = registry.get("fake", "k", None, factory)
+    async_client = registry.get("fake", "k", None, factory, is_async=True)
+    registry.close()
+    assert sync_client[3].closed and async_client[3].closed
+    assert len(registry) == 0
+    registry.close()  # idempotent
+
+
+def test_providers_get_fresh_clients_after_close():
+    provider = FakeProvider("pool-test-key")
+    first = provider.client
+    assert provider.client is first
+    assert FakeProvider("pool-test-key").client is first
+    get_registry().close()
+    assert first[3].closed
+    second = provider.client
+    assert second is not first and not second[3].closed
+    assert provider.async_client is not second
+
+
+def test_assigned_client_overrides_pool():
+    provider = FakeProvider("pool-test-key")
+    provider.client = "double"
+    assert provider.client == "double"
+    assert FakeProvider("pool-test-key").client != "double"
+
+
+def test_openai_provider_reconnects_after_close_clients():
+    pytest.importorskip("openai")
+    from aifast.providers import OpenAIProvider, close_clients
+
+    provider = OpenAIProvider("sk-test", base_url="http://127.0.0.1:9/v1")
+    client = provider.client
+    close_clients()
+    assert provider.client is not client
+    assert not provider.client._client.is_closed
@@ -0,0 +1,159 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("cohere")
+
+from aifast.providers.cohere_provider import CohereProvider  # noqa: E402
+from aifast.providers.errors import (  # noqa: E402
+    AuthenticationError, BadRequestError, OverloadedError, RateLimitError,
+)
+
+
+class SDKError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+def _events():
+    billed = SimpleNamespace(input_tokens=4, output_tokens=2)
+    yield SimpleNamespace(event_type="text-generation", text="Hello")
+    yield SimpleNamespace(event_type="text-generation", text=" world")
+    yield SimpleNamespace(event_type="stream-end", response=SimpleNamespace(meta=SimpleNamespace(billed_units=billed)))
+
+
+class StreamClient:
+    def __init__(self, error=None):
+        self.error = error
+        self.closed = False
+
+    def chat_stream(self, **params):
+        if self.error is not None:
+            raise self.error
+        return self._generator()
+
+    def _generator(self):
+        try:
+            yield from _events()
+        finally:
+            self.closed = True
+
+
+class AsyncStreamClient(StreamClient):
+    def chat_stream(self, **params):
+        if self.error is not None:
+            raise self.error
+        return self._agenerator()
+
+    async def _agenerator(self):
+        try:
+            for event in _events():
+                yield event
+        finally:
+            self.closed = True
+
+
+def _provider(client, async_client=None):
+    provider = CohereProvider("key")
+    provider.client = client
+    provider.async_client = async_client
+    return provider
+
+
+def test_stream_events_and_usage():
+    events = list(_provider(StreamClient()).stream_chat([{"role": "user", "content": "hi"}]))
+    assert "".join(e.delta for e in events) == "Hello world"
+    assert events[-1].done and events[-1].usage.total_tokens == 6
+
+
+def test_errors_opening_stream_are_translated():
+    provider = _provider(StreamClient(SDKError(429)), AsyncStreamClient(SDKError(429)))
+    with pytest.raises(RateLimitError):
+        list(provider.stream_chat([{"role": "user", "content": "hi"}]))
+
+    async def consume():
+        return [event async for event in provider.astream_chat([{"role": "user", "content": "hi"}])]
+
+    with pytest.raises(RateLimitError):
+        asyncio.run(consume())
+
+
+def test_stopping_early_closes_sdk_stream():
+    client = StreamClient()
+    stream = _provider(client).stream_chat([{"role": "user", "content": "hi"}])
+    next(stream)
+    stream.close()
+    assert client.closed
+
+    async_client = AsyncStreamClient()
+    provider = _provider(None, async_client)
+
+    async def first_only():
+        stream = provider.astream_chat([{"role": "user", "content": "hi"}])
+        await stream.__anext__()
+        await stream.aclose()
+
+    asyncio.run(first_only())
+    assert async_client.closed
+
+
+def _billed(input_tokens=5, output_tokens=4):
+    return SimpleNamespace(billed_units=SimpleNamespace(input_tokens=input_tokens, output_tokens=output_tokens))
+
+
+class AsyncClient:
+    def __init__(self, error=None, meta=None):
+        self.error = error
+        self.meta = meta
+        self.calls = []
+
+    async def generate(self, **params):
+        self.calls.append(params)
+        if self.error is not None:
+            raise self.error
+        return SimpleNamespace(generations=[SimpleNamespace(text=" generated ")], meta=self.meta)
+
+    async def chat(self, **params):
+        self.calls.append(params)
+        if self.error is not None:
+            raise self.error
+        return SimpleNamespace(text="chatted", meta=self.meta)
+
+
+def test_async_results_translate_usage():
+    provider = _provider(None, AsyncClient(meta=_billed()))
+    result = asyncio.run(provider.acomplete_result("hi", max_tokens=9))
+    assert result.text == "generated" and result.provider == "cohere" and result.model == "command"
+    assert (result.usage.prompt_tokens, result.usage.completion_tokens) == (5, 4)
+    assert provider.async_client.calls[-1]["max_tokens"] == 9
+
+    messages = [{"role": "user", "content": "a"}, {"role": "assistant", "content": "b"},
+                {"role": "user", "content": "c"}]
+    result = asyncio.run(provider.achat_result(messages))
+    assert result.text == "chatted" and result.usage.total_tokens == 9
+    params = provider.async_client.calls[-1]
+    assert params["message"] == "c"
+    assert params["chat_history"] == [{"role": "USER", "message": "a"}, {"role": "CHATBOT", "message": "b"}]
+    assert asyncio.run(provider.acomplete("hi")) == "generated"
+    assert asyncio.run(provider.achat(messages)) == "chatted"
+
+    # Responses without billed units leave usage unreported
+    provider.async_client = AsyncClient(meta=None)
+    assert asyncio.run(provider.achat_result(messages)).usage is None
+
+
+@pytest.mark.parametrize("error, expected", [
+    (SDKError(429), RateLimitError),
+    (SDKError(500), OverloadedError),
+    (SDKError(401), AuthenticationError),
+    (SDKError(422), BadRequestError),
+])
+def test_async_errors_are_translated(error, expected):
+    provider = _provider(None, AsyncClient(error))
+    with pytest.raises(expected) as info:
+        asyncio.run(provider.achat_result([{"role": "user", "content": "hi"}]))
+    assert info.value.provider == "Cohere" and info.value.__cause__ is error
+    with pytest.raises(expected):
+        asyncio.run(provider.acomplete_result("hi"))
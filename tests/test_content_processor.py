@@ -0,0 +1,150 @@
+import random
+import time
+
+import pytest
+
+from aifast.core import content_processor
+from aifast.core.content_processor import ContentProcessor, _split_at_whitespace
+
+PIPELINES = [['clean'], ['lowercase', 'clean'], ['remove_special_chars', 'clean', 'lowercase'], ['lowercase']]
+
+
+def _random_chunks(rng):
+    text = ''.join(rng.choice(['a', 'B', '!', ' ', '\n', '  ', 'xyz', '\t\t']) for _ in range(rng.randint(0, 200)))
+    size = rng.randint(1, 9)
+    return text, [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_split_keeps_words_whole():
+    rng = random.Random(0)
+    for _ in range(200):
+        text, chunks = _random_chunks(rng)
+        pieces = list(_split_at_whitespace(chunks))
+        assert ''.join(pieces) == text
+        assert all(piece[:1].isspace() for piece in pieces[1:])
+
+
+@pytest.mark.parametrize('pipeline', PIPELINES)
+def test_process_stream_matches_process(pipeline):
+    rng = random.Random(1)
+    processor = ContentProcessor()
+    for _ in range(100):
+        text, chunks = _random_chunks(rng)
+        assert ''.join(processor.process_stream(iter(chunks), pipeline)) == processor.process(text, pipeline)
+
+
+@pytest.mark.parametrize('pipeline', PIPELINES)
+def test_process_stream_cuts_overlong_words(monkeypatch, pipeline):
+    monkeypatch.setattr(content_processor, '_MAX_CARRY', 3)
+    rng = random.Random(2)
+    processor = ContentProcessor()
+    for _ in range(100):
+        text, chunks = _random_chunks(rng)
+        assert ''.join(processor.process_stream(iter(chunks), pipeline)) == processor.process(text, pipeline)
+
+
+def test_split_bounds_carry():
+    pieces = list(_split_at_whitespace(iter(['x' * 10] * 100), max_carry=25))
+    assert ''.join(pieces) == 'x' * 1000
+    assert max(map(len, pieces)) <= 35
+
+
+def test_whitespace_stream_is_linear():
+    start = time.perf_counter()
+    pieces = _split_at_whitespace(iter([' ' * 65536] * 320))  # 20 MB of spaces
+    assert max(len(piece) for piece in pieces) <= 65536
+    assert time.perf_counter() - start < 2.0
+
+
+def test_process_stream_tokenize_and_clean():
+    processor = ContentProcessor()
+    chunks = ['Hello   Wor', 'ld  ', '   ', '\n\nagain']
+    assert ''.join(processor.process_stream(iter(chunks), ['clean'])) == 'Hello World again'
+    assert [t for piece in processor.process_stream(iter(chunks), ['tokenize']) for t in piece] == \
+        ['Hello', 'World', 'again']
+
+
+def _random_texts(rng, n):
+    alphabet = ['a', 'B', '!', ' ', '\n', 'xyz', 'É', 'ß', '7', '\t']
+    return [''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 40))) for _ in range(n)]
+
+
+@pytest.mark.parametrize('pipeline', PIPELINES + [['clean', 'tokenize']])
+def test_process_batch_matches_process_in_process(pipeline):
+    processor = ContentProcessor()
+    texts = _random_texts(random.Random(4), 50)
+    assert processor.process_batch(texts, pipeline) == [processor.process(text, pipeline) for text in texts]
+    stats = processor.last_batch_stats
+    # 50 items is below min_parallel, so no pool was started
+    assert stats['parallel'] is False and stats['workers'] == 1
+    assert stats['items'] == 50 and stats['seconds'] >= 0
+
+
+def test_process_batch_parallel_keeps_order():
+    processor = ContentProcessor()
+    pipeline = ['remove_special_chars', 'clean', 'lowercase']
+    texts = _random_texts(random.Random(5), 40)
+    results = processor.process_batch(iter(texts), pipeline, workers=2, chunksize=3, min_parallel=1)
+    assert results == [processor.process(text, pipeline) for text in texts]
+    stats = processor.last_batch_stats
+    assert stats['parallel'] is True and stats['workers'] == 2 and stats['items'] == 40
+
+
+def test_process_batch_single_worker_runs_in_process():
+    processor = ContentProcessor()
+    processor.process_batch(['A b'] * 10, ['lowercase'], workers=1, min_parallel=1)
+    assert processor.last_batch_stats['parallel'] is False
+
+
+def test_process_batch_rejects_unknown_step():
+    with pytest.raises(ValueError, match='Unknown pipeline step'):
+        ContentProcessor().process_batch(['a'], ['nope'])
+
+
+FUSABLE = ['lowercase', 'remove_special_chars', 'clean', 'tokenize']
+
+
+def _step_by_step(processor, content, pipeline):
+    for step in pipeline:
+        content = getattr(processor, step)(content)
+    return content
+
+
+def test_compiled_pipeline_matches_step_by_step():
+    rng = random.Random(6)
+    processor = ContentProcessor()
+    texts = _random_texts(rng, 30) + ['İSTANBUL Straße!', 'ÀB c  d', '']
+    for _ in range(50):
+        steps = [rng.choice(FUSABLE[:3]) for _ in range(rng.randint(1, 5))]
+        if rng.random() < 0.3:
+            steps.append('tokenize')
+        compiled = processor.compile_pipeline(steps)
+        assert compiled.steps == tuple(steps)
+        for text in texts:
+            assert compiled(text) == _step_by_step(processor, text, steps)
+
+
+def test_compiled_pipeline_respects_overridden_steps():
+    class Shouting(ContentProcessor):
+        def lowercase(self, text):
+            return text.upper()
+
+    processor = Shouting()
+    pipeline = ['lowercase', 'remove_special_chars']
+    text = 'Hello, World!'
+    assert processor.compile_pipeline(pipeline)(text) == _step_by_step(processor, text, pipeline) == 'HELLO WORLD'
+
+
+def test_compile_pipeline_rejects_steps_after_tokenize():
+    processor = ContentProcessor()
+    with pytest.raises(ValueError, match="'tokenize' returns a list"):
+        processor.compile_pipeline(['clean', 'tokenize', 'lowercase'])
+    with pytest.raises(ValueError, match="'tokenize' returns a list"):
+        processor.process('a b', ['tokenize', 'clean'])
+
+
+def test_compile_pipeline_unknown_steps():
+    processor = ContentProcessor()
+    with pytest.raises(ValueError, match='Unknown pipeline step'):
+        processor.compile_pipeline(['clean', 'missing'])
+    assert processor.compile_pipeline(['clean', 'missing', '_private'], strict=False).steps == ('clean',)
@@ -0,0 +1,241 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from aifast.core.ai_interface import AIInterface
+from aifast.core.rate_limiter import RateLimiter
+from aifast.core.usage import UsageTracker
+from aifast.providers.base import BaseProvider
+from aifast.providers.hedged import HedgedProvider
+from aifast.providers.types import CompletionResult, Usage
+
+
+class SleepyProvider(BaseProvider):
+    """Answers after delay seconds (sync or async), optionally failing."""
+
+    def __init__(self, api_key="", delay=0.0, answer="ok", error=None):
+        self.delay = delay
+        self.answer = answer
+        self.error = error
+        self.calls = 0
+        self.cancelled = 0
+        self.threads = []
+        self._lock = threading.Lock()
+
+    def complete(self, prompt, **kwargs):
+        with self._lock:
+            self.calls += 1
+            self.threads.append(threading.current_thread().name)
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.answer
+
+    def chat(self, messages, **kwargs):
+        return self.complete(messages[-1]["content"])
+
+    async def acomplete(self, prompt, **kwargs):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        return self.answer
+
+    def complete_result(self, prompt, **kwargs):
+        return CompletionResult(self.complete(prompt), Usage(10, 5), "m", self.answer)
+
+    async def acomplete_result(self, prompt, **kwargs):
+        return CompletionResult(await self.acomplete(prompt), Usage(10, 5), "m", self.answer)
+
+    def validate_api_key(self):
+        return True
+
+
+def warm(hedged, calls=20):
+    for _ in range(calls):
+        hedged.latency.add(hedged.primary.delay)
+    hedged._credits = hedged._max_credits
+
+
+def test_no_hedging_until_min_samples():
+    primary = SleepyProvider(delay=0.01)
+    alternate = SleepyProvider(answer="alt")
+    hedged = HedgedProvider(primary, alternate, min_samples=5)
+    assert hedged.hedge_delay() is None
+    assert hedged.complete("x") == "ok"
+    assert alternate.calls == 0
+
+
+def test_slow_primary_is_hedged():
+    primary = SleepyProvider(delay=0.01)
+    alternate = SleepyProvider(answer="alt")
+    hedged = HedgedProvider(primary, alternate, min_samples=5)
+    warm(hedged)
+    primary.delay = 0.5
+    start = time.perf_counter()
+    assert hedged.complete("x") == "alt"
+    assert time.perf_counter() - start < 0.3
+    assert hedged.stats["hedges"] == 1 and hedged.stats["hedge_wins"] == 1
+    hedged.close()
+
+
+def test_hedge_answers_when_primary_fails():
+    primary = SleepyProvider(delay=0.01)
+    hedged = HedgedProvider(primary, SleepyProvider(delay=0.05, answer="alt"), min_samples=5)
+    warm(hedged)
+    primary.delay, primary.error = 0.03, RuntimeError("boom")
+    assert hedged.complete("x") == "alt"
+
+
+def test_budget_limits_hedges():
+    primary = SleepyProvider(delay=0.01)
+    hedged = HedgedProvider(primary, SleepyProvider(answer="alt"), min_samples=5, budget=0.1)
+    warm(hedged)
+    hedged._credits = 0.0
+    primary.delay = 0.03
+    assert hedged.complete("x") == "ok"
+    assert hedged.stats["hedges"] == 0
+
+
+def test_calls_beyond_pool_are_not_hedged():
+    primary = SleepyProvider(delay=0.05)
+    alternate = SleepyProvider(answer="alt")
+    # Only 4 workers for 16 concurrent calls: calls without a free slot run inline, unhedged
+    hedged = HedgedProvider(primary, alternate, min_samples=5, min_delay=0.08, max_workers=4)
+    warm(hedged)
+    threads = [threading.Thread(target=hedged.complete, args=("x",)) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert hedged.stats["hedges"] == 0
+    assert alternate.calls == 0
+    hedged.close()
+
+
+def test_concurrent_calls_keep_throughput():
+    primary = SleepyProvider(delay=0.1)
+    hedged = HedgedProvider(primary, SleepyProvider(answer="alt"), min_samples=5, min_delay=0.15)
+    warm(hedged)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(hedged.complete("x"))) for _ in range(96)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.perf_counter() - start < 0.25
+    assert results == ["ok"] * 96
+    assert hedged.stats["hedges"] == 0
+    hedged.close()
+
+
+def test_async_hedge_cancels_loser():
+    primary = SleepyProvider(delay=0.01)
+    hedged = HedgedProvider(primary, SleepyProvider(answer="alt"), min_samples=5)
+    warm(hedged)
+    primary.delay = 1.0
+
+    async def run():
+        result = await hedged.acomplete("x")
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(run()) == "alt"
+    assert primary.cancelled == 1
+
+
+def test_async_caller_cancelled_while_waiting_cancels_primary():
+    primary = SleepyProvider(delay=0.01)
+    hedged = HedgedProvider(primary, SleepyProvider(answer="alt"), min_samples=5, min_delay=0.5)
+    warm(hedged)
+    primary.delay = 1.0
+
+    async def run():
+        task = asyncio.ensure_future(hedged.acomplete("x"))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+        return [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+    assert asyncio.run(run()) == []
+    assert primary.cancelled == 1
+
+
+def test_pool_is_sized_to_hedge_fan_out():
+    primary = SleepyProvider(delay=0.05)
+    hedged = HedgedProvider(primary, SleepyProvider(answer="alt"), min_samples=5, min_delay=0.5, max_workers=2)
+    assert hedged._executor._max_workers == 2
+    warm(hedged)
+    threads = [threading.Thread(target=hedged.complete, args=("x",)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # One hedgeable slot: one call ran on the pool, the others on their callers' threads
+    assert sum(name.startswith("aifast-hedge") for name in primary.threads) == 1
+    hedged.close()
+
+
+def test_hedge_reserves_rate_limit_budget():
+    primary = SleepyProvider(delay=0.01)
+    limiter = RateLimiter(requests_per_min=60, tokens_per_min=10000)
+    hedged = HedgedProvider(primary, SleepyProvider(answer="alt"), min_samples=5, rate_limiter=limiter)
+    warm(hedged)
+    primary.delay = 0.3
+    before = limiter.available()["requests"]
+    assert hedged.complete("x", max_tokens=100) == "alt"
+    assert limiter.available()["requests"] == pytest.approx(before - 1, abs=0.1)
+
+    # Without budget for it right now, the call is not hedged
+    limiter.requests.tokens = 0
+    assert hedged.complete("x") == "ok"
+    assert hedged.stats["hedges"] == 1
+    hedged.close()
+
+
+def test_sync_loser_usage_is_recorded_and_reconciled():
+    primary = SleepyProvider(delay=0.01)
+    tracker = UsageTracker()
+    limiter = RateLimiter(requests_per_min=60, tokens_per_min=10000)
+    hedged = HedgedProvider(primary, SleepyProvider(answer="alt"), min_samples=5, rate_limiter=limiter,
+                            usage_tracker=tracker)
+    warm(hedged)
+    primary.delay = 0.2
+    assert hedged.complete_result("x", max_tokens=500).text == "alt"
+    assert tracker.snapshot()["total"]["calls"] == 0  # the primary is still running
+    time.sleep(0.3)
+    snapshot = tracker.snapshot()
+    assert snapshot["models"]["ok:m"]["total_tokens"] == 15
+    # The 500+ token hedge reservation was replaced by the 15 tokens the loser used
+    assert limiter.available()["tokens"] > 10000 - 100
+    hedged.close()
+
+
+def test_async_cancelled_loser_is_recorded_without_usage():
+    primary = SleepyProvider(delay=0.01)
+    tracker = UsageTracker()
+    hedged = HedgedProvider(primary, SleepyProvider(answer="alt"), min_samples=5, usage_tracker=tracker)
+    warm(hedged)
+    primary.delay = 1.0
+    assert asyncio.run(hedged.acomplete_result("x")).text == "alt"
+    entry = tracker.snapshot()["models"]["SleepyProvider:None"]
+    assert entry["calls"] == 1 and entry["unreported"] == 1
+
+
+def test_ai_interface_passes_limiter_and_tracker():
+    limiter = RateLimiter()
+    tracker = UsageTracker()
+    ai = AIInterface(SleepyProvider(), rate_limiter=limiter, usage_tracker=tracker, hedge={"min_samples": 5})
+    assert ai.provider.rate_limiter is limiter and ai.provider.usage_tracker is tracker
+    other = RateLimiter()
+    ai = AIInterface(SleepyProvider(), rate_limiter=limiter, hedge={"rate_limiter": other})
+    assert ai.provider.rate_limiter is other
@@ -0,0 +1,65 @@
+import asyncio
+import re
+
+import pytest
+
+from aifast.utils.instrumentation import Instrumentation
+from aifast.utils.stats import LatencyHistogram
+
+
+def _bucket_bounds(text, stage):
+    return re.findall(rf'_bucket{{[^}}]*stage="{stage}",le="([^"]+)"}}', text)
+
+
+def test_histogram_percentiles_within_bucket_error():
+    histogram = LatencyHistogram()
+    for ms in range(1, 101):
+        histogram.add(ms / 1000)
+    assert histogram.count == 100
+    assert histogram.percentile(50) == pytest.approx(0.05, rel=0.2)
+    assert histogram.percentile(100) == pytest.approx(0.1)
+    assert LatencyHistogram().percentile(50) is None
+
+
+def test_full_bucket_ladder_is_cumulative():
+    histogram = LatencyHistogram(min_value=0.001, max_value=1.0)
+    histogram.add(0.01)
+    histogram.add(5.0)
+    buckets = histogram.buckets(empty=True)
+    assert len(buckets) > len(histogram.buckets()) == 2
+    assert buckets[-1] == (float("inf"), 2)
+    counts = [count for _, count in buckets]
+    assert counts == sorted(counts)
+
+
+def test_prometheus_label_set_is_stable():
+    inst = Instrumentation(min_value=0.001, max_value=1.0)
+    inst.record("fast", 0.002, "p", "m")
+    inst.record("slow", 0.5, "p", "m", error=RuntimeError("boom"))
+    text = inst.to_prometheus()
+    fast, slow = _bucket_bounds(text, "fast"), _bucket_bounds(text, "slow")
+    assert fast == slow and fast[-1] == "+Inf"
+    inst.record("fast", 0.9, "p", "m")
+    assert _bucket_bounds(inst.to_prometheus(), "fast") == fast
+    assert 'aifast_stage_latency_seconds_count{provider="p",model="m",stage="fast"} 2' in inst.to_prometheus()
+    assert 'aifast_stage_errors_total{provider="p",model="m",stage="slow"} 1' in text
+
+
+def test_hooks_and_wrap():
+    inst = Instrumentation()
+    seen = []
+    handle = inst.add_hook(after=lambda stage, provider, model, seconds: seen.append(stage),
+                           error=lambda *args: 1 / 0)
+    assert inst.wrap(lambda x: x * 2, "double")(3) == 6
+
+    async def fail():
+        raise ValueError("no")
+
+    with pytest.raises(ValueError):
+        asyncio.run(inst.wrap(fail, "async")())
+    assert seen == ["double"]
+    assert isinstance(inst.last_hook_error, ZeroDivisionError)
+    inst.remove_hook(handle)
+    snapshot = inst.snapshot()
+    assert snapshot["None:None:double"]["count"] == 1
+    assert snapshot["None:None:async"]["errors"] == 1
@@ -0,0 +1,96 @@
+import json
+import math
+
+import pytest
+
+from aifast.core import json_utils
+from aifast.core.json_utils import (
+    SchemaValidationError, apply_schema, extract_json, loads, validate_schema,
+)
+
+
+def test_extract_whole_response():
+    assert extract_json('  {"a": 1}\n') == {"a": 1}
+    assert extract_json('[1, 2]') == [1, 2]
+
+
+def test_extract_fenced_block():
+    text = 'Here you go:\n```json\n{"a": [1, 2]}\n```\nAnything else?'
+    assert extract_json(text) == {"a": [1, 2]}
+    assert extract_json('```\n[true]\n```') == [True]
+
+
+def test_extract_embedded_and_trailing():
+    assert extract_json('The answer is {"a": 1} as requested.') == {"a": 1}
+    assert extract_json('Sure! Result: [1, {"b": 2}]') == [1, {"b": 2}]
+    # Brackets in the prose around the payload defeat the first-to-last span
+    assert extract_json('Option [a] gives {"a": 1} (see [b])') == {"a": 1}
+
+
+def test_extract_without_json_raises():
+    with pytest.raises(ValueError, match="No JSON"):
+        extract_json("no structured data here")
+    with pytest.raises(ValueError, match="No JSON"):
+        extract_json("broken { payload")
+
+
+def test_extract_gives_up_after_max_candidates():
+    payload = '{"a": 1}'
+    within = "[ x " * (json_utils._MAX_CANDIDATES - 1) + payload
+    beyond = "[ x " * json_utils._MAX_CANDIDATES + payload
+    assert extract_json(within) == {"a": 1}
+    with pytest.raises(ValueError):
+        extract_json(beyond)
+
+
+def test_loads_keeps_long_integers_exact():
+    big = 12345678901234567890123
+    assert loads(f'{{"n": {big}}}') == {"n": big}
+    assert isinstance(loads(str(big)), int)
+
+
+def test_loads_falls_back_for_nan_and_lone_surrogates():
+    assert math.isnan(loads('[NaN]')[0])
+    text = '["\ud800"]'
+    assert loads(text) == json.loads(text)
+
+
+def test_loads_matches_json():
+    text = '{"a": [1, 2.5, "x", null, true], "b": {"c": "\\u00e9"}}'
+    assert loads(text) == json.loads(text)
+    with pytest.raises(ValueError):
+        loads("{not json}")
+
+
+SCHEMA = {
+    "type": "object",
+    "required": ["name", "tags"],
+    "additionalProperties": False,
+    "properties": {
+        "name": {"type": "string"},
+        "kind": {"enum": ["a", "b"]},
+        "tags": {"type": "array", "items": {"type": "string"}},
+    },
+}
+
+
+def test_validate_schema_accepts_matching_value():
+    value = {"name": "x", "kind": "a", "tags": ["t"]}
+    validate_schema(value, SCHEMA)
+    assert apply_schema(value, SCHEMA) is value
+
+
+@pytest.mark.parametrize("value, path, message", [
+    ({"tags": []}, "$", "missing required property 'name'"),
+    ({"name": "x", "tags": [], "extra": 1}, "$", "unexpected property 'extra'"),
+    ({"name": "x", "tags": ["t", 2]}, "$.tags[1]", "expected string"),
+    ({"name": "x", "tags": [], "kind": "c"}, "$.kind", "'c' is not one of"),
+])
+def test_validate_schema_errors(value, path, message):
+    with pytest.raises(SchemaValidationError, match=message) as info:
+        validate_schema(value, SCHEMA)
+    assert info.value.path == path
+
+
+def test_apply_schema_calls_validator():
+    assert apply_schema({"a": 1}, lambda value: value["a"]) == 1
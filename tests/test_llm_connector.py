@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from aifast.core.llm_connector import LLMConnector
+from aifast.providers.types import Usage
+from aifast.utils.tokens import count_tokens
+
+
+def test_rejects_empty_key():
+    with pytest.raises(ValueError):
+        LLMConnector("")
+
+
+def test_admission_enforces_request_limit():
+    connector = LLMConnector("key")
+    connector.set_rate_limits(requests_per_min=2, tokens_per_min=1000)
+    assert connector.check_rate_limit()
+    assert connector.check_rate_limit()
+    assert not connector.check_rate_limit()
+    assert connector.get_rate_limits() == {"requests_per_min": 2, "tokens_per_min": 1000}
+
+
+def test_text_reserves_its_token_estimate():
+    connector = LLMConnector("key")
+    connector.set_rate_limits(requests_per_min=100, tokens_per_min=1000)
+    text = "The quick brown fox jumps over the lazy dog. " * 5
+    estimate = connector.count_tokens(text)
+    assert estimate == count_tokens(text)
+    assert connector.check_rate_limit(tokens=100, text=text)
+    assert connector.limiter.available()["tokens"] == pytest.approx(1000 - 100 - estimate, abs=1)
+
+
+def test_acquire_timeout_and_async_acquire():
+    connector = LLMConnector("key")
+    connector.set_rate_limits(requests_per_min=60, tokens_per_min=60)
+    assert connector.acquire(tokens=60)
+    assert not connector.acquire(tokens=30, timeout=0.01)
+    connector.set_rate_limits(requests_per_min=6000, tokens_per_min=6000)
+    assert asyncio.run(connector.aacquire(tokens=10, text="hello"))
+
+
+def test_record_usage_reconciles_reservation():
+    connector = LLMConnector("key")
+    connector.set_rate_limits(requests_per_min=60, tokens_per_min=1000)
+    connector.acquire(tokens=500)
+    connector.record_usage(Usage(100, 50), reserved=500)
+    assert connector.limiter.available()["tokens"] == pytest.approx(850, abs=1)
+    connector.record_usage(Usage(900, 100))  # nothing reserved: charged in full
+    assert connector.limiter.available()["tokens"] < 1
+
+
+def test_provider_connectors_share_a_limiter():
+    a = LLMConnector("key", provider="connector-test", model="m")
+    b = LLMConnector("other", provider="connector-test", model="m")
+    assert a.limiter is b.limiter
+    assert LLMConnector("key", provider="connector-test", model="n").limiter is not a.limiter
@@ -0,0 +1,139 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("openai")
+
+from aifast.providers.errors import (  # noqa: E402
+    AuthenticationError, BadRequestError, OverloadedError, ProviderTimeoutError, RateLimitError,
+)
+from aifast.providers.openai_provider import OpenAIProvider  # noqa: E402
+
+
+def _chunk(text=None, usage=None):
+    choices = [SimpleNamespace(delta=SimpleNamespace(content=text))] if text is not None else []
+    return SimpleNamespace(choices=choices, usage=usage)
+
+
+class FakeStream:
+    def __init__(self):
+        self.closed = False
+        self.chunks = [_chunk("a"), _chunk("b"), _chunk(usage=SimpleNamespace(prompt_tokens=3, completion_tokens=2))]
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeAsyncStream(FakeStream):
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+
+    async def close(self):
+        self.closed = True
+
+
+def _client(stream, is_async=False):
+    async def acreate(**params):
+        return stream
+
+    create = acreate if is_async else (lambda **params: stream)
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def test_stream_reports_usage_and_closes():
+    stream = FakeStream()
+    provider = OpenAIProvider("key")
+    provider.client = _client(stream)
+    events = list(provider.stream_complete("hi"))
+    assert [e.delta for e in events[:-1]] == ["a", "b"]
+    assert events[-1].usage.total_tokens == 5
+    assert stream.closed
+
+
+def test_stopping_early_closes_stream():
+    stream = FakeStream()
+    provider = OpenAIProvider("key")
+    provider.client = _client(stream)
+    events = provider.stream_complete("hi")
+    next(events)
+    events.close()
+    assert stream.closed
+
+    astream = FakeAsyncStream()
+    provider.async_client = _client(astream, is_async=True)
+
+    async def first_only():
+        events = provider.astream_complete("hi")
+        await events.__anext__()
+        await events.aclose()
+
+    asyncio.run(first_only())
+    assert astream.closed
+
+
+class SDKError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.headers = headers
+
+
+def _response(usage=True):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content="  hello  "))],
+        usage=SimpleNamespace(prompt_tokens=7, completion_tokens=3) if usage else None,
+        model="gpt-4o-2024-08-06")
+
+
+def _async_client(reply):
+    calls = []
+
+    async def create(**params):
+        calls.append(params)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    return SimpleNamespace(calls=calls, chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def test_async_results_translate_usage():
+    provider = OpenAIProvider("key", model="gpt-4o")
+    provider.async_client = _async_client(_response())
+    result = asyncio.run(provider.acomplete_result("hi", max_tokens=20, temperature=0.1))
+    assert result.text == "hello" and result.provider == "openai"
+    assert result.model == "gpt-4o-2024-08-06"
+    assert (result.usage.prompt_tokens, result.usage.completion_tokens) == (7, 3)
+    params = provider.async_client.calls[-1]
+    assert params["messages"] == [{"role": "user", "content": "hi"}]
+    assert params["max_tokens"] == 20 and params["temperature"] == 0.1
+
+    messages = [{"role": "system", "content": "s"}, {"role": "user", "content": "u"}]
+    assert asyncio.run(provider.achat(messages)) == "hello"
+    assert asyncio.run(provider.acomplete("hi")) == "hello"
+    assert provider.async_client.calls[-2]["messages"] == messages
+
+    provider.async_client = _async_client(_response(usage=False))
+    assert asyncio.run(provider.achat_result(messages)).usage is None
+
+
+@pytest.mark.parametrize("error, expected", [
+    (SDKError(429, {"retry-after": "2"}), RateLimitError),
+    (SDKError(503), OverloadedError),
+    (SDKError(401), AuthenticationError),
+    (SDKError(400), BadRequestError),
+    (TimeoutError("read timed out"), ProviderTimeoutError),
+])
+def test_async_errors_are_translated(error, expected):
+    provider = OpenAIProvider("key")
+    provider.async_client = _async_client(error)
+    with pytest.raises(expected) as info:
+        asyncio.run(provider.achat_result([{"role": "user", "content": "hi"}]))
+    assert info.value.provider == "OpenAI" and info.value.__cause__ is error
+    if isinstance(error, SDKError) and error.headers:
+        assert info.value.retry_after == 2.0
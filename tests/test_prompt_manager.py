@@ -0,0 +1,81 @@
+import pytest
+
+from aifast.core.prompt_manager import CompiledTemplate, PromptManager
+
+
+def test_render_many_matches_format_prompt():
+    manager = PromptManager()
+    manager.add_prompt("greet", "Hello {name}, {{literal}}")
+    rows = [{"name": "a"}, {"name": "b"}]
+    assert manager.render_many("greet", rows) == [manager.format_prompt("greet", **row) for row in rows]
+
+
+def test_render_many_unescapes_braces_without_fields():
+    manager = PromptManager()
+    manager.add_prompt("json", 'Reply with {{"ok": true}}')
+    expected = manager.format_prompt("json")
+    assert expected == 'Reply with {"ok": true}'
+    assert manager.render_many("json", [{}, {"unused": 1}]) == [expected, expected]
+
+
+def test_render_many_reports_missing_row():
+    compiled = CompiledTemplate("{a} {b}", "pair")
+    with pytest.raises(KeyError, match=r"pair' \(row 1\): b"):
+        compiled.render_many([{"a": 1, "b": 2}, {"a": 1}])
+
+
+def test_compiled_cache_survives_store_hot_eviction(tmp_path):
+    from aifast.core.prompt_store import SQLitePromptStore
+
+    store = SQLitePromptStore(tmp_path / "prompts.db", hot_size=2)
+    store.update_many({f"p{i}": f"prompt {i}: {{x}}" for i in range(3)})
+    manager = PromptManager(store=store)
+    first = manager.compile("p0")
+    manager.compile("p1")
+    store.clear_hot()  # p0 is re-read from SQLite as a new string object
+    assert manager.compile("p0") is first
+    assert manager.format_prompt("p0", x=1) == "prompt 0: 1"
+    store.close()
+
+
+def test_compiled_cache_bounded_by_store_hot_size(tmp_path):
+    from aifast.core.prompt_store import SQLitePromptStore
+
+    store = SQLitePromptStore(tmp_path / "prompts.db", hot_size=4)
+    store.update_many({f"p{i}": f"prompt {i}: {{x}}" for i in range(20)})
+    manager = PromptManager(store=store)
+    for i in range(20):
+        manager.format_prompt(f"p{i}", x=i)
+    assert len(manager._compiled) == 4
+    store.close()
+
+
+def test_edited_prompt_is_recompiled():
+    manager = PromptManager()
+    manager.add_prompt("p", "old {x}")
+    assert manager.format_prompt("p", x=1) == "old 1"
+    manager.add_prompt("p", "new {y}")
+    assert manager.required_fields("p") == ("y",)
+    manager.prompts["p"] = "direct {z}"
+    assert manager.format_prompt("p", z=2) == "direct 2"
+
+
+def test_reload_keeps_unchanged_compiled_templates(tmp_path):
+    path = tmp_path / "prompts.yaml"
+    path.write_text("a: 'A {x}'\nb: 'B {x}'\n")
+    manager = PromptManager(str(path))
+    compiled_a = manager.compile("a")
+    path.write_text("a: 'A {x}'\nb: 'B2 {x}'\n")
+    manager._signature = None  # mtime may not change within the test's timestamp resolution
+    assert manager.reload()
+    assert manager.compile("a") is compiled_a
+    assert manager.format_prompt("b", x=1) == "B2 1"
+
+
+def test_format_prompt_reports_missing_variables():
+    manager = PromptManager()
+    manager.add_prompt("pair", "{a} and {b} and {c}")
+    with pytest.raises(KeyError, match="Missing variables for prompt 'pair': b, c"):
+        manager.format_prompt("pair", a=1)
+    with pytest.raises(KeyError, match="Missing variables for prompt 'pair': b"):
+        manager.compile("pair").render({"a": 1, "c": 3})
@@ -0,0 +1,93 @@
+import threading
+
+import pytest
+
+from aifast.core.prompt_manager import PromptManager
+from aifast.core.prompt_store import SQLitePromptStore
+
+
+def test_prompts_persist_across_instances(tmp_path):
+    path = tmp_path / "prompts.db"
+    store = SQLitePromptStore(path)
+    store["greet"] = "Hello {name}"
+    store.update_many({"a": "A", "b": "B"})
+    store.close()
+
+    reopened = SQLitePromptStore(path)
+    assert reopened["greet"] == "Hello {name}"
+    assert sorted(reopened) == ["a", "b", "greet"]
+    assert len(reopened) == 3 and "a" in reopened
+    reopened.close()
+
+
+def test_overwrite_replaces_template(tmp_path):
+    store = SQLitePromptStore(tmp_path / "prompts.db", hot_size=1)
+    store["p"] = "old"
+    store["p"] = "new"
+    assert store["p"] == "new"
+    store.update_many({"p": "newer"})
+    assert store["p"] == "newer"
+    store.clear_hot()
+    assert store["p"] == "newer" and len(store) == 1
+    store.close()
+
+
+def test_missing_key(tmp_path):
+    store = SQLitePromptStore(tmp_path / "prompts.db")
+    assert "nope" not in store
+    assert store.get("nope") is None
+    with pytest.raises(KeyError):
+        store["nope"]
+    with pytest.raises(KeyError):
+        del store["nope"]
+    store["p"] = "x"
+    del store["p"]
+    assert "p" not in store
+    store.close()
+
+
+def test_refresh_sees_writes_from_another_handle(tmp_path):
+    path = tmp_path / "prompts.db"
+    reader = SQLitePromptStore(path)
+    writer = SQLitePromptStore(path)
+    writer["p"] = "v1"
+    assert reader["p"] == "v1"
+    writer["p"] = "v2"
+    assert reader["p"] == "v1"  # still hot
+    assert reader.refresh()
+    assert reader["p"] == "v2"
+    assert not reader.refresh()
+    reader.close()
+    writer.close()
+
+
+def test_threads_use_their_own_connections(tmp_path):
+    store = SQLitePromptStore(tmp_path / "prompts.db", hot_size=0)
+    errors = []
+
+    def work(n):
+        try:
+            for i in range(20):
+                store[f"t{n}_{i}"] = str(i)
+                assert store[f"t{n}_{i}"] == str(i)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors and len(store) == 80
+    store.close()
+
+
+def test_prompt_manager_opens_db_path(tmp_path):
+    path = tmp_path / "prompts.db"
+    store = SQLitePromptStore(path)
+    store["p"] = "Value: {x}"
+    store.close()
+    manager = PromptManager(str(path))
+    assert isinstance(manager.prompts, SQLitePromptStore)
+    assert manager.format_prompt("p", x=3) == "Value: 3"
+    manager.prompts.close()
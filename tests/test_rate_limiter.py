@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+import pytest
+
+from aifast.core.rate_limiter import RateLimiter, TokenBucket, get_rate_limiter
+
+
+def test_bucket_refills_over_time():
+    bucket = TokenBucket(rate_per_min=60)
+    bucket.tokens = 0
+    bucket.refill(bucket.updated + 2.0)
+    assert bucket.tokens == pytest.approx(2.0)
+    bucket.refill(bucket.updated + 3600)
+    assert bucket.tokens == bucket.capacity
+
+
+def test_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_try_acquire_enforces_both_limits():
+    limiter = RateLimiter(requests_per_min=2, tokens_per_min=100)
+    assert limiter.try_acquire(60)
+    assert not limiter.try_acquire(60)  # tokens exhausted
+    assert limiter.try_acquire(10)
+    assert not limiter.try_acquire(0)  # requests exhausted
+
+
+def test_acquire_sleeps_off_deficit():
+    limiter = RateLimiter(requests_per_min=6000, tokens_per_min=6000)  # 100 tokens per second
+    assert limiter.try_acquire(6000)
+    start = time.monotonic()
+    assert limiter.acquire(10)
+    assert 0.05 <= time.monotonic() - start < 1.0
+
+
+def test_acquire_timeout_consumes_nothing():
+    limiter = RateLimiter(requests_per_min=60, tokens_per_min=60)
+    assert limiter.try_acquire(60)
+    before = limiter.available()["tokens"]
+    assert not limiter.acquire(30, timeout=0.01)
+    assert limiter.available()["tokens"] == pytest.approx(before, abs=0.1)
+
+
+def test_aacquire_waits_without_blocking():
+    limiter = RateLimiter(requests_per_min=6000, tokens_per_min=6000)
+    limiter.try_acquire(6000)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.ensure_future(ticker())
+        assert await limiter.aacquire(10)
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(main()) >= 3
+
+
+def test_reconcile_returns_and_charges_tokens():
+    limiter = RateLimiter(requests_per_min=60, tokens_per_min=1000)
+    limiter.try_acquire(500)
+    limiter.reconcile(500, 100)
+    assert limiter.available()["tokens"] == pytest.approx(900, abs=1)
+    limiter.reconcile(100, 1100)
+    assert limiter.available()["tokens"] < 1
+    assert not limiter.try_acquire(1)
+
+
+def test_get_rate_limiter_is_shared():
+    a = get_rate_limiter("test-provider", "m", 10, 100)
+    assert get_rate_limiter("test-provider", "m") is a
+    assert get_rate_limiter("test-provider", "other") is not a
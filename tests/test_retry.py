@@ -0,0 +1,138 @@
+import asyncio
+import time
+
+import pytest
+
+from aifast.core.retry import RetryPolicy
+from aifast.providers.errors import (
+    BadRequestError, OverloadedError, ProviderTimeoutError, RateLimitError, is_retryable,
+)
+
+
+class Flaky:
+    """Raises the given errors in turn, then returns "ok"."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+    async def acall(self):
+        return self()
+
+
+def test_backoff_is_capped_exponential():
+    policy = RetryPolicy(base_delay=0.5, max_delay=3.0, jitter=False)
+    assert [policy.backoff(attempt) for attempt in range(1, 6)] == [0.5, 1.0, 2.0, 3.0, 3.0]
+
+
+def test_jitter_stays_within_backoff():
+    policy = RetryPolicy(base_delay=1.0, max_delay=8.0)
+    delays = [policy.backoff(3) for _ in range(200)]
+    assert all(0 <= delay <= 4.0 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_retry_after_takes_precedence():
+    policy = RetryPolicy(base_delay=10.0, jitter=False)
+    assert policy.backoff(1, RateLimitError("slow", retry_after=0.25)) == 0.25
+
+
+def test_retries_retryable_errors_until_success():
+    func = Flaky(OverloadedError("down"), RateLimitError("slow"))
+    assert RetryPolicy(base_delay=0.001).call(func) == "ok"
+    assert func.calls == 3
+
+
+def test_does_not_retry_caller_errors():
+    func = Flaky(BadRequestError("bad"))
+    with pytest.raises(BadRequestError):
+        RetryPolicy(base_delay=0.001).call(func)
+    assert func.calls == 1
+
+
+def test_gives_up_after_max_attempts():
+    func = Flaky(*[OverloadedError("down")] * 5)
+    with pytest.raises(OverloadedError):
+        RetryPolicy(max_attempts=3, base_delay=0.001).call(func)
+    assert func.calls == 3
+
+
+def test_deadline_stops_before_sleeping_past_it():
+    func = Flaky(RateLimitError("slow", retry_after=5.0), RateLimitError("slow"))
+    start = time.monotonic()
+    with pytest.raises(RateLimitError):
+        RetryPolicy(deadline=1.0).call(func)
+    assert time.monotonic() - start < 0.5
+    assert func.calls == 1
+
+
+def test_async_retries():
+    func = Flaky(OverloadedError("down"))
+    assert asyncio.run(RetryPolicy(base_delay=0.001).acall(func.acall)) == "ok"
+    assert func.calls == 2
+
+
+def test_untyped_errors_classified_by_status_and_cause():
+    class HTTPError(Exception):
+        def __init__(self, status_code):
+            self.status_code = status_code
+
+    assert is_retryable(HTTPError(503))
+    assert not is_retryable(HTTPError(404))
+    wrapped = RuntimeError("wrapped")
+    wrapped.__cause__ = HTTPError(429)
+    assert is_retryable(wrapped)
+    assert not is_retryable(ValueError("plain"))
+
+
+def test_rejects_zero_attempts():
+    with pytest.raises(ValueError):
+        RetryPolicy(max_attempts=0)
+
+
+def test_deadline_bounds_async_attempt_in_flight():
+    calls = []
+
+    async def hang():
+        calls.append(1)
+        await asyncio.sleep(10)
+
+    start = time.monotonic()
+    with pytest.raises(ProviderTimeoutError, match="deadline"):
+        asyncio.run(RetryPolicy(deadline=0.1, base_delay=0.001).acall(hang))
+    assert time.monotonic() - start < 1.0
+    assert len(calls) == 1
+
+
+def test_async_timeout_raised_by_func_is_retried():
+    func = Flaky(TimeoutError("read timed out"))
+    assert asyncio.run(RetryPolicy(base_delay=0.001).acall(func.acall)) == "ok"
+    assert func.calls == 2
+
+
+def test_timeout_kwarg_passes_remaining_budget():
+    budgets = []
+
+    def func(timeout):
+        budgets.append(timeout)
+        if len(budgets) < 3:
+            raise OverloadedError("down")
+        return "ok"
+
+    policy = RetryPolicy(deadline=5.0, base_delay=0.01, jitter=False, timeout_kwarg="timeout")
+    assert policy.call(func) == "ok"
+    assert budgets[0] <= 5.0 and budgets[0] > budgets[1] > budgets[2] > 4.0
+
+    async def afunc(timeout):
+        budgets.append(timeout)
+        return "ok"
+
+    assert asyncio.run(policy.acall(afunc)) == "ok"
+    assert 4.0 < budgets[-1] <= 5.0
+    assert RetryPolicy(deadline=None, timeout_kwarg="timeout").call(lambda **kwargs: kwargs) == {}
@@ -0,0 +1,166 @@
+import asyncio
+
+import pytest
+
+from aifast.core.rate_limiter import RateLimiter
+from aifast.providers.base import BaseProvider
+from aifast.providers.errors import BadRequestError, OverloadedError, RateLimitError
+from aifast.providers.router import Backend, RouterProvider
+from aifast.providers.types import CompletionResult, StreamEvent, Usage
+from aifast.utils.tokens import Tokenizer, register_tokenizer
+
+
+class FakeProvider(BaseProvider):
+    def __init__(self, api_key="", answer="ok", error=None, name="fake", model="m", usage=None):
+        self.answer = answer
+        self.error = error
+        self.usage = usage
+        self.name = name
+        self.model = model
+        self.calls = 0
+
+    def complete(self, prompt, **kwargs):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return self.answer
+
+    def chat(self, messages, **kwargs):
+        return self.complete(messages[-1]["content"])
+
+    async def acomplete(self, prompt, **kwargs):
+        return self.complete(prompt)
+
+    def complete_result(self, prompt, **kwargs):
+        return CompletionResult(self.complete(prompt), self.usage, self.model, self.name)
+
+    async def acomplete_result(self, prompt, **kwargs):
+        return self.complete_result(prompt)
+
+    def stream_complete(self, prompt, **kwargs):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        yield StreamEvent(self.answer)
+        yield StreamEvent(done=True, usage=self.usage)
+
+    async def astream_complete(self, prompt, **kwargs):
+        for event in self.stream_complete(prompt):
+            yield event
+
+    def validate_api_key(self):
+        return True
+
+
+class FixedTokenizer(Tokenizer):
+    name = "fixed"
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+
+    def count(self, text):
+        return self.tokens
+
+    def truncate(self, text, max_tokens):
+        return text
+
+
+def test_fails_over_on_retryable_error():
+    bad = FakeProvider(error=OverloadedError("down", "fake", 503))
+    good = FakeProvider(answer="second")
+    router = RouterProvider([bad, good])
+    assert router.complete("hi") == "second"
+    health = router.health()
+    assert health["fake:m"]["failures"] == 1 and health["fake:m"]["cooling_down"]
+    assert router.decisions[-1]["chosen"] == "fake:m#1"
+    # The failing backend is cooling down, so it is now ranked last
+    assert router.complete("hi") == "second"
+    assert bad.calls == 1
+
+
+def test_caller_errors_are_not_failed_over():
+    bad = FakeProvider(error=BadRequestError("bad", "fake", 400))
+    good = FakeProvider()
+    router = RouterProvider([bad, good])
+    with pytest.raises(BadRequestError):
+        router.complete("hi")
+    assert good.calls == 0
+    assert router.health()["fake:m"]["failures"] == 0
+
+
+def test_all_backends_failing_raises_overloaded():
+    router = RouterProvider([FakeProvider(error=RateLimitError("slow down", "fake", 429)),
+                             FakeProvider(error=OverloadedError("down", "fake", 503))])
+    with pytest.raises(OverloadedError, match="All providers failed"):
+        router.complete("hi")
+
+
+def test_async_and_stream_failover():
+    bad = FakeProvider(error=OverloadedError("down", "fake", 503))
+    router = RouterProvider([bad, FakeProvider(answer="b")])
+    assert asyncio.run(router.acomplete("hi")) == "b"
+    router = RouterProvider([FakeProvider(error=OverloadedError("down", "fake", 503)), FakeProvider(answer="b")])
+    assert [e.delta for e in router.stream_complete("hi")] == ["b", ""]
+
+
+def test_rate_limit_cost_uses_each_backends_tokenizer():
+    register_tokenizer(FixedTokenizer(500), provider="router-test-big")
+    register_tokenizer(FixedTokenizer(5), provider="router-test-small")
+    big = Backend(FakeProvider(answer="big", name="router-test-big"), rate_limiter=RateLimiter(60, 1000))
+    small = Backend(FakeProvider(answer="small", name="router-test-small"), rate_limiter=RateLimiter(60, 1000))
+    router = RouterProvider([big, small])
+    assert router.complete("hi", max_tokens=100) == "big"
+    assert big.rate_limiter.available()["tokens"] == pytest.approx(400, abs=1)
+    # 600 more tokens no longer fit the big backend's budget, so the small one is preferred
+    assert router.complete("hi", max_tokens=100) == "small"
+    assert small.rate_limiter.available()["tokens"] == pytest.approx(895, abs=1)
+
+
+def test_reported_usage_replaces_reservation():
+    register_tokenizer(FixedTokenizer(100), provider="router-test-usage")
+    backend = Backend(FakeProvider(name="router-test-usage", usage=Usage(20, 10)),
+                      rate_limiter=RateLimiter(60, 1000))
+    router = RouterProvider([backend])
+    tokens = backend.rate_limiter.tokens
+
+    assert router.complete_result("hi", max_tokens=200).usage.total_tokens == 30
+    # 300 tokens were reserved; the 30 actually used are all that stay charged
+    assert tokens.tokens == pytest.approx(970, abs=1)
+    asyncio.run(router.acomplete_result("hi", max_tokens=200))
+    assert tokens.tokens == pytest.approx(940, abs=1)
+
+    events = list(router.stream_complete("hi", max_tokens=200))
+    assert events[-1].usage.total_tokens == 30
+    assert tokens.tokens == pytest.approx(910, abs=1)
+
+    async def consume():
+        return [event async for event in router.astream_complete("hi", max_tokens=200)]
+
+    asyncio.run(consume())
+    assert tokens.tokens == pytest.approx(880, abs=1)
+
+    # Without reported usage the reservation stands
+    backend.provider.usage = None
+    router.complete_result("hi", max_tokens=200)
+    assert tokens.tokens == pytest.approx(580, abs=1)
+
+
+def test_decisions_record_skipped_and_failed_backends():
+    bad = Backend(FakeProvider(error=OverloadedError("down", "fake", 503)), name="bad")
+    limited = Backend(FakeProvider(answer="limited"), name="limited", rate_limiter=RateLimiter(1, 1000))
+    # Out of budget too, but the last candidate waits for it (a few ms at this rate)
+    refilling = Backend(FakeProvider(answer="refilling"), name="refilling", rate_limiter=RateLimiter(6000, 1000))
+    limited.rate_limiter.requests.tokens = 0
+    refilling.rate_limiter.requests.tokens = 0
+    router = RouterProvider([bad, limited, refilling])
+    assert router.complete("hi") == "refilling"
+    decision = router.decisions[-1]
+    assert decision["ranking"] == ["bad", "limited", "refilling"] and decision["chosen"] == "refilling"
+    assert decision["attempts"] == [{"backend": "bad", "error": "down"},
+                                    {"backend": "limited", "error": "rate limited"}]
+
+    router = RouterProvider([FakeProvider(error=BadRequestError("bad", "fake", 400))])
+    with pytest.raises(BadRequestError):
+        asyncio.run(router.acomplete("hi"))
+    assert router.decisions[-1]["chosen"] is None
+    assert router.decisions[-1]["attempts"] == [{"backend": "fake:m", "error": "bad"}]
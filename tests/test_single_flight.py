@@ -0,0 +1,122 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from aifast.core.single_flight import SingleFlight
+
+
+def test_concurrent_threads_share_one_call():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def slow(value):
+        calls.append(value)
+        release.wait(2)
+        return value * 2
+
+    results = []
+
+    def worker():
+        results.append(flight.do("k", slow, 21))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    assert flight.in_flight() == 1
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert calls == [21]
+    assert sorted(results) == [(42, False)] + [(42, True)] * 7
+    assert flight.in_flight() == 0
+
+
+def test_error_reaches_every_waiter_and_is_not_kept():
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.05)
+        raise ValueError("boom")
+
+    errors = []
+
+    def worker():
+        try:
+            flight.do("k", failing)
+        except ValueError as e:
+            errors.append(e)
+
+    first = threading.Thread(target=worker)
+    first.start()
+    started.wait()
+    second = threading.Thread(target=worker)
+    second.start()
+    first.join()
+    second.join()
+    assert len(errors) == 2
+    assert flight.do("k", lambda: "fresh") == ("fresh", False)
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == (1, False)
+    assert flight.do("b", lambda: 2) == (2, False)
+
+
+def test_async_tasks_share_one_call():
+    flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return "value"
+
+    async def main():
+        return await asyncio.gather(*(flight.ado("k", fetch) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert calls == 1
+    assert [shared for _, shared in results].count(False) == 1
+    assert all(value == "value" for value, _ in results)
+    assert flight.in_flight() == 0
+
+
+def test_cancelled_waiter_does_not_cancel_the_call():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        leader = asyncio.ensure_future(flight.ado("k", fetch))
+        follower = asyncio.ensure_future(flight.ado("k", fetch))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == ("done", True)
+
+
+def test_async_error_reaches_waiters():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise KeyError("missing")
+
+    async def main():
+        return await asyncio.gather(flight.ado("k", fetch), flight.ado("k", fetch), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, KeyError) for result in results)
@@ -0,0 +1,94 @@
+import asyncio
+import random
+
+import pytest
+
+from aifast.core.response_formatter import ResponseFormatter
+
+
+def chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def stream(format_type, text, size=3):
+    return list(ResponseFormatter(format_type).format_stream(chunked(text, size)))
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 1000])
+def test_json_array_elements_and_objects(size):
+    text = '[{"a": 1}, {"b": "x,]}"}, 3, "s", [4, 5]]'
+    assert stream("json", text, size) == [{"a": 1}, {"b": "x,]}"}, 3, "s", [4, 5]]
+    assert stream("json", '{"a": 1}\n{"b": 2}\n', size) == [{"a": 1}, {"b": 2}]
+
+
+def test_json_truncated_last_element_uses_fallback():
+    assert stream("json", '[{"a":1}, {"b":') == [{"a": 1}, {"text": '{"b":'}]
+    assert stream("json", '[1, 2') == [1, 2]
+
+
+@pytest.mark.parametrize("text", [
+    "Just some prose.",
+    "42",
+    '"a string"',
+    'See [1] for details: {"a": 1}',
+    '```json\n{"a": 1}\n```',
+    "",
+])
+@pytest.mark.parametrize("format_type", ["json", "json_extract"])
+def test_non_json_responses_match_format(format_type, text):
+    expected = [] if not text else [ResponseFormatter(format_type).format(text)]
+    assert stream(format_type, text) == expected
+
+
+def test_json_trailing_prose_is_not_dropped():
+    assert stream("json", '{"a": 1}\nHope this helps [really]!') == [{"a": 1}, {"text": "Hope this helps [really]!"}]
+
+
+@pytest.mark.parametrize("size", [1, 5, 1000])
+def test_json_extract_streams_fenced_block(size):
+    text = 'Here you go:\n```json\n[{"a": 1}, {"b": 2}]\n```\nAnything [else]?'
+    assert stream("json_extract", text, size) == [{"a": 1}, {"b": 2}]
+    assert stream("json_extract", '{"a": 1} and more {"b": 2}', size) == [{"a": 1}]
+
+
+def test_json_stream_accepts_events_async():
+    class Event:
+        def __init__(self, delta):
+            self.delta = delta
+
+    async def events():
+        for piece in chunked('[{"a": 1}, {"b": 2}]', 4):
+            yield Event(piece)
+
+    async def collect():
+        return [item async for item in ResponseFormatter("json").aformat_stream(events())]
+
+    assert asyncio.run(collect()) == [{"a": 1}, {"b": 2}]
+
+
+def test_markdown_blocks_and_lists():
+    text = "Intro text.\n\n* one\n* two\n\n```python\nx = 1\n```\n\nEnd."
+    items = stream("markdown", text)
+    assert items == ["Intro text.", "- one\n- two", "```python\nx = 1\n```", "End."]
+    assert "\n\n".join(items) == ResponseFormatter("markdown").format(text)
+
+
+def test_markdown_code_is_fenced_once():
+    text = "def f():\n    return 1\n\nclass A:\n    pass\n\n3 steps"
+    items = stream("markdown", text)
+    assert items == [ResponseFormatter("markdown").format(text)]
+    assert items[0].count("```") == 2
+
+
+def test_markdown_code_with_later_fence_is_not_wrapped():
+    text = "def f():\n    return 1\n\n```\nx\n```"
+    assert stream("markdown", text) == ["def f():\n    return 1", "```\nx\n```"]
+
+
+def test_json_matches_format_on_random_chunking():
+    rng = random.Random(0)
+    text = '[{"k": "v\\"}{[", "n": [1, {"m": null}]}, true, -1.5e3, {"e": {}}]'
+    expected = ResponseFormatter("json").format(text)
+    for _ in range(50):
+        size = rng.randint(1, 10)
+        assert stream("json", text, size) == expected
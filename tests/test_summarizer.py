@@ -0,0 +1,68 @@
+import asyncio
+
+from aifast.core.ai_interface import AIInterface
+from aifast.core.summarizer import MapReduceSummarizer
+from aifast.providers.base import BaseProvider
+from aifast.providers.types import Usage
+
+DOCUMENT = "\n\n".join(f"Paragraph {i} " + "word " * 60 for i in range(40))
+
+
+class UsageProvider(BaseProvider):
+    """Replies with a short summary, reporting fixed usage unless report_usage is False."""
+    name = "usage-test"
+    model = "m"
+
+    def __init__(self, api_key="", report_usage=True):
+        self.report_usage = report_usage
+        self.calls = 0
+
+    def complete(self, prompt, **kwargs):
+        self.calls += 1
+        return f"summary {self.calls}"
+
+    def chat(self, messages, **kwargs):
+        return self.complete(messages[-1]["content"])
+
+    def complete_result(self, prompt, **kwargs):
+        result = super().complete_result(prompt, **kwargs)
+        if self.report_usage:
+            result.usage = Usage(1000, 7)
+        return result
+
+    async def acomplete_result(self, prompt, **kwargs):
+        return self.complete_result(prompt, **kwargs)
+
+    def validate_api_key(self):
+        return True
+
+
+def test_stats_sum_reported_usage():
+    provider = UsageProvider()
+    summarizer = MapReduceSummarizer(AIInterface(provider), chunk_tokens=200, overlap=0, max_tokens=50)
+    assert summarizer.summarize(DOCUMENT).startswith("summary")
+    stats = summarizer.last_stats
+    assert stats["calls"] == provider.calls > 1
+    assert stats["prompt_tokens"] == 1000 * stats["calls"]
+    assert stats["completion_tokens"] == 7 * stats["calls"]
+
+
+def test_async_stats_sum_reported_usage():
+    provider = UsageProvider()
+    summarizer = MapReduceSummarizer(AIInterface(provider), chunk_tokens=200, overlap=0, max_tokens=50)
+    asyncio.run(summarizer.asummarize(DOCUMENT))
+    assert summarizer.last_stats["prompt_tokens"] == 1000 * summarizer.last_stats["calls"]
+
+
+def test_stats_estimated_without_usage():
+    summarizer = MapReduceSummarizer(AIInterface(UsageProvider(report_usage=False)), chunk_tokens=200,
+                                     overlap=0, max_tokens=50)
+    summarizer.summarize(DOCUMENT)
+    stats = summarizer.last_stats
+    assert stats["prompt_tokens"] > stats["chunks"] * 100
+    assert 0 < stats["completion_tokens"] < stats["calls"] * 10
+
+
+def test_empty_document():
+    summarizer = MapReduceSummarizer(AIInterface(UsageProvider()))
+    assert summarizer.summarize("") == ""
@@ -0,0 +1,86 @@
+import threading
+
+import pytest
+
+from aifast.core.usage import UsageTracker
+from aifast.providers.types import CompletionResult, Usage
+
+
+def _result(model="gpt-4o", prompt=1000, completion=500, **kwargs):
+    usage = Usage(prompt, completion) if prompt is not None else None
+    return CompletionResult("ok", usage=usage, model=model, provider="openai", latency=0.5, **kwargs)
+
+
+def test_price_matches_longest_prefix():
+    tracker = UsageTracker(prices={"my-model": (1.0, 2.0)})
+    assert tracker.price("gpt-4o-mini-2024-07-18") == (0.15, 0.60)
+    assert tracker.price("gpt-4o-2024-08-06") == (2.50, 10.00)
+    assert tracker.price("my-model") == (1.0, 2.0)
+    assert tracker.price("unknown-model") is None
+    assert tracker.price(None) is None
+
+
+def test_record_and_snapshot():
+    tracker = UsageTracker()
+    tracker.record(_result())
+    tracker.record(_result(prompt=3000, completion=1500))
+    tracker.record(_result(cached=True))
+    tracker.record(_result(coalesced=True))
+    tracker.record(_result(prompt=None))
+
+    snapshot = tracker.snapshot()
+    entry = snapshot["models"]["openai:gpt-4o"]
+    assert entry["calls"] == 5
+    assert (entry["cached"], entry["coalesced"], entry["unreported"]) == (1, 1, 1)
+    assert entry["prompt_tokens"] == 4000 and entry["completion_tokens"] == 2000
+    assert entry["total_tokens"] == 6000
+    assert entry["mean_latency"] == pytest.approx(0.5)
+    assert entry["cost"] == pytest.approx((4000 * 2.50 + 2000 * 10.00) / 1e6)
+    assert snapshot["total"]["calls"] == 5
+    assert snapshot["total"]["cost"] == pytest.approx(entry["cost"])
+
+
+def test_unpriced_model_has_no_cost():
+    tracker = UsageTracker()
+    tracker.record(_result(model="gpt-4o"))
+    tracker.record(_result(model="local-llama"))
+    snapshot = tracker.snapshot()
+    assert snapshot["models"]["openai:local-llama"]["cost"] is None
+    assert snapshot["models"]["openai:local-llama"]["total_tokens"] == 1500
+    # Unpriced tokens still count towards the total but add nothing to its cost
+    assert snapshot["total"]["total_tokens"] == 3000
+    assert snapshot["total"]["cost"] == pytest.approx(snapshot["models"]["openai:gpt-4o"]["cost"])
+
+
+def test_reset_starts_over():
+    tracker = UsageTracker()
+    tracker.record(_result())
+    first = tracker.snapshot(reset=True)
+    assert first["total"]["calls"] == 1
+    assert tracker.snapshot()["models"] == {}
+    tracker.record(_result())
+    tracker.reset()
+    assert tracker.snapshot()["total"]["calls"] == 0
+
+
+def test_export_calls_sink_and_survives_errors():
+    tracker = UsageTracker()
+    tracker.record(_result())
+    snapshots = []
+    exported = threading.Event()
+
+    def sink(snapshot):
+        snapshots.append(snapshot)
+        if len(snapshots) == 1:
+            raise RuntimeError("sink down")
+        exported.set()
+
+    tracker.start_export(sink, interval=0.01)
+    try:
+        assert exported.wait(2.0)
+    finally:
+        tracker.stop_export()
+    # The first export reset the totals; the failing sink did not stop the next one
+    assert snapshots[0]["total"]["calls"] == 1
+    assert snapshots[1]["total"]["calls"] == 0
+    assert tracker.last_export_error is None